@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# How long an upstream payload stays fresh, per Alpha Vantage function.
+# Functions not listed here fall back to DEFAULT_TTL; technical indicators and
+# interval based series are handled in ttl_for.
+FUNCTION_TTLS = {
+    # Real time data
+    "GLOBAL_QUOTE": MINUTE,
+    "REALTIME_BULK_QUOTES": MINUTE,
+    "TIME_SERIES_INTRADAY": MINUTE,
+    "CURRENCY_EXCHANGE_RATE": MINUTE,
+    "MARKET_STATUS": 5 * MINUTE,
+    "TOP_GAINERS_LOSERS": 5 * MINUTE,
+    "NEWS_SENTIMENT": 15 * MINUTE,
+    # End of day series
+    "TIME_SERIES_DAILY": HOUR,
+    "TIME_SERIES_DAILY_ADJUSTED": HOUR,
+    "FX_DAILY": HOUR,
+    "DIGITAL_CURRENCY_DAILY": HOUR,
+    "TIME_SERIES_WEEKLY": 6 * HOUR,
+    "TIME_SERIES_WEEKLY_ADJUSTED": 6 * HOUR,
+    "TIME_SERIES_MONTHLY": 6 * HOUR,
+    "TIME_SERIES_MONTHLY_ADJUSTED": 6 * HOUR,
+    "FX_WEEKLY": 6 * HOUR,
+    "FX_MONTHLY": 6 * HOUR,
+    "DIGITAL_CURRENCY_WEEKLY": 6 * HOUR,
+    "DIGITAL_CURRENCY_MONTHLY": 6 * HOUR,
+    # Fundamentals and corporate data
+    "OVERVIEW": 12 * HOUR,
+    "INCOME_STATEMENT": 12 * HOUR,
+    "BALANCE_SHEET": 12 * HOUR,
+    "CASH_FLOW": 12 * HOUR,
+    "EARNINGS": 12 * HOUR,
+    "ETF_HOLDINGS": 12 * HOUR,
+    "ETF_PROFILE": 12 * HOUR,
+    "DIVIDEND_HISTORY": 12 * HOUR,
+    "SPLIT_HISTORY": 12 * HOUR,
+    "INSIDER_TRADING": 12 * HOUR,
+    "EARNINGS_TRENDING": HOUR,
+    "TRENDING_COMPANY_OVERVIEW": HOUR,
+    "EARNINGS_CALL_TRANSCRIPT": 7 * DAY,
+    "LISTING_STATUS": DAY,
+    "EARNINGS_CALENDAR": DAY,
+    "IPO_CALENDAR": DAY,
+    # Monthly and slower macro series
+    "REAL_GDP": DAY,
+    "REAL_GDP_PER_CAPITA": DAY,
+    "CPI": DAY,
+    "INFLATION": DAY,
+    "RETAIL_SALES": DAY,
+    "DURABLES": DAY,
+    "UNEMPLOYMENT": DAY,
+    "NONFARM_PAYROLL": DAY,
+}
+
+# Commodity and rate series whose freshness depends on the requested interval
+INTERVAL_SERIES = {
+    "WTI", "BRENT", "NATURAL_GAS", "COPPER", "ALUMINUM", "WHEAT", "CORN",
+    "COTTON", "SUGAR", "COFFEE", "ALL_COMMODITIES", "TREASURY_YIELD",
+    "FEDERAL_FUNDS_RATE",
+}
+
+INTRADAY_INTERVALS = {"1min", "5min", "15min", "30min", "60min"}
+
+DEFAULT_TTL = 5 * MINUTE
+
+
+def ttl_for(params: dict) -> float:
+    """
+    Freshness in seconds for an upstream request. Any function can be
+    overridden with an ALPHA_VANTAGE_CACHE_TTL_<FUNCTION> env var.
+    """
+    function = str(params.get("function", "")).upper()
+    override = os.getenv(f"ALPHA_VANTAGE_CACHE_TTL_{function}")
+    if override is not None:
+        return float(override)
+
+    interval = str(params.get("interval") or "")
+    if function in FUNCTION_TTLS:
+        return FUNCTION_TTLS[function]
+    if function == "HISTORICAL_OPTIONS":
+        # A past trading day never changes, the latest chain does
+        return 7 * DAY if params.get("date") else HOUR
+    if function in INTERVAL_SERIES:
+        return 6 * HOUR if interval in ("daily", "weekly") else DAY
+    if "symbol" in params and interval:
+        # Technical indicators follow the bar size they are computed on
+        if interval in INTRADAY_INTERVALS:
+            return MINUTE
+        return HOUR if interval == "daily" else 6 * HOUR
+    return DEFAULT_TTL
+
+
+def max_stale_for(params: dict, max_stale: float) -> float:
+    """
+    How long past expiry an entry may still be served while it is refreshed
+    in the background. Capped by the entry's own TTL, so a stale value is at
+    most twice as old as its freshness policy allows.
+    """
+    return min(max_stale, ttl_for(params))
+
+
+def cache_key(params: dict) -> tuple:
+    """
+    Canonical (function, params) key. The API key is left out so the same
+    request made with different keys shares one entry.
+    """
+    items = tuple(sorted(
+        (k, str(v)) for k, v in params.items()
+        if k not in ("function", "apikey") and v is not None
+    ))
+    return (str(params.get("function", "")).upper(), items)
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache whose entries expire after a per entry TTL, bounded
+    both by number of entries and by total payload size. Expired entries are
+    kept for `retention` seconds so they can still be served stale.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, retention: float = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.retention = retention
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: tuple, max_stale: float = 0, count: bool = True) -> Optional[tuple]:
+        """
+        Return (value, stored_at, expires_at) for an entry that is fresh or
+        expired less than max_stale seconds ago, else None. Internal lookups
+        pass count=False to leave the hit and miss counters alone.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count
+                return None
+            value, stored_at, expires_at, size = entry
+            now = time.time()
+            if now >= expires_at + max_stale:
+                if now >= expires_at + self.retention:
+                    self._remove(key)
+                self.misses += count
+                return None
+            self._entries.move_to_end(key)
+            if now >= expires_at:
+                self.stale_hits += count
+            else:
+                self.hits += count
+            return value, stored_at, expires_at
+
+    def get(self, key: tuple) -> Optional[Any]:
+        entry = self.lookup(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: tuple, value: Any, ttl: float, size: int = 0, stored_at: Optional[float] = None) -> None:
+        if stored_at is None:
+            stored_at = time.time()
+        expires_at = stored_at + ttl
+        if expires_at + self.retention <= time.time() or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, stored_at, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: tuple) -> None:
+        _, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+class SQLiteCache:
+    """
+    Durable response cache stored in SQLite so payloads survive server
+    restarts. The database runs in WAL mode with a busy timeout, which lets
+    several server processes read and write the same file concurrently.
+    Rows are kept `retention` seconds past expiry so they can be served stale.
+    """
+
+    def __init__(self, directory: str, filename: str = "responses.sqlite3", retention: float = 0):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self.retention = retention
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " function TEXT NOT NULL,"
+            " status INTEGER NOT NULL,"
+            " content BLOB NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+        self.purge()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _serialize(key: tuple) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def lookup(self, key: tuple, max_stale: float = 0, count: bool = True) -> Optional[tuple]:
+        """
+        Return (status, content, created_at, expires_at) for an entry that is
+        fresh or expired less than max_stale seconds ago, else None.
+        """
+        row = self._connection().execute(
+            "SELECT status, content, created_at, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+            (self._serialize(key), time.time() - max_stale),
+        ).fetchone()
+        if row is None:
+            self.misses += count
+            return None
+        self.hits += count
+        return row[0], bytes(row[1]), row[2], row[3]
+
+    def set(self, key: tuple, status: int, content: bytes, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO responses (key, function, status, content, created_at, expires_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (self._serialize(key), key[0], status, sqlite3.Binary(content), now, now + ttl),
+        )
+
+    def purge(self) -> int:
+        """
+        Delete entries past their retention and return how many were removed.
+        """
+        cursor = self._connection().execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (time.time() - self.retention,)
+        )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM responses"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
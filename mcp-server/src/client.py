@@ -0,0 +1,605 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, as_completed
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:
+    # Optional: only makes decoding faster
+    orjson = None
+
+from cache import SQLiteCache, TTLCache, cache_key, max_stale_for, ttl_for
+from ratelimit import KeyPool, RateLimitExceeded, SharedBudget
+from resilience import CircuitBreaker, CircuitOpenError, backoff_delay, is_transient_status
+from singleflight import AsyncSingleFlight, SingleFlight
+
+# Load environment variables
+
+load_dotenv()
+
+BASE_URL = "https://www.alphavantage.co/query"
+
+# Connection pool settings. POOL_CONNECTIONS is the number of per-host pools
+# kept alive, POOL_MAXSIZE the number of keep-alive connections per host and
+# POOL_BLOCK makes callers wait for a free connection instead of opening extra
+# throwaway ones once a host is at its limit.
+POOL_CONNECTIONS = int(os.getenv("ALPHA_VANTAGE_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("ALPHA_VANTAGE_POOL_MAXSIZE", "16"))
+POOL_BLOCK = os.getenv("ALPHA_VANTAGE_POOL_BLOCK", "true").lower() in ("1", "true", "yes")
+
+# API keys. ALPHA_VANTAGE_API_KEYS takes a comma separated list; every key
+# gets its own call budget and calls go to the least loaded one.
+API_KEYS = [
+    key.strip() for key in os.getenv("ALPHA_VANTAGE_API_KEYS", "").split(",") if key.strip()
+] or [os.getenv("ALPHA_VANTAGE_API_KEY", "")]
+
+# Upstream call budgets per key (0 disables a limit) and how long a call may
+# wait in the limiter queue before it is rejected. Defaults match the free tier.
+CALLS_PER_MINUTE = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+CALLS_PER_DAY = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_DAY", "25"))
+MAX_QUEUE_WAIT = float(os.getenv("ALPHA_VANTAGE_MAX_QUEUE_WAIT", "60"))
+
+# Keep the budgets in the cache directory so that every server process (each
+# stdio session starts one) spends the same per-key budget. Set
+# ALPHA_VANTAGE_SHARED_RATE_LIMIT=false to budget each process on its own.
+SHARED_RATE_LIMIT = os.getenv("ALPHA_VANTAGE_SHARED_RATE_LIMIT", "true").lower() in ("1", "true", "yes")
+
+# Maximum number of upstream fetches a batch tool runs at once. The key pool
+# limiters still decide when each of them may actually be sent.
+BATCH_CONCURRENCY = int(os.getenv("ALPHA_VANTAGE_BATCH_CONCURRENCY", str(POOL_MAXSIZE)))
+
+# Resilience settings: default request timeout, retries on transient errors
+# and throttling with exponential backoff plus jitter, and the circuit breaker
+# that fails fast once upstream keeps failing.
+REQUEST_TIMEOUT = float(os.getenv("ALPHA_VANTAGE_TIMEOUT", "15"))
+MAX_RETRIES = int(os.getenv("ALPHA_VANTAGE_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("ALPHA_VANTAGE_BACKOFF_BASE", "1"))
+BACKOFF_MAX = float(os.getenv("ALPHA_VANTAGE_BACKOFF_MAX", "30"))
+BREAKER_THRESHOLD = int(os.getenv("ALPHA_VANTAGE_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET = float(os.getenv("ALPHA_VANTAGE_BREAKER_RESET", "30"))
+
+# In-memory response cache bounds
+CACHE_MAX_ENTRIES = int(os.getenv("ALPHA_VANTAGE_CACHE_MAX_ENTRIES", "512"))
+CACHE_MAX_BYTES = int(os.getenv("ALPHA_VANTAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Stale-while-revalidate: an expired entry is still served for up to this
+# many seconds (never more than its own TTL) while a background refresh runs.
+# Older entries make callers wait for upstream. 0 disables stale serving.
+MAX_STALE = float(os.getenv("ALPHA_VANTAGE_MAX_STALE", "300"))
+
+# Persistent cache shared by every server process. Set
+# ALPHA_VANTAGE_DISK_CACHE=false to keep responses in memory only.
+DISK_CACHE = os.getenv("ALPHA_VANTAGE_DISK_CACHE", "true").lower() in ("1", "true", "yes")
+CACHE_DIR = os.getenv(
+    "ALPHA_VANTAGE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "alpha_vantage_mcp"),
+)
+
+
+def _build_session() -> requests.Session:
+    """
+    Build the shared keep-alive session used for every upstream call.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=POOL_BLOCK,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = _build_session()
+
+key_pool = KeyPool(API_KEYS, CALLS_PER_MINUTE, CALLS_PER_DAY, MAX_QUEUE_WAIT,
+                   SharedBudget(CACHE_DIR) if SHARED_RATE_LIMIT else None)
+
+breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET)
+
+response_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, retention=MAX_STALE)
+
+disk_cache = SQLiteCache(CACHE_DIR, retention=MAX_STALE) if DISK_CACHE else None
+
+# Identical requests already on the wire, keyed like the cache
+inflight = SingleFlight()
+async_inflight = AsyncSingleFlight()
+
+# Keys with a background refresh running, and the asyncio tasks doing it
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+_background_tasks = set()
+
+# httpx clients are bound to the event loop they were created on, so the
+# async client is created lazily the first time a loop needs it.
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Set while run_async runs a fetcher on a worker thread: the fetcher's
+# upstream requests are sent from that event loop. None means they are sent
+# on the shared requests session.
+_bridge: ContextVar[Optional["_LoopBridge"]] = ContextVar("_bridge", default=None)
+
+# Called with the params of every request before it is looked up or sent.
+# A check refuses a request by raising; symbols.py installs the symbol check.
+_request_checks: List[Callable[[dict], None]] = []
+
+
+def json_loads(content):
+    """
+    Decode a JSON payload, with orjson when it is installed. It parses
+    several times faster than the json module and builds the same objects.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class Response:
+    """
+    Transport independent upstream reply exposing the part of the requests
+    API the fetchers in tools.py rely on.
+    """
+
+    def __init__(self, status_code: int, content: bytes, url: str = "", stale_age: Optional[float] = None):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        # Seconds since the payload was fetched, set only when served stale
+        self.stale_age = stale_age
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        data = json_loads(self.content)
+        if self.stale_age is not None and isinstance(data, dict):
+            data["_cache"] = {"stale": True, "age_seconds": round(self.stale_age, 1)}
+        return data
+
+    def as_stale(self, age: float) -> "Response":
+        return Response(self.status_code, self.content, self.url, stale_age=age)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+# Phrases identifying Alpha Vantage's throttling messages. "Information" is
+# also used for premium-only endpoints and bad keys, which are not throttling.
+_THROTTLE_MARKERS = ("call frequency", "rate limit", "requests per", "calls per")
+
+
+def throttle_message(response: Response) -> Optional[str]:
+    """
+    The message of an Alpha Vantage rate limit payload ("Note" or
+    "Information") sent instead of data, or None. Those replies are tiny, so
+    larger bodies are not decoded.
+    """
+    if response.status_code != 200 or len(response.content) > 1024:
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if "Note" in data:
+        return str(data["Note"])
+    message = str(data.get("Information", ""))
+    if any(marker in message.lower() for marker in _THROTTLE_MARKERS):
+        return message
+    return None
+
+
+def is_throttled(response: Response) -> bool:
+    return throttle_message(response) is not None
+
+
+def _should_retry(response: Response, key: str) -> bool:
+    """
+    Record an upstream reply with the circuit breaker and the rate limiter of
+    the key it was made with, and tell whether it is worth retrying.
+    """
+    if is_transient_status(response.status_code):
+        breaker.record_failure()
+        return True
+    breaker.record_success()
+    message = throttle_message(response)
+    if message is None:
+        return False
+    message = message.lower()
+    # The per-minute notice also quotes the daily quota, so only a message
+    # that talks about the day alone means the daily budget is spent
+    key_pool.penalize(key, daily="per day" in message and "per minute" not in message)
+    return True
+
+
+def _finish(params: dict, response: Response) -> Response:
+    message = throttle_message(response)
+    if message is not None:
+        # Never hand a throttle payload to the fetchers as if it were data
+        raise RateLimitExceeded(f"Alpha Vantage rate limit reached: {message}")
+    _store(params, response)
+    return response
+
+
+def _clean_params(params: Optional[dict]) -> dict:
+    # Both transports should send the same query, so unset values are dropped
+    return {k: v for k, v in (params or {}).items() if v is not None}
+
+
+def _cached(params: dict, count: bool = True) -> Optional[tuple]:
+    """
+    Look a request up in memory, then on disk. Returns (response, is_fresh),
+    where a response that is not fresh is within its stale window. Lookups
+    that are not requests pass count=False to keep them out of the stats.
+    """
+    key = cache_key(params)
+    max_stale = max_stale_for(params, MAX_STALE)
+    entry = response_cache.lookup(key, max_stale, count)
+    if entry is None and disk_cache is not None:
+        disk_entry = disk_cache.lookup(key, max_stale, count)
+        if disk_entry is not None:
+            status, content, stored_at, expires_at = disk_entry
+            entry = (Response(status, content), stored_at, expires_at)
+            # Promote to memory, keeping the original fetch time
+            response_cache.set(key, entry[0], expires_at - stored_at, len(content), stored_at=stored_at)
+    if entry is None:
+        return None
+
+    response, stored_at, expires_at = entry
+    now = time.time()
+    if now < expires_at:
+        return response, True
+    return response.as_stale(now - stored_at), False
+
+
+def _claim_revalidation(key: tuple) -> bool:
+    with _revalidating_lock:
+        if key in _revalidating:
+            return False
+        _revalidating.add(key)
+        return True
+
+
+def _release_revalidation(key: tuple) -> None:
+    with _revalidating_lock:
+        _revalidating.discard(key)
+
+
+def _revalidate(url: str, params: dict, timeout: Optional[float]) -> None:
+    key = cache_key(params)
+    if not _claim_revalidation(key):
+        return
+
+    def refresh():
+        try:
+            inflight.do(key, lambda: _fetch(url, params, timeout))
+        except Exception:
+            # The stale copy keeps being served until its window runs out
+            pass
+        finally:
+            _release_revalidation(key)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def _revalidate_async(url: str, params: dict, timeout: Optional[float]) -> None:
+    key = cache_key(params)
+    if not _claim_revalidation(key):
+        return
+
+    async def refresh():
+        try:
+            await async_inflight.do(key, lambda: _fetch_async(url, params, timeout))
+        except Exception:
+            pass
+        finally:
+            _release_revalidation(key)
+
+    task = asyncio.get_running_loop().create_task(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _store(params: dict, response: Response) -> None:
+    if response.status_code != 200 or is_throttled(response):
+        return
+    key = cache_key(params)
+    ttl = ttl_for(params)
+    response_cache.set(key, response, ttl, len(response.content))
+    if disk_cache is not None:
+        disk_cache.set(key, response.status_code, response.content, ttl)
+
+
+def add_request_check(check: Callable[[dict], None]) -> None:
+    """
+    Register a check run on the params of every request before it is looked
+    up in the caches or sent. Refusing a request by raising costs no quota.
+    """
+    _request_checks.append(check)
+
+
+def _check_request(params: Optional[dict]) -> None:
+    for check in _request_checks:
+        check(params or {})
+
+
+def cached_response(params: Optional[dict]) -> Optional[Response]:
+    """
+    The cached reply to a request, fresh or still within its stale window,
+    without going upstream. None when nothing usable is cached. The lookup
+    is not counted in the cache stats.
+    """
+    cached = _cached(_clean_params(params), count=False)
+    return cached[0] if cached is not None else None
+
+
+def http_get(url: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> Response:
+    """
+    Send a GET request through the shared connection pool so repeated calls
+    reuse warm DNS/TCP/TLS connections to Alpha Vantage.
+    """
+    _check_request(params)
+    params = _clean_params(params)
+    cached = _cached(params)
+    if cached is not None:
+        response, fresh = cached
+        if not fresh:
+            _revalidate(url, params, timeout)
+            bridge = _bridge.get()
+            if bridge is not None:
+                bridge.stale_age = max(bridge.stale_age or 0.0, response.stale_age)
+        return response
+    return inflight.do(cache_key(params), lambda: _fetch(url, params, timeout))
+
+
+def _begin_call() -> Tuple[str, float, bool]:
+    """
+    Reserve a key, then pass the circuit breaker. Returns (key, seconds to
+    wait before sending, whether the call is the breaker's half-open trial).
+    The key comes first so a call refused by the rate limiter never takes
+    the trial; a call refused by the breaker gives its reservation back.
+    A trial must end in a recorded outcome or breaker.release_trial.
+    """
+    key, delay = key_pool.reserve()
+    try:
+        trial = breaker.before_call()
+    except CircuitOpenError:
+        key_pool.refund(key)
+        raise
+    return key, delay, trial
+
+
+def _fetch(url: str, params: dict, timeout: Optional[float]) -> Response:
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(backoff_delay(attempt - 1, BACKOFF_BASE, BACKOFF_MAX))
+        key, delay, trial = _begin_call()
+        try:
+            if delay > 0:
+                time.sleep(delay)
+            response = _send(url, dict(params, apikey=key), timeout or REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            breaker.record_failure()
+            if attempt == MAX_RETRIES:
+                raise
+            continue
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release_trial(trial)
+            raise
+        if not _should_retry(response, key):
+            break
+    return _finish(params, response)
+
+
+def _send(url: str, params: dict, timeout: float) -> Response:
+    """
+    Send one upstream request: on the shared session, or from the event loop
+    of the run_async call this thread is working for.
+    """
+    bridge = _bridge.get()
+    if bridge is not None:
+        return bridge.send(url, params, timeout)
+    raw = session.get(url, params=params, timeout=timeout)
+    return Response(raw.status_code, raw.content, raw.url)
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+            ),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def async_http_get(url: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> Response:
+    """
+    Async counterpart of http_get using a shared httpx.AsyncClient. Transport
+    errors are re-raised as requests exceptions so callers handle both paths
+    the same way.
+    """
+    _check_request(params)
+    params = _clean_params(params)
+    cached = _cached(params)
+    if cached is not None:
+        response, fresh = cached
+        if not fresh:
+            _revalidate_async(url, params, timeout)
+        return response
+    return await async_inflight.do(cache_key(params), lambda: _fetch_async(url, params, timeout))
+
+
+async def _send_async(url: str, params: dict, timeout: float) -> Response:
+    # httpx errors become the requests exceptions the sync path raises
+    try:
+        raw = await _get_async_client().get(url, params=params, timeout=timeout)
+    except httpx.TimeoutException as e:
+        raise requests.Timeout(str(e))
+    except httpx.HTTPError as e:
+        raise requests.ConnectionError(str(e))
+    return Response(raw.status_code, raw.content, str(raw.url))
+
+
+async def _fetch_async(url: str, params: dict, timeout: Optional[float]) -> Response:
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(backoff_delay(attempt - 1, BACKOFF_BASE, BACKOFF_MAX))
+        key, delay, trial = _begin_call()
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            response = await _send_async(url, dict(params, apikey=key), timeout or REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            breaker.record_failure()
+            if attempt == MAX_RETRIES:
+                raise
+            continue
+        except BaseException:
+            # Cancelled, e.g. by a batch timeout
+            breaker.release_trial(trial)
+            raise
+        if not _should_retry(response, key):
+            break
+    return _finish(params, response)
+
+
+class _LoopBridge:
+    """
+    Lets a fetcher running on a worker thread send its upstream requests on
+    the async client of the event loop that is waiting for it.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.cancelled = False
+        # Age of the oldest stale reply the fetcher was served, if any
+        self.stale_age: Optional[float] = None
+        self._pending: Optional[Future] = None
+
+    def send(self, url: str, params: dict, timeout: float) -> Response:
+        if self.cancelled:
+            raise CancelledError()
+        self._pending = asyncio.run_coroutine_threadsafe(_send_async(url, params, timeout), self.loop)
+        try:
+            return self._pending.result()
+        finally:
+            self._pending = None
+
+    def cancel(self) -> None:
+        # The thread cannot be interrupted, but it sends nothing more
+        self.cancelled = True
+        pending = self._pending
+        if pending is not None:
+            pending.cancel()
+
+
+async def run_async(fetcher: Callable, *args, **kwargs):
+    """
+    Run a tools.py fetcher without blocking the event loop.
+
+    The fetcher runs on a worker thread with everything it does locally:
+    cache and store lookups, rate limiter transactions, parsing and
+    indicator math. Only its upstream requests are awaited on the loop, on
+    the shared async client, so parsing logic lives in a single place for
+    both the sync and the async path.
+
+    A dict result built from a stale cached reply gets the "_cache" flag,
+    also when the fetcher returned only part of the payload.
+    """
+    bridge = _LoopBridge(asyncio.get_running_loop())
+    token = _bridge.set(bridge)
+    try:
+        # to_thread runs the fetcher in a copy of this context
+        result = await asyncio.to_thread(fetcher, *args, **kwargs)
+        if bridge.stale_age is not None and isinstance(result, dict) and "_cache" not in result:
+            result = dict(result, _cache={"stale": True, "age_seconds": round(bridge.stale_age, 1)})
+        return result
+    except asyncio.CancelledError:
+        bridge.cancel()
+        raise
+    finally:
+        _bridge.reset(token)
+
+
+def run_batch(fetcher: Callable, calls: List[tuple], timeout: Optional[float] = None) -> list:
+    """
+    Run fetcher(*args) for every args tuple in calls on a thread pool. Returns
+    one outcome per call, in order: its result, the exception it raised, or a
+    TimeoutError if it had not finished within timeout seconds.
+    """
+    outcomes = [TimeoutError("Timed out before a result was available")] * len(calls)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(BATCH_CONCURRENCY, len(calls))))
+    futures = {executor.submit(fetcher, *args): i for i, args in enumerate(calls)}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            error = future.exception()
+            outcomes[futures[future]] = error if error is not None else future.result()
+    except TimeoutError:
+        pass
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return outcomes
+
+
+async def run_async_batch(fetcher: Callable, calls: List[tuple], timeout: Optional[float] = None) -> list:
+    """
+    Async counterpart of run_batch: every call goes through run_async, at most
+    BATCH_CONCURRENCY at a time, and calls still running at the timeout are
+    cancelled.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_one(args: tuple):
+        async with semaphore:
+            return await run_async(fetcher, *args)
+
+    tasks = [asyncio.ensure_future(run_one(args)) for args in calls]
+    if not tasks:
+        return []
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    outcomes = []
+    for task in tasks:
+        if task in pending:
+            outcomes.append(TimeoutError("Timed out before a result was available"))
+        elif task.exception() is not None:
+            outcomes.append(task.exception())
+        else:
+            outcomes.append(task.result())
+    return outcomes
+
+
+async def close_async_client() -> None:
+    """
+    Close the shared async client, e.g. on server shutdown.
+    """
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
@@ -0,0 +1,343 @@
+import json
+import re
+import warnings
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Alpha Vantage sends every bar as its own dict of numeric strings keyed like
+# "1. open" or "1a. open (USD)". A Frame holds the same bars as int64 epoch
+# seconds plus one float64 array per field, sorted oldest first, which is
+# about a tenth of the memory and makes latest-bar and range lookups O(1) and
+# O(log n).
+
+# End of the series object: the closing brace of its last bar and its own
+_SECTION_END = re.compile(rb'\}\s*\}')
+
+
+def column_name(key: str) -> str:
+    """
+    Frame column of an Alpha Vantage bar field: "1. open" -> "open",
+    "5. adjusted close" -> "adjusted_close", "1a. open (USD)" -> "open".
+    """
+    name = key.split(". ", 1)[-1].split(" (", 1)[0]
+    return name.strip().lower().replace(" ", "_")
+
+
+def to_epoch(timestamps: Union[str, Sequence[str]]) -> Union[int, np.ndarray]:
+    """
+    Epoch seconds of "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS" timestamps.
+    """
+    if isinstance(timestamps, str):
+        return int(np.datetime64(timestamps, "s").astype(np.int64))
+    return np.array(timestamps, dtype="datetime64[s]").astype(np.int64)
+
+
+def format_timestamps(epochs: np.ndarray, daily: bool) -> List[str]:
+    """
+    Alpha Vantage style timestamps of epoch seconds, dates only when daily.
+    """
+    stamps = np.asarray(epochs, dtype=np.int64).astype("datetime64[s]")
+    if daily:
+        return np.datetime_as_string(stamps.astype("datetime64[D]")).tolist()
+    return np.char.replace(np.datetime_as_string(stamps), "T", " ").tolist()
+
+
+class Frame:
+    """
+    Columnar OHLCV bars: `timestamps` is an ascending int64 array of epoch
+    seconds and `columns` maps field names (open, high, low, close, volume,
+    adjusted_close, ...) to float64 arrays of the same length. `daily` marks
+    date-only timestamps, so labels() gives back Alpha Vantage's format.
+    """
+
+    __slots__ = ("timestamps", "columns", "daily")
+
+    def __init__(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray], daily: bool):
+        self.timestamps = timestamps
+        self.columns = columns
+        self.daily = daily
+
+    @classmethod
+    def from_bars(cls, bars: dict) -> "Frame":
+        """
+        Parse an already decoded {timestamp: {field: "value"}} payload.
+        """
+        rows = list(bars.values())
+        keys = list(dict.fromkeys(key for row in rows for key in row))
+        values = np.column_stack([_parse_values([row.get(key, "nan") for row in rows]) for key in keys]) \
+            if keys else np.empty((len(rows), 0))
+        return _frame(list(bars), keys, values)
+
+    @classmethod
+    def empty(cls, daily: bool = True) -> "Frame":
+        return cls(np.empty(0, dtype=np.int64), {}, daily)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    def labels(self) -> List[str]:
+        return format_timestamps(self.timestamps, self.daily)
+
+    def take(self, rows) -> "Frame":
+        """
+        Frame of the given row selection (slice, index array or mask).
+        """
+        return Frame(self.timestamps[rows], {name: values[rows] for name, values in self.columns.items()},
+                     self.daily)
+
+    def tail(self, n: Optional[int]) -> "Frame":
+        return self if n is None or n >= len(self) else self.take(slice(len(self) - n, None))
+
+    def latest(self) -> Optional[Tuple[str, Dict[str, float]]]:
+        """
+        (timestamp, {column: value}) of the newest bar.
+        """
+        if not len(self):
+            return None
+        return (format_timestamps(self.timestamps[-1:], self.daily)[0],
+                {name: float(values[-1]) for name, values in self.columns.items()})
+
+    def index(self, timestamp: str) -> int:
+        """
+        Row of the first bar at or after timestamp.
+        """
+        return int(np.searchsorted(self.timestamps, to_epoch(timestamp), side="left"))
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> "Frame":
+        """
+        Bars with start <= timestamp <= end, as views into this frame.
+        """
+        first = 0 if start is None else self.index(start)
+        last = len(self) if end is None else int(np.searchsorted(self.timestamps, to_epoch(end), side="right"))
+        return self.take(slice(first, max(first, last)))
+
+    def merge(self, other: "Frame") -> "Frame":
+        """
+        Union of two frames by timestamp; bars of `other` replace ours.
+        """
+        if not len(self):
+            return other
+        if not len(other):
+            return self
+        keep = ~np.isin(self.timestamps, other.timestamps)
+        timestamps = np.concatenate([self.timestamps[keep], other.timestamps])
+        columns = {}
+        for name in dict.fromkeys(list(self.columns) + list(other.columns)):
+            ours = self.columns.get(name, np.full(len(self), np.nan))[keep]
+            theirs = other.columns.get(name, np.full(len(other), np.nan))
+            columns[name] = np.concatenate([ours, theirs])
+        order = np.argsort(timestamps, kind="stable")
+        return Frame(timestamps, columns, self.daily and other.daily).take(order)
+
+    def prices(self) -> Dict[str, np.ndarray]:
+        """
+        Split and dividend adjusted open/high/low/close plus volume. Series
+        without an adjusted close are returned as they are, and missing
+        volume (FX) is 0.
+        """
+        close = self.columns.get("close", np.full(len(self), np.nan))
+        adjusted = self.columns.get("adjusted_close", close)
+        factor = np.divide(adjusted, close, out=np.ones(len(self)), where=close != 0)
+        return {
+            "open": self.columns.get("open", close) * factor,
+            "high": self.columns.get("high", close) * factor,
+            "low": self.columns.get("low", close) * factor,
+            "close": adjusted,
+            "volume": self.columns.get("volume", np.zeros(len(self))),
+        }
+
+    def to_bars(self) -> dict:
+        """
+        The bars in Alpha Vantage's {timestamp: {"1. open": "value", ...}}
+        shape, newest first. Fields are numbered in column order, which is
+        payload order; volumes are whole numbers and everything else gets
+        four decimals, as in the JSON payloads.
+        """
+        keys = [f"{i}. {name.replace('_', ' ')}" for i, name in enumerate(self.columns, 1)]
+        formats = ["{:.0f}" if name == "volume" else "{:.4f}" for name in self.columns]
+        columns = [values.tolist() for values in self.columns.values()]
+        labels = self.labels()
+        bars = {}
+        for i in range(len(self) - 1, -1, -1):
+            # NaN marks a field the bar did not have
+            bars[labels[i]] = {key: fmt.format(values[i]) for key, fmt, values in zip(keys, formats, columns)
+                               if values[i] == values[i]}
+        return bars
+
+    def dump(self) -> Tuple[str, bytes, bytes]:
+        """
+        Serialize as (column names, timestamp bytes, value bytes).
+        """
+        names = ",".join(self.columns)
+        values = np.stack(list(self.columns.values())) if self.columns else np.empty((0, len(self)))
+        return names, self.timestamps.astype("<i8").tobytes(), values.astype("<f8").tobytes()
+
+    @classmethod
+    def load(cls, names: str, timestamps: bytes, values: bytes, daily: bool) -> "Frame":
+        stamps = np.frombuffer(timestamps, dtype="<i8")
+        names = names.split(",") if names else []
+        matrix = np.frombuffer(values, dtype="<f8").reshape(len(names), len(stamps))
+        return cls(stamps, dict(zip(names, matrix)), daily)
+
+
+def parse_series(content: bytes, data_key: str) -> Optional[Frame]:
+    """
+    Parse the bars under `data_key` of a raw time series payload straight
+    into a Frame, without decoding the body into nested dicts. Returns None
+    when the payload has no bars under that key (an error or throttling
+    reply).
+
+    Bars are flat objects of string fields, so the positions of the quotes
+    and braces locate every token; numbers are then converted in one pass.
+    Payloads that do not have that regular layout are decoded normally.
+    """
+    start = content.find(json.dumps(data_key).encode())
+    start = content.find(b"{", start) if start >= 0 else -1
+    end = _SECTION_END.search(content, start) if start >= 0 else None
+    if end is None:
+        return None
+    data = np.frombuffer(content, np.uint8, end.end() - start, start)
+    # Every "{" but the section's own opens a bar, every "}" but its own closes one
+    opens = np.flatnonzero(data == ord("{"))[1:]
+    closes = np.flatnonzero(data == ord("}"))[:-1]
+    quotes = np.flatnonzero(data == ord('"'))
+    if not len(opens):
+        return None
+    # Per bar: the quoted timestamp, then a quoted key and value per field
+    width = np.count_nonzero(quotes < closes[0])
+    if (len(closes) != len(opens) or width < 2 or (width - 2) % 4 or len(quotes) != len(opens) * width):
+        return _parse_decoded(content, data_key)
+    q = quotes.reshape(len(opens), width)
+    if not (np.all(q[:, 1] < opens) and np.all(q[:, 2] > opens) and np.all(q[:, -1] < closes)
+            and np.all(closes[:-1] < opens[1:])):
+        return _parse_decoded(content, data_key)
+
+    def token(a: int, b: int) -> str:
+        return content[start + a + 1:start + b].decode()
+
+    labels = [token(a, b) for a, b in zip(q[:, 0].tolist(), q[:, 1].tolist())]
+    keys = [token(a, b) for a, b in zip(q[0, 2::4].tolist(), q[0, 3::4].tolist())]
+    values = _parse_tokens(data, q[:, 4::4].ravel(), q[:, 5::4].ravel()).reshape(len(labels), len(keys))
+    return _frame(labels, keys, values)
+
+
+def _parse_decoded(content: bytes, data_key: str) -> Optional[Frame]:
+    data = json.loads(content)
+    bars = data.get(data_key) if isinstance(data, dict) else None
+    if not bars:
+        return None
+    return Frame.from_bars(bars)
+
+
+def _parse_tokens(data: np.ndarray, opening: np.ndarray, closing: np.ndarray) -> np.ndarray:
+    """
+    Floats of the quoted tokens between the given quote positions.
+    """
+    # Keep only the characters inside the tokens plus their closing quote,
+    # which becomes the separator
+    marker = np.zeros(len(data) + 1, dtype=np.int8)
+    marker[opening + 1] = 1
+    marker[closing] = -1
+    keep = np.cumsum(marker[:-1], dtype=np.int8).view(bool)
+    keep[closing] = True
+    text = data[keep].tobytes().replace(b'"', b" ")
+    try:
+        with warnings.catch_warnings():
+            # Older numpy only warns when a token does not parse
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(text, sep=" ")
+        if len(values) == len(opening):
+            return values
+    except (ValueError, DeprecationWarning):
+        pass
+    # Some token is not a number: convert them one by one
+    return _parse_values([data[a + 1:b].tobytes() for a, b in zip(opening.tolist(), closing.tolist())])
+
+
+def parse_csv_series(content: bytes) -> Optional[Frame]:
+    """
+    Parse a datatype=csv time series into a Frame with the JSON format's
+    field names, like parse_series. Returns None for error replies, which
+    Alpha Vantage sends as JSON even when CSV was asked for.
+    """
+    table = _csv_table(content)
+    if table is None:
+        return None
+    keys, labels, columns = table
+    values = np.column_stack([_parse_values(column) for column in columns])
+    return _frame(labels, keys, values)
+
+
+def csv_bars(content: bytes) -> Optional[dict]:
+    """
+    A datatype=csv time series in the JSON format's shape,
+    {timestamp: {"1. open": "value", ...}}, newest first. None for error
+    replies.
+    """
+    table = _csv_table(content)
+    if table is None:
+        return None
+    keys, labels, columns = table
+    return {label: dict(zip(keys, row)) for label, row in zip(labels, zip(*columns))}
+
+
+def _csv_table(content: bytes) -> Optional[Tuple[List[str], List[str], List[List[str]]]]:
+    """
+    (JSON field names, timestamps, value columns of strings) of a CSV time
+    series, in payload order. The CSV columns are the JSON fields in the
+    same order, so "adjusted_close" in fifth place is "5. adjusted close".
+    """
+    text = content.decode("utf-8", errors="replace").replace("\r", "").strip()
+    if not text or text[0] in "{[":
+        return None
+    header, _, body = text.partition("\n")
+    names = header.split(",")
+    # Time series fields are never quoted, so the rows split in one go
+    tokens = body.replace("\n", ",").split(",") if body else []
+    if len(names) < 2 or not tokens or len(tokens) % len(names):
+        return None
+    keys = [f"{i}. {name.strip().replace('_', ' ')}" for i, name in enumerate(names[1:], 1)]
+    step = len(names)
+    return keys, tokens[::step], [tokens[i::step] for i in range(1, step)]
+
+
+def _parse_values(raw: list) -> np.ndarray:
+    try:
+        return np.array(raw, dtype=np.float64)
+    except ValueError:
+        # Odd values such as "None" or "-" become NaN instead of failing the frame
+        return np.array([_to_float(value) for value in raw], dtype=np.float64)
+
+
+def _frame(labels: List[str], keys: List[str], values: np.ndarray) -> Frame:
+    """
+    Frame of (bars x fields) values in payload order. The first field
+    mapping to a column wins, so for digital currencies the market currency
+    prices are kept.
+    """
+    fields = {}
+    for i, key in enumerate(keys):
+        fields.setdefault(column_name(key), i)
+    timestamps = to_epoch(labels)
+    daily = bool(labels) and all(len(label) == 10 for label in labels)
+    # Payloads come newest first; sort once here
+    order = np.argsort(timestamps, kind="stable")
+    return Frame(timestamps[order], {name: values[order, i] for name, i in fields.items()}, daily)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
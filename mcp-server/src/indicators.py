@@ -0,0 +1,607 @@
+import math
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Indicators are computed on float64 arrays with time along axis 0, oldest
+# bar first. A 2-D array (bars x symbols) computes one column per symbol.
+# Warm-up bars, where an indicator is not defined yet, are NaN. Numerics
+# follow TA-Lib, which Alpha Vantage's technical indicator endpoints use.
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _windows(x: np.ndarray, period: int) -> np.ndarray:
+    # Shape (len(x) - period + 1, ..., period), the window on the last axis
+    return sliding_window_view(x, period, axis=0)
+
+
+def _filter(x: np.ndarray, alpha, seed: np.ndarray) -> np.ndarray:
+    """
+    Recursive smoother out[i] = out[i-1] + alpha[i] * (x[i] - out[i-1]).
+    Each column starts at the first bar where `seed` is defined, so series
+    with different amounts of history can share one matrix.
+    """
+    alpha = np.broadcast_to(alpha, x.shape)
+    if x.ndim == 1:
+        # Plain floats are several times faster than 0-d array operations
+        out = seed.tolist()
+        prev = math.nan
+        for i, (value, a) in enumerate(zip(x.tolist(), alpha.tolist())):
+            prev = out[i] if prev != prev else prev + a * (value - prev)
+            out[i] = prev
+        return np.array(out, dtype=np.float64)
+    out = np.full(x.shape, np.nan)
+    prev = np.full(x.shape[1:], np.nan)
+    for i in range(len(x)):
+        prev = np.where(np.isnan(prev), seed[i], prev + alpha[i] * (x[i] - prev))
+        out[i] = prev
+    return out
+
+
+def sma(values, period: int) -> np.ndarray:
+    x = _as_float(values)
+    out = np.full(x.shape, np.nan)
+    if 0 < period <= len(x):
+        out[period - 1:] = _windows(x, period).mean(axis=-1)
+    return out
+
+
+def ema(values, period: int, alpha: Optional[float] = None) -> np.ndarray:
+    """
+    Exponential moving average seeded with the SMA of its first window.
+    """
+    x = _as_float(values)
+    if alpha is None:
+        alpha = 2.0 / (period + 1)
+    return _filter(x, alpha, sma(x, period))
+
+
+def wma(values, period: int) -> np.ndarray:
+    x = _as_float(values)
+    out = np.full(x.shape, np.nan)
+    if 0 < period <= len(x):
+        weights = np.arange(1, period + 1, dtype=np.float64)
+        out[period - 1:] = _windows(x, period) @ weights / weights.sum()
+    return out
+
+
+def dema(values, period: int) -> np.ndarray:
+    e1 = ema(values, period)
+    return 2 * e1 - ema(e1, period)
+
+
+def tema(values, period: int) -> np.ndarray:
+    e1 = ema(values, period)
+    e2 = ema(e1, period)
+    return 3 * e1 - 3 * e2 + ema(e2, period)
+
+
+def trima(values, period: int) -> np.ndarray:
+    """
+    Triangular moving average: an SMA of an SMA, the two windows splitting
+    the period between them.
+    """
+    if period % 2:
+        first = second = (period + 1) // 2
+    else:
+        first, second = period // 2, period // 2 + 1
+    return sma(sma(values, first), second)
+
+
+def kama(values, period: int, fast: int = 2, slow: int = 30) -> np.ndarray:
+    """
+    Kaufman adaptive moving average. The smoothing constant moves between
+    the fast and slow EMA constants with the efficiency ratio of the window.
+    """
+    x = _as_float(values)
+    if not 0 < period < len(x):
+        return np.full(x.shape, np.nan)
+    fast_sc, slow_sc = 2.0 / (fast + 1), 2.0 / (slow + 1)
+    change = np.full(x.shape, np.nan)
+    change[period:] = np.abs(x[period:] - x[:-period])
+    volatility = np.full(x.shape, np.nan)
+    volatility[period:] = _windows(np.abs(np.diff(x, axis=0)), period).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        er = np.where(volatility > 0, change / volatility, 0.0)
+    er[np.isnan(volatility)] = np.nan
+    sc = (er * (fast_sc - slow_sc) + slow_sc) ** 2
+    # The first value smooths from the previous price
+    seed = np.full(x.shape, np.nan)
+    seed[1:] = x[:-1] + sc[1:] * (x[1:] - x[:-1])
+    return _filter(x, sc, seed)
+
+
+def t3(values, period: int, vfactor: float = 0.7) -> np.ndarray:
+    """
+    Tillson T3: six chained EMAs combined with coefficients from vfactor.
+    """
+    a = vfactor
+    c1 = -a ** 3
+    c2 = 3 * a ** 2 + 3 * a ** 3
+    c3 = -6 * a ** 2 - 3 * a - 3 * a ** 3
+    c4 = 1 + 3 * a + a ** 3 + 3 * a ** 2
+    e1 = ema(values, period)
+    e2 = ema(e1, period)
+    e3 = ema(e2, period)
+    e4 = ema(e3, period)
+    e5 = ema(e4, period)
+    e6 = ema(e5, period)
+    return c1 * e6 + c2 * e5 + c3 * e4 + c4 * e3
+
+
+def _shift(x: np.ndarray, periods: int) -> np.ndarray:
+    # Value `periods` bars back, NaN where there is none
+    out = np.full(x.shape, np.nan)
+    if 0 < periods < len(x):
+        out[periods:] = x[:-periods]
+    return out
+
+
+def _rolling(x: np.ndarray, period: int, reduce) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if 0 < period <= len(x):
+        out[period - 1:] = reduce(_windows(x, period), axis=-1)
+    return out
+
+
+def _wilder(values: np.ndarray, period: int) -> np.ndarray:
+    # Wilder smoothing, an EMA with alpha = 1 / period
+    return ema(values, period, alpha=1.0 / period)
+
+
+def _gains_losses(x: np.ndarray, period: int):
+    change = x - _shift(x, 1)
+    return _wilder(np.where(change > 0, change, 0.0 * change), period), \
+        _wilder(np.where(change < 0, -change, 0.0 * change), period)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray, scale: float = 100.0) -> np.ndarray:
+    # TA-Lib reports 0 where the denominator vanishes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = scale * numerator / denominator
+    out[denominator == 0] = 0.0
+    return out
+
+
+def rsi(values, period: int) -> np.ndarray:
+    x = _as_float(values)
+    gain, loss = _gains_losses(x, period)
+    return _ratio(gain, gain + loss)
+
+
+def cmo(values, period: int) -> np.ndarray:
+    x = _as_float(values)
+    gain, loss = _gains_losses(x, period)
+    return _ratio(gain - loss, gain + loss)
+
+
+def mom(values, period: int) -> np.ndarray:
+    x = _as_float(values)
+    return x - _shift(x, period)
+
+
+def roc(values, period: int) -> np.ndarray:
+    x = _as_float(values)
+    previous = _shift(x, period)
+    return _ratio(x - previous, previous)
+
+
+def rocr(values, period: int) -> np.ndarray:
+    x = _as_float(values)
+    return _ratio(x, _shift(x, period), scale=1.0)
+
+
+def _fast_k(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    highest = _rolling(high, period, np.max)
+    lowest = _rolling(low, period, np.min)
+    return _ratio(close - lowest, highest - lowest)
+
+
+def stochf(high, low, close, fastk_period: int = 5, fastd_period: int = 3):
+    """
+    Fast stochastic. Returns (FastK, FastD).
+    """
+    fast_k = _fast_k(_as_float(high), _as_float(low), _as_float(close), fastk_period)
+    return fast_k, sma(fast_k, fastd_period)
+
+
+def stoch(high, low, close, fastk_period: int = 5, slowk_period: int = 3, slowd_period: int = 3):
+    """
+    Slow stochastic with SMA smoothing. Returns (SlowK, SlowD).
+    """
+    slow_k = sma(_fast_k(_as_float(high), _as_float(low), _as_float(close), fastk_period), slowk_period)
+    return slow_k, sma(slow_k, slowd_period)
+
+
+def stochrsi(values, period: int, fastk_period: int = 5, fastd_period: int = 3):
+    """
+    Fast stochastic of the RSI. Returns (FastK, FastD).
+    """
+    r = rsi(values, period)
+    return stochf(r, r, r, fastk_period, fastd_period)
+
+
+def willr(high, low, close, period: int) -> np.ndarray:
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    highest = _rolling(high, period, np.max)
+    lowest = _rolling(low, period, np.min)
+    return _ratio(close - highest, highest - lowest)
+
+
+def cci(high, low, close, period: int) -> np.ndarray:
+    typical = (_as_float(high) + _as_float(low) + _as_float(close)) / 3
+    out = np.full(typical.shape, np.nan)
+    if 0 < period <= len(typical):
+        windows = _windows(typical, period)
+        mean = windows.mean(axis=-1)
+        deviation = np.abs(windows - mean[..., None]).mean(axis=-1)
+        out[period - 1:] = _ratio(typical[period - 1:] - mean, 0.015 * deviation, scale=1.0)
+    return out
+
+
+def _wilder_sum(values: np.ndarray, period: int) -> np.ndarray:
+    # TA-Lib seeds smoothed DM and TR with period - 1 bars, then applies one
+    # Wilder step; in average form that is the filter below
+    seed = np.full(values.shape, np.nan)
+    if period < len(values):
+        head = _rolling(values, period - 1, np.sum) if period > 1 else np.zeros(values.shape)
+        seed[1:] = (head[:-1] * (1 - 1.0 / period) + values[1:]) / period
+    return _filter(values, 1.0 / period, seed)
+
+
+def directional_movement(high, low, close, period: int = 14) -> Dict[str, np.ndarray]:
+    """
+    The directional movement family from one pass over the bars: PLUS_DI,
+    MINUS_DI, DX, ADX and ADXR.
+    """
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    up = high - _shift(high, 1)
+    down = _shift(low, 1) - low
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0 * up)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0 * down)
+    previous_close = _shift(close, 1)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+    true_range[np.isnan(previous_close)] = np.nan
+
+    smoothed_tr = _wilder_sum(true_range, period)
+    plus_di = _ratio(_wilder_sum(plus_dm, period), smoothed_tr)
+    minus_di = _ratio(_wilder_sum(minus_dm, period), smoothed_tr)
+    dx = _ratio(np.abs(plus_di - minus_di), plus_di + minus_di)
+    adx = _wilder(dx, period)
+    adxr = (adx + _shift(adx, period - 1)) / 2
+    return {"PLUS_DI": plus_di, "MINUS_DI": minus_di, "DX": dx, "ADX": adx, "ADXR": adxr}
+
+
+def bop(open_, high, low, close) -> np.ndarray:
+    return _ratio(_as_float(close) - _as_float(open_), _as_float(high) - _as_float(low), scale=1.0)
+
+
+MAMA_LOOKBACK = 32
+
+
+def _mama_1d(x: np.ndarray, fastlimit: float, slowlimit: float):
+    n = len(x)
+    mama_out = np.full(n, np.nan)
+    fama_out = np.full(n, np.nan)
+    smooth = np.zeros(n)
+    detrender = np.zeros(n)
+    i1 = np.zeros(n)
+    q1 = np.zeros(n)
+    i2 = q2 = re = im = 0.0
+    period = phase = 0.0
+    mama_value = fama_value = 0.0
+
+    def hilbert(series, i, factor):
+        return (0.0962 * series[i] + 0.5769 * series[i - 2]
+                - 0.5769 * series[i - 4] - 0.0962 * series[i - 6]) * factor
+
+    for i in range(n):
+        if i < 3:
+            mama_value = fama_value = x[i]
+            continue
+        smooth[i] = (4 * x[i] + 3 * x[i - 1] + 2 * x[i - 2] + x[i - 3]) / 10
+        factor = 0.075 * period + 0.54
+        if i >= 6:
+            detrender[i] = hilbert(smooth, i, factor)
+            q1[i] = hilbert(detrender, i, factor)
+            i1[i] = detrender[i - 3]
+        if i >= 12:
+            ji = hilbert(i1, i, factor)
+            jq = hilbert(q1, i, factor)
+            prev_i2, prev_q2 = i2, q2
+            i2 = 0.2 * (i1[i] - jq) + 0.8 * prev_i2
+            q2 = 0.2 * (q1[i] + ji) + 0.8 * prev_q2
+            re = 0.2 * (i2 * prev_i2 + q2 * prev_q2) + 0.8 * re
+            im = 0.2 * (i2 * prev_q2 - q2 * prev_i2) + 0.8 * im
+            new_period = period
+            if im != 0 and re != 0:
+                new_period = 360 / math.degrees(math.atan(im / re))
+            if period:
+                new_period = min(max(new_period, 0.67 * period), 1.5 * period)
+            new_period = min(max(new_period, 6), 50)
+            period = 0.2 * new_period + 0.8 * period
+        new_phase = math.degrees(math.atan(q1[i] / i1[i])) if i1[i] != 0 else phase
+        delta = max(phase - new_phase, 1)
+        phase = new_phase
+        alpha = min(max(fastlimit / delta, slowlimit), fastlimit)
+        mama_value = alpha * x[i] + (1 - alpha) * mama_value
+        fama_value = 0.5 * alpha * mama_value + (1 - 0.5 * alpha) * fama_value
+        if i >= MAMA_LOOKBACK:
+            mama_out[i] = mama_value
+            fama_out[i] = fama_value
+    return mama_out, fama_out
+
+
+def mama(values, fastlimit: float = 0.5, slowlimit: float = 0.05):
+    """
+    Ehlers' MESA adaptive moving average. Returns (MAMA, FAMA). The Hilbert
+    transform is inherently sequential, so 2-D input runs column by column.
+    """
+    x = _as_float(values)
+    if x.ndim == 1:
+        return _mama_1d(x, fastlimit, slowlimit)
+    mama_out = np.full(x.shape, np.nan)
+    fama_out = np.full(x.shape, np.nan)
+    for j in range(x.shape[1]):
+        # Columns with less history start at their first bar
+        first = int(np.argmax(~np.isnan(x[:, j])))
+        mama_out[first:, j], fama_out[first:, j] = _mama_1d(x[first:, j], fastlimit, slowlimit)
+    return mama_out, fama_out
+
+
+def session_starts(timestamps: Sequence[str]) -> np.ndarray:
+    """
+    True at the first bar of each trading day of "YYYY-MM-DD HH:MM:SS"
+    intraday timestamps.
+    """
+    days = np.array([t[:10] for t in timestamps])
+    starts = np.ones(len(days), dtype=bool)
+    starts[1:] = days[1:] != days[:-1]
+    return starts
+
+
+def vwap(high, low, close, volume, starts: np.ndarray) -> np.ndarray:
+    """
+    Volume weighted average of the typical price, cumulated from the last
+    bar where `starts` is True.
+    """
+    high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    price_volume = (high + low + close) / 3 * volume
+    total_pv = np.cumsum(price_volume, axis=0)
+    total_volume = np.cumsum(volume, axis=0)
+    # Position of the session start for every bar, then the running totals
+    # just before it are subtracted
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(starts)), 0))
+    pv = total_pv - (total_pv - price_volume)[first]
+    vol = total_volume - (total_volume - volume)[first]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(vol > 0, pv / vol, np.nan)
+
+
+def anchored_vwap(high, low, close, volume, anchor: int) -> np.ndarray:
+    """
+    VWAP cumulated from bar index `anchor` onward, without session resets.
+    """
+    starts = np.zeros(len(_as_float(close)), dtype=bool)
+    if anchor >= len(starts):
+        return np.full(starts.shape + _as_float(close).shape[1:], np.nan)
+    starts[anchor] = True
+    out = vwap(high, low, close, volume, starts)
+    out[:anchor] = np.nan
+    return out
+
+
+# Moving average types by the integer codes Alpha Vantage's matype params use
+MA_TYPES = {
+    0: sma,
+    1: ema,
+    2: wma,
+    3: dema,
+    4: tema,
+    5: trima,
+    6: t3,
+    7: kama,
+    8: lambda values, period: mama(values)[0],
+}
+
+
+def moving_average(values, period: int, matype: int = 0) -> np.ndarray:
+    if matype not in MA_TYPES:
+        raise ValueError(f"Unsupported moving average type: {matype}")
+    return MA_TYPES[matype](values, period)
+
+
+def check_params(params: dict) -> None:
+    """
+    Reject periods below 1 and unknown moving average types before any
+    indicator math runs, where they would divide by zero or fail midway.
+    """
+    for name, value in params.items():
+        if name.endswith("period") and value < 1:
+            raise ValueError(f"{name} must be at least 1, got {value}")
+        if name.endswith("matype") and value not in MA_TYPES:
+            raise ValueError(f"Unsupported moving average type for {name}: {value}")
+
+
+def ma_lookback(period: int, matype: int = 0) -> int:
+    """
+    Number of leading bars a moving average leaves undefined.
+    """
+    if matype == 8:
+        return MAMA_LOOKBACK
+    if matype == 7:
+        return period
+    chained = {3: 2, 4: 3, 6: 6}.get(matype, 1)
+    return chained * (period - 1)
+
+
+def _fast_slow(values, fast: int, slow: int, fast_matype: int = 0, slow_matype: int = 0):
+    """
+    The fast and slow averages of a price oscillator. As in TA-Lib the fast
+    average starts where the slow one does, instead of at the first bar.
+    """
+    x = _as_float(values)
+    if slow < fast:
+        fast, slow, fast_matype, slow_matype = slow, fast, slow_matype, fast_matype
+    slow_line = moving_average(x, slow, slow_matype)
+    offset = max(ma_lookback(slow, slow_matype) - ma_lookback(fast, fast_matype), 0)
+    if x.ndim == 1:
+        fast_line = np.full(x.shape, np.nan)
+        if offset < len(x):
+            fast_line[offset:] = moving_average(x[offset:], fast, fast_matype)
+        return fast_line, slow_line
+    # In a matrix every column starts `offset` bars after its own first bar,
+    # so symbols with less history get the values they would get alone
+    rows = np.arange(len(x)).reshape((-1,) + (1,) * (x.ndim - 1))
+    first = np.argmax(~np.isnan(x), axis=0)
+    fast_line = moving_average(np.where(rows >= first + offset, x, np.nan), fast, fast_matype)
+    return fast_line, slow_line
+
+
+def macdext(values, fast: int = 12, slow: int = 26, signal: int = 9,
+            fast_matype: int = 0, slow_matype: int = 0, signal_matype: int = 0):
+    """
+    MACD with a selectable average for each line. Returns (MACD, signal,
+    histogram).
+    """
+    fast_line, slow_line = _fast_slow(values, fast, slow, fast_matype, slow_matype)
+    line = fast_line - slow_line
+    signal_line = moving_average(line, signal, signal_matype)
+    return line, signal_line, line - signal_line
+
+
+def macd(values, fast: int = 12, slow: int = 26, signal: int = 9):
+    return macdext(values, fast, slow, signal, 1, 1, 1)
+
+
+def apo(values, fast: int = 12, slow: int = 26, matype: int = 0) -> np.ndarray:
+    fast_line, slow_line = _fast_slow(values, fast, slow, matype, matype)
+    return fast_line - slow_line
+
+
+def ppo(values, fast: int = 12, slow: int = 26, matype: int = 0) -> np.ndarray:
+    fast_line, slow_line = _fast_slow(values, fast, slow, matype, matype)
+    return _ratio(fast_line - slow_line, slow_line)
+
+
+
+def _price(c: dict, p: dict) -> np.ndarray:
+    return c[p["series_type"]]
+
+
+def _hlc(c: dict):
+    return c["high"], c["low"], c["close"]
+
+
+def _session_vwap(columns: dict) -> np.ndarray:
+    # Daily and longer bars have no sessions to restart from, and Alpha
+    # Vantage only serves VWAP for intraday intervals
+    if any(len(timestamp) <= 10 for timestamp in columns["timestamp"]):
+        raise ValueError("VWAP is only available for intraday intervals")
+    return vwap(*_hlc(columns), columns["volume"], session_starts(columns["timestamp"]))
+
+
+# Spec driven evaluation for tools that compute many indicators at once.
+# Each entry is (defaults, compute): the parameters an indicator accepts,
+# by Alpha Vantage's names, and a function from the OHLCV columns (plus
+# "timestamp") and those parameters to {output: values}.
+INDICATOR_SPECS = {
+    "SMA": ({"time_period": 20, "series_type": "close"},
+            lambda c, p: {"SMA": sma(_price(c, p), p["time_period"])}),
+    "EMA": ({"time_period": 20, "series_type": "close"},
+            lambda c, p: {"EMA": ema(_price(c, p), p["time_period"])}),
+    "WMA": ({"time_period": 20, "series_type": "close"},
+            lambda c, p: {"WMA": wma(_price(c, p), p["time_period"])}),
+    "DEMA": ({"time_period": 20, "series_type": "close"},
+             lambda c, p: {"DEMA": dema(_price(c, p), p["time_period"])}),
+    "TEMA": ({"time_period": 20, "series_type": "close"},
+             lambda c, p: {"TEMA": tema(_price(c, p), p["time_period"])}),
+    "TRIMA": ({"time_period": 20, "series_type": "close"},
+              lambda c, p: {"TRIMA": trima(_price(c, p), p["time_period"])}),
+    "KAMA": ({"time_period": 20, "series_type": "close"},
+             lambda c, p: {"KAMA": kama(_price(c, p), p["time_period"])}),
+    "T3": ({"time_period": 20, "series_type": "close"},
+           lambda c, p: {"T3": t3(_price(c, p), p["time_period"])}),
+    "MAMA": ({"fastlimit": 0.01, "slowlimit": 0.01, "series_type": "close"},
+             lambda c, p: dict(zip(("MAMA", "FAMA"), mama(_price(c, p), p["fastlimit"], p["slowlimit"])))),
+    "RSI": ({"time_period": 14, "series_type": "close"},
+            lambda c, p: {"RSI": rsi(_price(c, p), p["time_period"])}),
+    "CMO": ({"time_period": 14, "series_type": "close"},
+            lambda c, p: {"CMO": cmo(_price(c, p), p["time_period"])}),
+    "MOM": ({"time_period": 10, "series_type": "close"},
+            lambda c, p: {"MOM": mom(_price(c, p), p["time_period"])}),
+    "ROC": ({"time_period": 10, "series_type": "close"},
+            lambda c, p: {"ROC": roc(_price(c, p), p["time_period"])}),
+    "ROCR": ({"time_period": 10, "series_type": "close"},
+             lambda c, p: {"ROCR": rocr(_price(c, p), p["time_period"])}),
+    "STOCH": ({"fastkperiod": 5, "slowkperiod": 3, "slowdperiod": 3},
+              lambda c, p: dict(zip(("SlowK", "SlowD"), stoch(*_hlc(c), p["fastkperiod"], p["slowkperiod"],
+                                                               p["slowdperiod"])))),
+    "STOCHF": ({"fastkperiod": 5, "fastdperiod": 3},
+               lambda c, p: dict(zip(("FastK", "FastD"), stochf(*_hlc(c), p["fastkperiod"], p["fastdperiod"])))),
+    "STOCHRSI": ({"time_period": 14, "series_type": "close", "fastkperiod": 5, "fastdperiod": 3},
+                 lambda c, p: dict(zip(("FastK", "FastD"), stochrsi(_price(c, p), p["time_period"],
+                                                                    p["fastkperiod"], p["fastdperiod"])))),
+    "WILLR": ({"time_period": 14}, lambda c, p: {"WILLR": willr(*_hlc(c), p["time_period"])}),
+    "CCI": ({"time_period": 20}, lambda c, p: {"CCI": cci(*_hlc(c), p["time_period"])}),
+    "BOP": ({}, lambda c, p: {"BOP": bop(c["open"], *_hlc(c))}),
+    "MACD": ({"fastperiod": 12, "slowperiod": 26, "signalperiod": 9, "series_type": "close"},
+             lambda c, p: dict(zip(("MACD", "MACD_Signal", "MACD_Hist"),
+                                   macd(_price(c, p), p["fastperiod"], p["slowperiod"], p["signalperiod"])))),
+    "MACDEXT": ({"fastperiod": 12, "slowperiod": 26, "signalperiod": 9, "fastmatype": 0, "slowmatype": 0,
+                 "signalmatype": 0, "series_type": "close"},
+                lambda c, p: dict(zip(("MACD", "MACD_Signal", "MACD_Hist"),
+                                      macdext(_price(c, p), p["fastperiod"], p["slowperiod"], p["signalperiod"],
+                                              p["fastmatype"], p["slowmatype"], p["signalmatype"])))),
+    "APO": ({"fastperiod": 12, "slowperiod": 26, "matype": 0, "series_type": "close"},
+            lambda c, p: {"APO": apo(_price(c, p), p["fastperiod"], p["slowperiod"], p["matype"])}),
+    "PPO": ({"fastperiod": 12, "slowperiod": 26, "matype": 0, "series_type": "close"},
+            lambda c, p: {"PPO": ppo(_price(c, p), p["fastperiod"], p["slowperiod"], p["matype"])}),
+    "ADX": ({"time_period": 14}, lambda c, p: {"ADX": directional_movement(*_hlc(c), p["time_period"])["ADX"]}),
+    "ADXR": ({"time_period": 14}, lambda c, p: {"ADXR": directional_movement(*_hlc(c), p["time_period"])["ADXR"]}),
+    "DX": ({"time_period": 14}, lambda c, p: {"DX": directional_movement(*_hlc(c), p["time_period"])["DX"]}),
+    "PLUS_DI": ({"time_period": 14},
+                lambda c, p: {"PLUS_DI": directional_movement(*_hlc(c), p["time_period"])["PLUS_DI"]}),
+    "MINUS_DI": ({"time_period": 14},
+                 lambda c, p: {"MINUS_DI": directional_movement(*_hlc(c), p["time_period"])["MINUS_DI"]}),
+    "VWAP": ({}, lambda c, p: {"VWAP": _session_vwap(c)}),
+}
+
+
+def evaluate(function: str, columns: dict, **params) -> Dict[str, np.ndarray]:
+    """
+    Compute one indicator spec, e.g. evaluate("RSI", columns, time_period=14).
+    Parameters default as in INDICATOR_SPECS and are coerced to the
+    default's type, so string values from JSON work too.
+    """
+    function = function.upper()
+    if function not in INDICATOR_SPECS:
+        raise ValueError(f"Unsupported indicator: {function}")
+    defaults, compute = INDICATOR_SPECS[function]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unsupported parameters for {function}: {', '.join(sorted(unknown))}")
+    p = dict(defaults)
+    p.update((name, type(defaults[name])(value)) for name, value in params.items())
+    check_params(p)
+    if "series_type" in p and p["series_type"] not in columns:
+        raise ValueError(f"Unsupported series type: {p['series_type']}")
+    return compute(columns, p)
+
+
+def to_av_series(timestamps: Sequence[str], columns: Dict[str, np.ndarray], decimals: int = 4) -> dict:
+    """
+    Format indicator columns in Alpha Vantage's technical analysis shape:
+    {timestamp: {name: "value"}}, newest first, warm-up bars left out.
+    """
+    defined = np.ones(len(timestamps), dtype=bool)
+    for values in columns.values():
+        defined &= ~np.isnan(values)
+    result = {}
+    for i in np.flatnonzero(defined)[::-1]:
+        result[timestamps[i]] = {name: f"{values[i]:.{decimals}f}" for name, values in columns.items()}
+    return result
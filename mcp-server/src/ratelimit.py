@@ -0,0 +1,321 @@
+import os
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+
+class RateLimitExceeded(requests.RequestException):
+    """
+    Raised when an upstream call cannot be scheduled within the allowed
+    queueing time, or the daily budget has been spent.
+    """
+
+
+class SharedBudget:
+    """
+    Limiter state kept in SQLite so every server process using the same cache
+    directory spends one budget per key. Each stdio session runs its own
+    process; without this, every reconnect would start with a fresh daily
+    budget and concurrent sessions would each spend the full minute budget.
+    Updates run in BEGIN IMMEDIATE transactions, so they are serialized
+    across processes; reads only take a WAL snapshot.
+    """
+
+    def __init__(self, directory: str, filename: str = "ratelimit.sqlite3"):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS budgets ("
+            " name TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated REAL NOT NULL,"
+            " day TEXT NOT NULL,"
+            " day_count INTEGER NOT NULL,"
+            " day_exhausted INTEGER NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, limiter: "RateLimiter"):
+        """
+        Load the limiter's stored state, run the block and store the result.
+        The state is left as it was if the block raises.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated, day, day_count, day_exhausted FROM budgets WHERE name = ?",
+                (limiter.name,),
+            ).fetchone()
+            if row is not None:
+                limiter._restore(row)
+            yield
+            conn.execute(
+                "INSERT OR REPLACE INTO budgets (name, tokens, updated, day, day_count, day_exhausted)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (limiter.name, limiter._tokens, limiter._updated, limiter._day, limiter._day_count,
+                 int(limiter._day_exhausted)),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def rows(self, names: List[str]) -> Dict[str, tuple]:
+        """
+        Stored state of several limiters by name, in one query and without
+        the write lock.
+        """
+        return {
+            row[0]: row[1:] for row in self._connection().execute(
+                "SELECT name, tokens, updated, day, day_count, day_exhausted FROM budgets"
+                f" WHERE name IN ({', '.join('?' * len(names))})",
+                names,
+            )
+        }
+
+
+class RateLimiter:
+    """
+    Token bucket limiter for Alpha Vantage's per-minute and per-day budgets.
+
+    Callers reserve a slot and get back how long they have to wait before
+    sending. Reservations are handed out in order, so a burst queues up
+    behind the bucket instead of being sent and coming back throttled.
+    A budget of 0 disables that limit. With a SharedBudget the state lives
+    in SQLite under `name` and is shared with other processes, else it is
+    kept in this process only.
+    """
+
+    def __init__(self, per_minute: int, per_day: int, max_wait: float,
+                 shared: Optional[SharedBudget] = None, name: str = ""):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.max_wait = max_wait
+        self.shared = shared
+        self.name = name
+        self._rate = per_minute / 60.0
+        self._tokens = float(per_minute)
+        # Wall clock rather than monotonic time, which is not comparable
+        # across processes
+        self._updated = time.time()
+        self._day = self._today()
+        self._day_count = 0
+        self._day_exhausted = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today() -> str:
+        # Alpha Vantage daily quotas reset at midnight UTC
+        return datetime.now(timezone.utc).date().isoformat()
+
+    @contextmanager
+    def _state(self, write: bool = True, rows: Optional[Dict[str, tuple]] = None):
+        # Up to date state for one operation, saved afterwards when shared.
+        # Operations that only read load the stored state from `rows`, or
+        # read it, without locking out other processes.
+        with self._lock:
+            if self.shared is None:
+                self._refill()
+                yield
+                return
+            if not write:
+                if rows is None:
+                    rows = self.shared.rows([self.name])
+                if self.name in rows:
+                    self._restore(rows[self.name])
+                self._refill()
+                yield
+                return
+            with self.shared.transaction(self):
+                self._refill()
+                yield
+
+    def _restore(self, row: tuple) -> None:
+        self._tokens, self._updated, self._day, self._day_count = row[:4]
+        self._day_exhausted = bool(row[4])
+
+    def _refill(self) -> None:
+        now = time.time()
+        if self._rate:
+            elapsed = max(now - self._updated, 0.0)
+            self._tokens = min(float(self.per_minute), self._tokens + elapsed * self._rate)
+        self._updated = now
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._day_count = 0
+            self._day_exhausted = False
+
+    def reserve(self, max_wait: Optional[float] = None) -> float:
+        """
+        Reserve one call and return the seconds to wait before sending it.
+        """
+        if max_wait is None:
+            max_wait = self.max_wait
+        with self._state():
+            if self._day_exhausted or (self.per_day and self._day_count >= self.per_day):
+                raise RateLimitExceeded("Daily Alpha Vantage call budget exhausted")
+            delay = 0.0
+            if self._rate:
+                if self._tokens < 1:
+                    delay = (1 - self._tokens) / self._rate
+                if delay > max_wait:
+                    raise RateLimitExceeded(
+                        f"Rate limit queue wait of {delay:.1f}s exceeds the maximum of {max_wait:.1f}s"
+                    )
+                self._tokens -= 1
+            self._day_count += 1
+            return delay
+
+    def acquire(self, max_wait: Optional[float] = None) -> None:
+        """
+        Block until a call may be sent.
+        """
+        delay = self.reserve(max_wait)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, max_wait: Optional[float] = None) -> None:
+        """
+        Wait without blocking the event loop until a call may be sent.
+        """
+        delay = self.reserve(max_wait)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def refund(self) -> None:
+        """
+        Give back a reservation whose call was never sent.
+        """
+        with self._state():
+            if self._rate:
+                self._tokens = min(float(self.per_minute), self._tokens + 1)
+            self._day_count = max(self._day_count - 1, 0)
+
+    def penalize(self, daily: bool = False) -> None:
+        """
+        Empty the minute bucket after upstream reported throttling, so queued
+        callers back off until it refills. With daily=True upstream said the
+        daily quota is spent, so calls are refused until the day rolls over.
+        """
+        with self._state():
+            self._tokens = min(self._tokens, 0.0)
+            if daily:
+                self._day_exhausted = True
+
+    def load(self, rows: Optional[Dict[str, tuple]] = None) -> tuple:
+        """
+        Sort key for picking the least loaded limiter: the wait a new call
+        would have, then fewest minute tokens left, then fewest calls left
+        today. rows is the shared state already read for several limiters.
+        """
+        with self._state(write=False, rows=rows):
+            if self._day_exhausted or (self.per_day and self._day_count >= self.per_day):
+                return (float("inf"), 0.0, 0)
+            delay = (1 - self._tokens) / self._rate if self._rate and self._tokens < 1 else 0.0
+            remaining = self.per_day - self._day_count if self.per_day else float("inf")
+            return (delay, -self._tokens, -remaining)
+
+    def remaining_today(self) -> Optional[int]:
+        """
+        Calls left in today's budget, or None when there is no daily limit.
+        """
+        with self._state(write=False):
+            if self._day_exhausted:
+                return 0
+            if not self.per_day:
+                return None
+            return max(self.per_day - self._day_count, 0)
+
+    def stats(self) -> dict:
+        with self._state(write=False):
+            return {
+                "per_minute": self.per_minute,
+                "per_day": self.per_day,
+                "tokens": round(self._tokens, 3),
+                "calls_today": self._day_count,
+                "shared": self.shared is not None,
+            }
+
+
+class KeyPool:
+    """
+    A pool of API keys, each with its own RateLimiter. Every call is routed
+    to the key with the most remaining budget, so throughput grows with the
+    number of keys.
+    """
+
+    def __init__(self, keys: List[str], per_minute: int, per_day: int, max_wait: float,
+                 shared: Optional[SharedBudget] = None):
+        self.shared = shared
+        # Shared state is stored under a digest so the keys never hit the disk
+        self.limiters = {
+            key: RateLimiter(per_minute, per_day, max_wait, shared, hashlib.sha256(key.encode()).hexdigest()[:16])
+            for key in keys
+        }
+
+    def reserve(self, max_wait: Optional[float] = None) -> Tuple[str, float]:
+        """
+        Reserve a call on the least loaded key and return (key, seconds to
+        wait). Falls back to the next key if another caller got there first.
+        """
+        error = RateLimitExceeded("No Alpha Vantage API key configured")
+        # One read of every key's shared state for the ordering; only the
+        # reservation itself takes the write lock
+        rows = self.shared.rows([limiter.name for limiter in self.limiters.values()]) if self.shared else None
+        for key, limiter in sorted(self.limiters.items(), key=lambda item: item[1].load(rows)):
+            try:
+                return key, limiter.reserve(max_wait)
+            except RateLimitExceeded as e:
+                error = e
+        raise error
+
+    def acquire(self, max_wait: Optional[float] = None) -> str:
+        key, delay = self.reserve(max_wait)
+        if delay > 0:
+            time.sleep(delay)
+        return key
+
+    async def acquire_async(self, max_wait: Optional[float] = None) -> str:
+        key, delay = self.reserve(max_wait)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return key
+
+    def refund(self, key: str) -> None:
+        self.limiters[key].refund()
+
+    def penalize(self, key: str, daily: bool = False) -> None:
+        self.limiters[key].penalize(daily)
+
+    def remaining_today(self) -> Optional[int]:
+        remaining = [limiter.remaining_today() for limiter in self.limiters.values()]
+        if any(r is None for r in remaining):
+            return None
+        return sum(remaining)
+
+    def stats(self) -> dict:
+        # Only the last characters of each key are shown
+        return {
+            f"...{key[-4:]}": limiter.stats()
+            for key, limiter in self.limiters.items()
+        }
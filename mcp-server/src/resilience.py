@@ -0,0 +1,92 @@
+import time
+import random
+import threading
+
+import requests
+
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised without contacting upstream while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and every
+    call is rejected for `reset_timeout` seconds. Then a single trial call is
+    let through (half open): success closes the circuit, failure opens it
+    again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if the call may not be sent. Returns True when
+        the call is the half-open trial: it must then end in record_success,
+        record_failure or release_trial, or no further call is let through.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                raise CircuitOpenError("Alpha Vantage is unavailable, circuit breaker is open")
+            self._trial_running = True
+            return True
+
+    def release_trial(self, trial: bool) -> None:
+        """
+        Hand back the half-open trial of a call that ended without an outcome
+        (cancelled or interrupted), so the next call can be the trial.
+        """
+        if not trial:
+            return
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def stats(self) -> dict:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures}
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter for the given retry attempt (0 based).
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_transient_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
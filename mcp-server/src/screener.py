@@ -0,0 +1,234 @@
+import ast
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from frames import format_timestamps
+from indicators import INDICATOR_SPECS, evaluate
+from timeseries import _series_id, price_series, store
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def load_universe(symbols: List[str], interval: str = "daily",
+                  lookback: int = 300) -> Tuple[List[str], Dict[str, np.ndarray], List[str]]:
+    """
+    Load the stored bars of many symbols into aligned (bars x symbols)
+    float64 matrices, one per OHLCV column, over the last `lookback`
+    timestamps any of them has. Bars a symbol lacks are NaN. Returns
+    (timestamps, columns, symbols without stored bars).
+    """
+    frames = {}
+    missing = []
+    for symbol in symbols:
+        params, _ = price_series(symbol, interval)
+        frame = store.frame(_series_id(params)).tail(lookback)
+        if len(frame):
+            frames[symbol] = frame
+        else:
+            missing.append(symbol)
+
+    if not frames:
+        return [], {name: np.empty((0, len(symbols))) for name in PRICE_COLUMNS}, missing
+    index = np.unique(np.concatenate([frame.timestamps for frame in frames.values()]))[-lookback:]
+    columns = {name: np.full((len(index), len(symbols)), np.nan) for name in PRICE_COLUMNS}
+    for j, symbol in enumerate(symbols):
+        if symbol not in frames:
+            continue
+        frame = frames[symbol]
+        prices = frame.prices()
+        rows = np.searchsorted(index, frame.timestamps)
+        # Bars older than the common window fall outside it
+        keep = (rows < len(index)) & (index[np.minimum(rows, len(index) - 1)] == frame.timestamps)
+        for name in PRICE_COLUMNS:
+            columns[name][rows[keep], j] = prices[name][keep]
+    timestamps = format_timestamps(index, all(frame.daily for frame in frames.values()))
+    return timestamps, columns, missing
+
+
+def last_rows(close: np.ndarray) -> np.ndarray:
+    """
+    Row of every column's latest bar in a (bars x symbols) matrix, -1 for a
+    column without bars.
+    """
+    valid = ~np.isnan(close)
+    last = len(close) - 1 - np.argmax(valid[::-1], axis=0)
+    return np.where(valid.any(axis=0), last, -1)
+
+
+class ScreenExpression:
+    """
+    A screening condition such as "RSI(14) < 30 and close > SMA(200)".
+
+    Names are price columns (open, high, low, close, volume). Calls are
+    indicator functions from INDICATOR_SPECS taking positional arguments in
+    the order of their parameters, or keywords: SMA(50),
+    MACD(fastperiod=8).MACD_Hist. A subscript looks back that many bars:
+    close[1] is the previous close. Comparisons, and/or/not and arithmetic
+    are supported; anything else is rejected when the expression is parsed.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        try:
+            self._tree = ast.parse(source, mode="eval").body
+        except SyntaxError as e:
+            raise ValueError(f"Invalid screen expression: {e.msg}")
+        self.terms = []
+        self._check(self._tree)
+
+    def _check(self, node: ast.AST) -> None:
+        if isinstance(node, ast.BoolOp):
+            for value in node.values:
+                self._check(value)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            self._check(node.operand)
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div)):
+            self._check(node.left)
+            self._check(node.right)
+        elif isinstance(node, ast.Compare):
+            for value in [node.left] + node.comparators:
+                self._check(value)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            pass
+        elif isinstance(node, ast.Subscript):
+            offset = node.slice
+            if not (isinstance(offset, ast.Constant) and isinstance(offset.value, int) and offset.value >= 0):
+                raise ValueError("Bars back must be a non-negative integer, e.g. close[1]")
+            self._check_term(node.value)
+        else:
+            self._check_term(node)
+
+    def _check_term(self, node: ast.AST) -> None:
+        self.terms.append(ast.unparse(node))
+        if isinstance(node, ast.Name):
+            if node.id not in PRICE_COLUMNS:
+                raise ValueError(f"Unknown name: {node.id}")
+            return
+        call = node.value if isinstance(node, ast.Attribute) else node
+        if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name)):
+            raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+        if call.func.id.upper() not in INDICATOR_SPECS:
+            raise ValueError(f"Unsupported indicator: {call.func.id}")
+        for arg in list(call.args) + [keyword.value for keyword in call.keywords]:
+            if not isinstance(arg, ast.Constant):
+                raise ValueError(f"Indicator arguments must be constants: {ast.unparse(call)}")
+
+    def evaluate(self, columns: Dict[str, np.ndarray],
+                 timestamps: List[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Evaluate on the latest bar of every column, which is the last row
+        with a close: a symbol that lacks the newest bars is judged on its
+        own latest one. Returns the boolean match vector and each term's
+        value vector.
+        """
+        self._series = {}
+        self._timestamps = timestamps
+        self._last = last_rows(columns["close"])
+        self._symbols = np.arange(columns["close"].shape[1])
+        mask = np.asarray(self._eval(self._tree, columns, 0), dtype=bool)
+        values = {term: self._at(self._series[term], 0) for term in self.terms if term in self._series}
+        return np.broadcast_to(mask, columns["close"].shape[1:]), values
+
+    def _at(self, series: np.ndarray, back: int) -> np.ndarray:
+        # Every column's value `back` bars before its own latest bar
+        rows = self._last - back
+        values = np.full(series.shape[1:], np.nan)
+        valid = rows >= 0
+        values[valid] = series[rows[valid], self._symbols[valid]]
+        return values
+
+    def _term(self, node: ast.AST, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        # Full (bars x symbols) matrix of a name or indicator call, computed once
+        term = ast.unparse(node)
+        if term not in self._series:
+            if isinstance(node, ast.Name):
+                self._series[term] = columns[node.id]
+            else:
+                call = node.value if isinstance(node, ast.Attribute) else node
+                function = call.func.id.upper()
+                defaults = INDICATOR_SPECS[function][0]
+                params = dict(zip((name for name in defaults if name != "series_type"),
+                                  (arg.value for arg in call.args)))
+                params.update((keyword.arg, keyword.value.value) for keyword in call.keywords)
+                outputs = evaluate(function, dict(columns, timestamp=self._timestamps), **params)
+                if isinstance(node, ast.Attribute):
+                    if node.attr not in outputs:
+                        raise ValueError(f"{function} has no output {node.attr}, use one of {', '.join(outputs)}")
+                    self._series[term] = outputs[node.attr]
+                else:
+                    self._series[term] = next(iter(outputs.values()))
+        return self._series[term]
+
+    def _eval(self, node: ast.AST, columns: Dict[str, np.ndarray], back: int):
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            result = self._eval(node.values[0], columns, back)
+            for value in node.values[1:]:
+                result = combine(result, self._eval(value, columns, back))
+            return result
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval(node.operand, columns, back)
+            return np.logical_not(operand) if isinstance(node.op, ast.Not) else -operand
+        if isinstance(node, ast.BinOp):
+            left, right = self._eval(node.left, columns, back), self._eval(node.right, columns, back)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if isinstance(node.op, ast.Add):
+                    return left + right
+                if isinstance(node.op, ast.Sub):
+                    return left - right
+                if isinstance(node.op, ast.Mult):
+                    return left * right
+                return left / right
+        if isinstance(node, ast.Compare):
+            result = True
+            left = self._eval(node.left, columns, back)
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self._eval(comparator, columns, back)
+                # NaN compares False, so symbols without enough history never match
+                result = np.logical_and(result, _COMPARISONS[type(op)](left, right))
+                left = right
+            return result
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Subscript):
+            return self._eval(node.value, columns, back + node.slice.value)
+        return self._at(self._term(node, columns), back)
+
+
+_COMPARISONS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+
+def screen(symbols: List[str], expression: str, interval: str = "daily", lookback: int = 300) -> dict:
+    """
+    Evaluate a ScreenExpression across a universe on every symbol's latest
+    bar and return the matching symbols with the value of every term.
+    Symbols whose latest bar is older than the newest one in the universe
+    are listed under "stale" with the timestamp they were judged on.
+    """
+    condition = ScreenExpression(expression)
+    timestamps, columns, missing = load_universe(symbols, interval, lookback)
+    result = {"timestamp": timestamps[-1] if timestamps else None, "matches": [], "missing": missing, "stale": {}}
+    if not timestamps:
+        return result
+    mask, values = condition.evaluate(columns, timestamps)
+    last = last_rows(columns["close"])
+    for j in np.flatnonzero((last >= 0) & (last < len(timestamps) - 1)):
+        result["stale"][symbols[j]] = timestamps[last[j]]
+    for j in np.flatnonzero(mask):
+        result["matches"].append({
+            "symbol": symbols[j],
+            "values": {term: _rounded(vector[j]) for term, vector in values.items()},
+        })
+    return result
+
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
@@ -1,7 +1,24 @@
 # Functions from the mcp python sdk 
 from mcp.server.fastmcp import FastMCP
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 from tools import *
+from client import close_async_client, run_async
+
+# Sessions currently served; the shared async HTTP client is closed when the
+# last one ends (SSE runs a session per connection on the same event loop)
+_active_sessions = 0
+
+@asynccontextmanager
+async def lifespan(_server):
+    global _active_sessions
+    _active_sessions += 1
+    try:
+        yield
+    finally:
+        _active_sessions -= 1
+        if not _active_sessions:
+            await close_async_client()
 
 # Creating our MCP server
 # Similar to FastAPI 
@@ -10,9 +27,10 @@ mcp = FastMCP(
     name = "Alpha Vantage MCP Server",
     host = "0.0.0.0",   # Only used for SSE transport (localhost)
     port = 8080,    # Only used for SSE transport (set to any port)
+    lifespan = lifespan,
 )
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 @mcp.tool()
 @app.get("/get_current_price/{symbol}")
@@ -21,7 +39,7 @@ async def get_current_price_tool(symbol: str) -> str:
     Gets the current price of a stock from Alpha Vantage API.
     """
     try:
-        return get_current_price(symbol)
+        return await run_async(get_current_price, symbol)
     except Exception as e:
         return f"Error getting current price for {symbol}: {str(e)}"
 
@@ -32,29 +50,31 @@ async def get_stock_price_tool(symbol: str) -> dict:
     Get the latest intraday stock price.
     """
     try:
-        return get_stock_price(symbol)
+        return await run_async(get_stock_price, symbol)
     except Exception as e:
         return f"Error getting stock price for {symbol}: {str(e)}"
 
 @mcp.tool()
 @app.get("/get_intraday/{symbol}")
-async def get_intraday_tool(symbol: str, interval: Optional[str] = "1min") -> dict:
+async def get_intraday_tool(symbol: str, interval: Optional[str] = "1min", outputsize: str = "compact") -> dict:
     """
     Fetch intraday time series for a given stock symbol.
+    outputsize "compact" returns the latest 100 bars, "full" every stored bar.
     """
     try:
-        return get_intraday(symbol, interval)
+        return await run_async(get_intraday, symbol, interval, outputsize)
     except Exception as e:
         return f"Error getting intraday data for {symbol} with interval {interval}: {str(e)}"
 
 @mcp.tool()
 @app.get("/get_daily_adjusted/{symbol}")
-async def get_daily_adjusted_tool(symbol: str) -> dict:
+async def get_daily_adjusted_tool(symbol: str, outputsize: str = "compact") -> dict:
     """
     Fetch daily adjusted time series data for a given symbol.
+    outputsize "compact" returns the latest 100 bars, "full" every stored bar.
     """
     try:
-        return get_daily_adjusted(symbol)
+        return await run_async(get_daily_adjusted, symbol, outputsize)
     except Exception as e:
         return f"Error getting daily adjusted data for {symbol}: {str(e)}"
 
@@ -65,7 +85,7 @@ async def get_weekly_tool(symbol: str) -> dict:
     Fetch weekly time series data for a given symbol.
     """
     try:
-        return get_weekly(symbol)
+        return await run_async(get_weekly, symbol)
     except Exception as e:
         return f"Error getting weekly data for {symbol}: {str(e)}"
 
@@ -76,7 +96,7 @@ async def get_weekly_adjusted_tool(symbol: str) -> dict:
     Fetch weekly adjusted time series data for a given symbol.
     """
     try:
-        return get_weekly_adjusted(symbol)
+        return await run_async(get_weekly_adjusted, symbol)
     except Exception as e:
         return f"Error getting weekly adjusted data for {symbol}: {str(e)}"
 
@@ -87,7 +107,7 @@ async def get_monthly_tool(symbol: str) -> dict:
     Fetch monthly time series data for a given symbol.
     """
     try:
-        return get_monthly(symbol)
+        return await run_async(get_monthly, symbol)
     except Exception as e:
         return f"Error getting monthly data for {symbol}: {str(e)}"
 
@@ -98,7 +118,7 @@ async def get_monthly_adjusted_tool(symbol: str) -> dict:
     Fetch monthly adjusted time series data for a given symbol.
     """
     try:
-        return get_monthly_adjusted(symbol)
+        return await run_async(get_monthly_adjusted, symbol)
     except Exception as e:
         return f"Error getting monthly adjusted data for {symbol}: {str(e)}"
 
@@ -109,10 +129,29 @@ async def get_quote_tool(symbol: str) -> dict:
     Fetch the current global quote for a given stock symbol.
     """
     try:
-        return get_quote(symbol)
+        return await run_async(get_quote, symbol)
     except Exception as e:
         return f"Error getting quote for {symbol}: {str(e)}"
 
+@mcp.tool()
+@app.post("/get_quotes")
+async def get_quotes_tool(symbols: List[str], timeout: float = 60) -> dict:
+    """
+    Fetch global quotes for many stock symbols in one call, using bulk
+    requests of up to 100 symbols when the API key supports them.
+    
+    Args:
+        symbols: Stock symbols (e.g.: ["AAPL", "MSFT", "IBM"])
+        timeout: Seconds to wait; symbols not done by then are listed as pending
+    
+    Returns:
+        Quotes by symbol, errors by symbol and pending symbols
+    """
+    try:
+        return await get_quotes_async(symbols, timeout)
+    except Exception as e:
+        return f"Error getting quotes for {symbols}: {str(e)}"
+
 @mcp.tool()
 @app.get("/get_market_status")
 async def get_market_status_tool() -> dict:
@@ -120,7 +159,7 @@ async def get_market_status_tool() -> dict:
     Fetch the current global market status.
     """
     try:
-        return get_market_status()
+        return await run_async(get_market_status)
     except Exception as e:
         return f"Error getting market status: {str(e)}"
 
@@ -131,7 +170,7 @@ async def get_historical_options_tool(symbol: str, date: Optional[str] = None, d
     Fetch historical options data for a symbol, optionally for a specific date.
     """
     try:
-        return get_historical_options_simple(symbol, date, datatype)
+        return await run_async(get_historical_options_simple, symbol, date, datatype)
     except Exception as e:
         return f"Error getting historical options for {symbol}: {str(e)}"
 
@@ -142,7 +181,7 @@ async def get_news_sentiment_tool(symbol: str) -> dict:
     Fetch news and sentiment trending data for a symbol.
     """
     try:
-        return get_news_sentiment(symbol)
+        return await run_async(get_news_sentiment, symbol)
     except Exception as e:
         return f"Error getting news sentiment for {symbol}: {str(e)}"
 
@@ -153,7 +192,7 @@ async def get_earnings_transcript_tool(symbol: str) -> dict:
     Fetch earnings call transcript for a symbol.
     """
     try:
-        return get_earnings_transcript(symbol)
+        return await run_async(get_earnings_transcript, symbol)
     except Exception as e:
         return f"Error getting earnings transcript for {symbol}: {str(e)}"
 
@@ -164,7 +203,7 @@ async def get_top_gainers_losers_tool() -> dict:
     Fetch top gainers and losers data.
     """
     try:
-        return get_top_gainers_losers()
+        return await run_async(get_top_gainers_losers)
     except Exception as e:
         return f"Error getting top gainers and losers: {str(e)}"
 
@@ -175,7 +214,7 @@ async def get_insider_transactions_tool(symbol: str) -> dict:
     Fetch insider transactions trending data for a symbol.
     """
     try:
-        return get_insider_transactions(symbol)
+        return await run_async(get_insider_transactions, symbol)
     except Exception as e:
         return f"Error getting insider transactions for {symbol}: {str(e)}"
 
@@ -186,7 +225,7 @@ async def get_analytics_fixed_tool(symbol: str, function_name: str, interval: st
     Fetch fixed window technical indicator data (e.g., SMA, EMA, RSI).
     """
     try:
-        return get_analytics_fixed(symbol, function_name, interval, time_period, series_type)
+        return await run_async(get_analytics_fixed, symbol, function_name, interval, time_period, series_type)
     except Exception as e:
         return f"Error getting analytics fixed for {symbol} function {function_name}: {str(e)}"
 
@@ -197,7 +236,7 @@ async def get_analytics_sliding_tool(symbol: str, function_name: str, interval:
     Fetch sliding window technical indicator data (requires premium API).
     """
     try:
-        return get_analytics_sliding(symbol, function_name, interval, time_period, series_type)
+        return await run_async(get_analytics_sliding, symbol, function_name, interval, time_period, series_type)
     except Exception as e:
         return f"Error getting analytics sliding for {symbol} function {function_name}: {str(e)}"
 
@@ -208,7 +247,7 @@ async def get_fundamental_data_tool(symbol: str) -> dict:
     Fetch fundamental data for a symbol.
     """
     try:
-        return get_fundamental_data(symbol)
+        return await run_async(get_fundamental_data, symbol)
     except Exception as e:
         return f"Error getting fundamental data for {symbol}: {str(e)}"
 
@@ -219,7 +258,7 @@ async def get_company_overview_trending_tool() -> dict:
     Fetch trending company overview data.
     """
     try:
-        return get_company_overview_trending()
+        return await run_async(get_company_overview_trending)
     except Exception as e:
         return f"Error getting company overview trending data: {str(e)}"
 
@@ -230,7 +269,7 @@ async def get_etf_profile_and_holdings_tool(symbol: str) -> dict:
     Fetch ETF profile and holdings for a symbol.
     """
     try:
-        return get_etf_profile_and_holdings(symbol)
+        return await run_async(get_etf_profile_and_holdings, symbol)
     except Exception as e:
         return f"Error getting ETF profile and holdings for {symbol}: {str(e)}"
 
@@ -241,7 +280,7 @@ async def get_corporate_action_dividends_tool(symbol: str) -> dict:
     Fetch corporate action dividend data for a symbol.
     """
     try:
-        return get_corporate_action_dividends(symbol)
+        return await run_async(get_corporate_action_dividends, symbol)
     except Exception as e:
         return f"Error getting corporate action dividends for {symbol}: {str(e)}"
 
@@ -252,7 +291,7 @@ async def get_corporate_action_splits_tool(symbol: str) -> dict:
     Fetch corporate action splits data for a symbol.
     """
     try:
-        return get_corporate_action_splits(symbol)
+        return await run_async(get_corporate_action_splits, symbol)
     except Exception as e:
         return f"Error getting corporate action splits for {symbol}: {str(e)}"
 
@@ -263,7 +302,7 @@ async def get_income_statement_tool(symbol: str) -> dict:
     Fetch income statement data for a company symbol.
     """
     try:
-        return get_income_statement(symbol)
+        return await run_async(get_income_statement, symbol)
     except Exception as e:
         return f"Error getting income statement for {symbol}: {str(e)}"
 
@@ -274,7 +313,7 @@ async def get_balance_sheet_tool(symbol: str) -> dict:
     Fetch the balance sheet data for a company symbol.
     """
     try:
-        return get_balance_sheet(symbol)
+        return await run_async(get_balance_sheet, symbol)
     except Exception as e:
         return f"Error getting balance sheet for {symbol}: {str(e)}"
 
@@ -285,7 +324,7 @@ async def get_cash_flow_tool(symbol: str) -> dict:
     Fetch the cash flow statement for a company symbol.
     """
     try:
-        return get_cash_flow(symbol)
+        return await run_async(get_cash_flow, symbol)
     except Exception as e:
         return f"Error getting cash flow for {symbol}: {str(e)}"
 
@@ -296,40 +335,62 @@ async def get_earnings_trending_tool() -> dict:
     Fetch trending earnings data.
     """
     try:
-        return get_earnings_trending()
+        return await run_async(get_earnings_trending)
     except Exception as e:
         return f"Error getting earnings trending data: {str(e)}"
 
 @mcp.tool()
 @app.get("/get_listing_delisting_status")
-async def get_listing_delisting_status_tool() -> dict:
+async def get_listing_delisting_status_tool(symbol: Optional[str] = None, exchange: Optional[str] = None,
+                                            asset_type: Optional[str] = None, state: str = "active",
+                                            date: Optional[str] = None, limit: int = 100) -> dict:
     """
-    Fetch listing and delisting status data.
+    Look up listed (or, with state="delisted", delisted) securities by symbol, exchange
+    and asset type (Stock or ETF), as of today or a past date (YYYY-MM-DD).
+    Returns the number of matches and at most limit rows.
     """
     try:
-        return get_listing_delisting_status()
+        return await run_async(get_listing_delisting_status, symbol, exchange, asset_type, state, date, limit)
     except Exception as e:
         return f"Error getting listing/delisting status data: {str(e)}"
 
+@mcp.tool()
+@app.get("/search_symbols/{query}")
+async def search_symbols_tool(query: str, limit: int = 10) -> dict:
+    """
+    Search listed stocks and ETFs by symbol or company name, including prefixes
+    and misspellings (e.g. "micro", "APPL"). Answered locally without spending quota
+    once the daily listing is cached.
+    """
+    try:
+        return await run_async(search_symbols, query, limit)
+    except Exception as e:
+        return f"Error searching symbols for {query}: {str(e)}"
+
 @mcp.tool()
 @app.get("/get_earnings_calendar")
-async def get_earnings_calendar_tool() -> dict:
+async def get_earnings_calendar_tool(symbol: Optional[str] = None, start: Optional[str] = None,
+                                     end: Optional[str] = None, horizon: str = "3month", limit: int = 100) -> dict:
     """
-    Fetch earnings calendar data.
+    Fetch upcoming earnings reports, optionally for one symbol and between start and end
+    report dates (YYYY-MM-DD). horizon is 3month, 6month or 12month.
+    Returns the number of matches and at most limit rows, by report date.
     """
     try:
-        return get_earnings_calendar()
+        return await run_async(get_earnings_calendar, symbol, start, end, horizon, limit)
     except Exception as e:
         return f"Error getting earnings calendar data: {str(e)}"
 
 @mcp.tool()
 @app.get("/get_ipo_calendar")
-async def get_ipo_calendar_tool() -> dict:
+async def get_ipo_calendar_tool(start: Optional[str] = None, end: Optional[str] = None,
+                                exchange: Optional[str] = None, limit: int = 100) -> dict:
     """
-    Fetch IPO calendar data.
+    Fetch upcoming IPOs, optionally between start and end IPO dates (YYYY-MM-DD) and on one
+    exchange. Returns the number of matches and at most limit rows, by IPO date.
     """
     try:
-        return get_ipo_calendar()
+        return await run_async(get_ipo_calendar, start, end, exchange, limit)
     except Exception as e:
         return f"Error getting IPO calendar data: {str(e)}"
 
@@ -342,7 +403,7 @@ async def get_currency_exchange_rate_tool(from_currency: str, to_currency: str)
         from_currency: Source currency (e.g.: USD, EUR)
     """
     try:
-        return get_currency_exchange_rate(from_currency, to_currency)
+        return await run_async(get_currency_exchange_rate, from_currency, to_currency)
     except Exception as e:
         return f"Error getting exchange rate for {from_currency} to {to_currency}: {str(e)}"
     
@@ -353,7 +414,7 @@ async def get_fx_daily_data_tool(from_symbol: str, to_symbol: str) -> dict:
     Gets the daily time series (timestamp, open, high, low, close) of the FX currency pair from Alpha Vantage API.
     """
     try:
-        return get_fx_daily_data(from_symbol, to_symbol)
+        return await run_async(get_fx_daily_data, from_symbol, to_symbol)
     except Exception as e:
         return f"Error getting FX daily data for {from_symbol} to {to_symbol}: {str(e)}"
     
@@ -364,7 +425,7 @@ async def get_fx_weekly_data_tool(from_symbol: str, to_symbol: str) -> dict:
     Gets the weekly time series (timestamp, open, high, low, close) of the FX currency pair from Alpha Vantage API.
     """
     try:
-        return get_fx_weekly_data(from_symbol, to_symbol)
+        return await run_async(get_fx_weekly_data, from_symbol, to_symbol)
     except Exception as e:
         return f"Error getting FX weekly data for {from_symbol} to {to_symbol}: {str(e)}"
     
@@ -375,7 +436,7 @@ async def get_fx_monthly_data_tool(from_symbol: str, to_symbol: str) -> dict:
     Gets the monthly time series (timestamp, open, high, low, close) of the FX currency pair from Alpha Vantage API.
     """
     try:
-        return get_fx_monthly_data(from_symbol, to_symbol)
+        return await run_async(get_fx_monthly_data, from_symbol, to_symbol)
     except Exception as e:
         return f"Error getting FX monthly data for {from_symbol} to {to_symbol}: {str(e)}"
     
@@ -386,7 +447,7 @@ async def get_digital_currency_daily_data_tool(symbol: str, market: str) -> dict
     Gets the daily historical time series for a digital currency traded on a specific market from Alpha Vantage API.
     """
     try:
-        return get_digital_currency_daily_data(symbol, market)
+        return await run_async(get_digital_currency_daily_data, symbol, market)
     except Exception as e:
         return f"Error getting digital currency daily data for {symbol} on {market}: {str(e)}"
     
@@ -397,7 +458,7 @@ async def get_digital_currency_weekly_data_tool(symbol: str, market: str) -> dic
     Gets the weekly historical time series for a digital currency traded on a specific market from Alpha Vantage API.
     """
     try:
-        return get_digital_currency_weekly_data(symbol, market)
+        return await run_async(get_digital_currency_weekly_data, symbol, market)
     except Exception as e:
         return f"Error getting digital currency weekly data for {symbol} on {market}: {str(e)}"
 
@@ -408,7 +469,7 @@ async def get_digital_currency_monthly_data_tool(symbol: str, market: str) -> di
     Gets the monthly historical time series for a digital currency traded on a specific market from Alpha Vantage API.
     """
     try:
-        return get_digital_currency_monthly_data(symbol, market)
+        return await run_async(get_digital_currency_monthly_data, symbol, market)
     except Exception as e:
         return f"Error getting digital currency monthly data for {symbol} on {market}: {str(e)}"
     
@@ -419,7 +480,7 @@ async def get_crude_oil_wti_data_tool(interval: str) -> dict:
     Gets the daily, weekly, or monthly historical time series for the West Texas Intermediate (WTI) crude oil prices from Alpha Vantage API.
     """
     try:
-        return get_crude_oil_wti_data(interval)
+        return await run_async(get_crude_oil_wti_data, interval)
     except Exception as e:
         return f"Error getting crude oil WTI data for {interval}: {str(e)}"
     
@@ -430,7 +491,7 @@ async def get_crude_oil_brent_data_tool(interval: str) -> dict:
     Gets the daily, weekly, or monthly historical time series for the Brent crude oil prices from Alpha Vantage API.
     """
     try:
-        return get_crude_oil_brent_data(interval)
+        return await run_async(get_crude_oil_brent_data, interval)
     except Exception as e:
         return f"Error getting crude oil Brent data for {interval}: {str(e)}"
     
@@ -441,7 +502,7 @@ async def get_natural_gas_data_tool(interval: str) -> dict:
     Gets the daily, weekly, or monthly historical time series for the natural gas prices from Alpha Vantage API.
     """
     try:
-        return get_natural_gas_data(interval)
+        return await run_async(get_natural_gas_data, interval)
     except Exception as e:
         return f"Error getting natural gas data for {interval}: {str(e)}"
     
@@ -452,7 +513,7 @@ async def get_copper_data_tool(interval: str) -> dict:
     Gets the monthly, quarterly and annual global price of copper from Alpha Vantage API.
     """
     try:
-        return get_copper_data(interval)
+        return await run_async(get_copper_data, interval)
     except Exception as e:
         return f"Error getting copper data for {interval}: {str(e)}"
 
@@ -463,7 +524,7 @@ async def get_aluminum_data_tool(interval: str) -> dict:
     Gets the monthly, quarterly and annual global price of aluminum from Alpha Vantage API.
     """
     try:
-        return get_aluminum_data(interval)
+        return await run_async(get_aluminum_data, interval)
     except Exception as e:
         return f"Error getting aluminum data for {interval}: {str(e)}"
 
@@ -474,7 +535,7 @@ async def get_wheat_data_tool(interval: str) -> dict:
     Gets the monthly, quarterly and annual global price of wheat from Alpha Vantage API.
     """
     try:
-        return get_wheat_data(interval)
+        return await run_async(get_wheat_data, interval)
     except Exception as e:
         return f"Error getting wheat data for {interval}: {str(e)}"
 
@@ -485,7 +546,7 @@ async def get_corn_data_tool(interval: str) -> dict:
     Gets the monthly, quarterly and annual global price of corn from Alpha Vantage API.
     """
     try:
-        return get_corn_data(interval)
+        return await run_async(get_corn_data, interval)
     except Exception as e:
         return f"Error getting corn data for {interval}: {str(e)}"
     
@@ -496,7 +557,7 @@ async def get_cotton_data_tool(interval: str) -> dict:
     Gets the monthly, quarterly and annual global price of cotton from Alpha Vantage API.
     """
     try:
-        return get_cotton_data(interval)
+        return await run_async(get_cotton_data, interval)
     except Exception as e:
         return f"Error getting cotton data for {interval}: {str(e)}"
     
@@ -507,7 +568,7 @@ async def get_sugar_data_tool(interval: str) -> dict:
     Gets the monthly, quarterly and annual global price of sugar from Alpha Vantage API.
     """
     try:
-        return get_sugar_data(interval)
+        return await run_async(get_sugar_data, interval)
     except Exception as e:
         return f"Error getting sugar data for {interval}: {str(e)}"
     
@@ -518,7 +579,7 @@ async def get_coffee_data_tool(interval: str) -> dict:
     Gets the monthly, quarterly and annual global price of coffee from Alpha Vantage API.
     """
     try:
-        return get_coffee_data(interval)
+        return await run_async(get_coffee_data, interval)
     except Exception as e:
         return f"Error getting coffee data for {interval}: {str(e)}"
     
@@ -529,7 +590,7 @@ async def get_all_commodities_data_tool(interval: str) -> dict:
     Gets the global price index of all commodities in monthly, quarterly, and annual temporal dimensions.
     """
     try:
-        return get_all_commodities_data(interval)
+        return await run_async(get_all_commodities_data, interval)
     except Exception as e:
         return f"Error getting all commodities data for {interval}: {str(e)}"
     
@@ -540,7 +601,7 @@ async def get_real_gdp_data_tool(interval: str) -> dict:
     Gets the real GDP data of the US economy in quarterly and annual temporal dimensions.
     """
     try:
-        return get_real_gdp(interval)
+        return await run_async(get_real_gdp, interval)
     except Exception as e:
         return f"Error getting real GDP data for {interval}: {str(e)}"
     
@@ -551,7 +612,7 @@ async def get_real_gdp_per_capita_data_tool() -> dict:
     Gets the real GDP per capita data quaterly of the US economy.
     """
     try:
-        return get_real_gdp_per_capita()
+        return await run_async(get_real_gdp_per_capita)
     except Exception as e:
         return f"Error getting real GDP per capita data: {str(e)}"
     
@@ -569,7 +630,7 @@ async def get_treasury_yield_tool(interval: str, maturity: str) -> dict:
         Treasury yield data
     """
     try:
-        return get_treasury_yield(interval, maturity)
+        return await run_async(get_treasury_yield, interval, maturity)
     except Exception as e:
         return f"Error getting treasury yield data for {maturity} at {interval} interval: {str(e)}"
     
@@ -586,7 +647,7 @@ async def get_federal_funds_rate_tool(interval: str) -> dict:
         Federal Funds Rate data
     """
     try:
-        return get_federal_funds_rate(interval)
+        return await run_async(get_federal_funds_rate, interval)
     except Exception as e:
         return f"Error getting Federal Funds Rate data at {interval} interval: {str(e)}"
     
@@ -603,7 +664,7 @@ async def get_cpi_data_tool(interval: str) -> dict:
         CPI data
     """
     try:
-        return get_cpi_data(interval)
+        return await run_async(get_cpi_data, interval)
     except Exception as e:
         return f"Error getting CPI data at {interval} interval: {str(e)}"
     
@@ -614,7 +675,7 @@ async def get_inflation_data_tool() -> dict:
     Gets the inflation rate data in the US.
     """
     try:
-        return get_inflation()
+        return await run_async(get_inflation)
     except Exception as e:
         return f"Error getting inflation data: {str(e)}"
 
@@ -625,7 +686,7 @@ async def get_retail_sales_tool() -> dict:
     Gets the monthly retail sales data in the US.
     """
     try:
-        return get_retail_sales()
+        return await run_async(get_retail_sales)
     except Exception as e:
         return f"Error getting retail sales data: {str(e)}"
     
@@ -636,7 +697,7 @@ async def get_durables_tool() -> dict:
     Gets the monthly manufacturers' new orders of durable goods in the US.
     """
     try:
-        return get_durables()
+        return await run_async(get_durables)
     except Exception as e:
         return f"Error getting durable goods data: {str(e)}"
     
@@ -647,7 +708,7 @@ async def get_monthly_unemployment_rate_tool() -> dict:
     Gets the monthly unemployment rate in the US.
     """
     try:
-        return get_monthly_unemployment()
+        return await run_async(get_monthly_unemployment)
     except Exception as e:
         return f"Error getting monthly unemployment rate data: {str(e)}"
     
@@ -660,13 +721,13 @@ async def get_nonfarm_payrolls_tool() -> dict:
     unpaid volunteers, farm employees, and the unincorporated self-employed.
     """
     try:
-        return get_nonfarm_payroll()
+        return await run_async(get_nonfarm_payroll)
     except Exception as e:
         return f"Error getting non-farm payrolls data: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_sma_data/{symbol}/{series_type}")
-async def get_sma_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_sma_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Simple Moving Average (SMA) data for a given symbol and series type.
     
@@ -674,18 +735,19 @@ async def get_sma_data_tool(symbol: str, interval: str = "daily", time_period: i
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         SMA data
     """
     try:
-        return get_sma_values(symbol, interval, time_period, series_type)
+        return await run_async(get_sma_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting SMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_ema_data/{symbol}/{series_type}")
-async def get_ema_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_ema_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Exponential Moving Average (EMA) data for a given symbol and series type.
     
@@ -693,18 +755,19 @@ async def get_ema_data_tool(symbol: str, interval: str = "daily", time_period: i
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         EMA data
     """
     try:
-        return get_ema_values(symbol, interval, time_period, series_type)
+        return await run_async(get_ema_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting EMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_wma_data/{symbol}/{series_type}")
-async def get_wma_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_wma_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Weighted Moving Average (WMA) data for a given symbol and series type.
     
@@ -712,18 +775,19 @@ async def get_wma_data_tool(symbol: str, interval: str = "daily", time_period: i
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         WMA data
     """
     try:
-        return get_wma_values(symbol, interval, time_period, series_type)
+        return await run_async(get_wma_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting WMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_dema_data/{symbol}/{series_type}")
-async def get_dema_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_dema_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Double Exponential Moving Average (DEMA) data for a given symbol and series type.
     
@@ -731,18 +795,19 @@ async def get_dema_data_tool(symbol: str, interval: str = "daily", time_period:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         DEMA data
     """
     try:
-        return get_dema_values(symbol, interval, time_period, series_type)
+        return await run_async(get_dema_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting DEMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_tema_data/{symbol}/{series_type}")
-async def get_tema_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_tema_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Triple Exponential Moving Average (TEMA) data for a given symbol and series type.
     
@@ -750,18 +815,19 @@ async def get_tema_data_tool(symbol: str, interval: str = "daily", time_period:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         TEMA data
     """
     try:
-        return get_tema_values(symbol, interval, time_period, series_type)
+        return await run_async(get_tema_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting DEMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_trima_data/{symbol}/{series_type}")
-async def get_trima_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_trima_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Triangular Moving Average (TRIMA) data for a given symbol and series type.
     
@@ -769,18 +835,19 @@ async def get_trima_data_tool(symbol: str, interval: str = "daily", time_period:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         TRIMA data
     """
     try:
-        return get_trima_values(symbol, interval, time_period, series_type)
+        return await run_async(get_trima_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting TRIMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_kama_data/{symbol}/{series_type}")
-async def get_kama_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_kama_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Kaufman Adaptive Moving Average (KAMA) data for a given symbol and series type.
     
@@ -788,18 +855,20 @@ async def get_kama_data_tool(symbol: str, interval: str = "daily", time_period:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         KAMA data
     """
     try:
-        return get_kama_values(symbol, interval, time_period, series_type)
+        return await run_async(get_kama_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting KAMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_mama_data/{symbol}/{series_type}")
-async def get_mama_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_mama_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close",
+                             fastlimit: float = 0.01, slowlimit: float = 0.01, source: str = "api") -> dict:
     """
     Gets the MESA Adaptive Moving Average (MAMA) data for a given symbol and series type.
     
@@ -807,36 +876,123 @@ async def get_mama_data_tool(symbol: str, interval: str = "daily", time_period:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         MAMA data
     """
     try:
-        return get_kama_values(symbol, interval, time_period, series_type)
+        return await run_async(get_mama_values, symbol, interval, time_period, series_type, fastlimit, slowlimit, source)
     except Exception as e:
         return f"Error getting MAMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_vwap_data/{symbol}")
-async def get_vwap_data_tool(symbol: str, interval: str = "daily") -> dict:
+async def get_vwap_data_tool(symbol: str, interval: str = "daily", source: str = "api") -> dict:
     """
     Gets the Volume Weighted Average Price (VWAP) data for a given symbol.
     
     Args:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored intraday bars
     
     Returns:
         VWAP data
     """
     try:
-        return get_vwap_values(symbol, interval)
+        return await run_async(get_vwap_values, symbol, interval, source)
     except Exception as e:
         return f"Error getting VWAP data for {symbol}: {str(e)}"
 
+@mcp.tool()
+@app.post("/screen_symbols")
+async def screen_symbols_tool(symbols: List[str], expression: str, interval: str = "daily", lookback: int = 300,
+                              refresh: bool = False, timeout: float = 60) -> dict:
+    """
+    Screens many symbols at once with an indicator expression evaluated on each symbol's latest bar.
+    
+    Args:
+        symbols: Stock symbols to screen (e.g.: ["AAPL", "MSFT", "IBM"])
+        expression: Condition over price columns and indicators, e.g.: "RSI(14) < 30 and close > SMA(200)",
+            "MACD().MACD_Hist > 0 and MACD().MACD_Hist[1] <= 0" (x[1] is the previous bar's value)
+        interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        lookback: Number of most recent bars loaded per symbol
+        refresh: Sync every symbol from Alpha Vantage first instead of using only stored bars
+        timeout: Seconds to spend syncing when refresh is set
+    
+    Returns:
+        Matching symbols with the value of every term, symbols without stored data, and
+        symbols whose latest bar is older than the newest one (stale)
+    """
+    try:
+        return await screen_symbols_async(symbols, expression, interval, lookback, refresh, timeout)
+    except Exception as e:
+        return f"Error screening symbols: {str(e)}"
+
+@mcp.tool()
+@app.post("/get_indicators/{symbol}")
+async def get_indicators_tool(symbol: str, specs: List[dict], interval: str = "daily", limit: int = 100) -> dict:
+    """
+    Gets many technical indicators for a given symbol in one call, computed from one shared price fetch.
+    
+    Args:
+        symbol: Stock symbol (e.g.: AAPL, MSFT)
+        specs: Indicator specs, each an Alpha Vantage function with its parameters
+            (e.g.: [{"function": "SMA", "time_period": 50}, {"function": "RSI", "time_period": 14},
+            {"function": "MACD"}, {"function": "ADX", "label": "trend"}])
+        interval: Time interval for the data (e.g.: 1min, 5min, 15min, 30min, 60min, daily, weekly, monthly)
+        limit: Number of most recent bars to return
+    
+    Returns:
+        Timestamps newest first and one value list per indicator output aligned with them
+    """
+    try:
+        return await run_async(get_indicators, symbol, interval, specs, limit)
+    except Exception as e:
+        return f"Error getting indicators for {symbol}: {str(e)}"
+
+@mcp.tool()
+@app.get("/get_live_indicators/{symbol}")
+async def get_live_indicators_tool(symbol: str, interval: str = "1min", time_period: int = 14) -> dict:
+    """
+    Gets the latest SMA, EMA, RSI, MACD, stochastic and VWAP values for a given symbol, updated incrementally.
+    
+    Args:
+        symbol: Stock symbol (e.g.: AAPL, MSFT)
+        interval: Time interval for the data (e.g.: 1min, 5min, 15min, 30min, 60min, daily)
+        time_period: Number of bars for SMA, EMA, RSI and the stochastic %K window
+    
+    Returns:
+        Timestamp of the latest bar and its indicator values
+    """
+    try:
+        return await run_async(get_live_indicators, symbol, interval, time_period)
+    except Exception as e:
+        return f"Error getting live indicators for {symbol}: {str(e)}"
+
+@mcp.tool()
+@app.get("/get_anchored_vwap_data/{symbol}")
+async def get_anchored_vwap_data_tool(symbol: str, anchor: str, interval: str = "15min") -> dict:
+    """
+    Gets the VWAP anchored at a timestamp for a given symbol, cumulated from that bar onward.
+    
+    Args:
+        symbol: Stock symbol (e.g.: AAPL, MSFT)
+        anchor: Timestamp to anchor at (e.g.: 2024-01-02 09:30:00, or 2024-01-02 for daily bars)
+        interval: Time interval for the data (e.g.: 1min, 5min, 15min, 30min, 60min, daily)
+    
+    Returns:
+        Anchored VWAP data
+    """
+    try:
+        return await run_async(get_anchored_vwap_values, symbol, anchor, interval)
+    except Exception as e:
+        return f"Error getting anchored VWAP data for {symbol}: {str(e)}"
+
 @mcp.tool()
 @app.get("/get_tthree_data/{symbol}/{series_type}")
-async def get_tthree_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_tthree_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Triple Exponential Moving Average (T3) values for a given symbol and series type.
     
@@ -844,19 +1000,20 @@ async def get_tthree_data_tool(symbol: str, interval: str = "daily", time_period
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         MAMA data
     """
     try:
-        return get_tthree_values(symbol, interval, time_period, series_type)
+        return await run_async(get_tthree_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting MAMA data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_macd_data/{symbol}/{series_type}")
 async def get_macd_data_tool(symbol: str, interval: str = "daily", series_type: str = "open", fastperiod: int = 12,
-                    slowperiod: int = 26, signalperiod: int = 9) -> dict:
+                    slowperiod: int = 26, signalperiod: int = 9, source: str = "api") -> dict:
     """
     Gets the Moving Average Convergence Divergence (MACD) values for a given symbol and series type.
     Args:
@@ -866,18 +1023,20 @@ async def get_macd_data_tool(symbol: str, interval: str = "daily", series_type:
         fastperiod: Fast period for MACD
         slowperiod: Slow period for MACD
         signalperiod: Signal period for MACD
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     Returns:
         MACD data
     """
     try: 
-        return get_macd_values(symbol, interval, series_type, fastperiod, slowperiod, signalperiod)
+        return await run_async(get_macd_values, symbol, interval, series_type, fastperiod, slowperiod, signalperiod, source)
     except Exception as e:
         return f"Error getting MACD data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_macdext_data/{symbol}/{series_type}")
 async def get_macdext_data_tool(symbol: str, interval: str = "daily", series_type: str = "open", fastperiod: int = 12,
-                    slowperiod: int = 26, signalperiod: int = 9) -> dict:
+                    slowperiod: int = 26, signalperiod: int = 9, fastmatype: int = 0, slowmatype: int = 0,
+                    signalmatype: int = 0, source: str = "api") -> dict:
     """
     Gets the Moving Average Convergence Divergence (MACDEXT) values for a given symbol and series type.
     Args:
@@ -887,18 +1046,22 @@ async def get_macdext_data_tool(symbol: str, interval: str = "daily", series_typ
         fastperiod: Fast period for MACDEXT
         slowperiod: Slow period for MACDEXT
         signalperiod: Signal period for MACDEXT
+        fastmatype, slowmatype, signalmatype: Moving average type of each line (0=SMA, 1=EMA, 2=WMA, 3=DEMA,
+            4=TEMA, 5=TRIMA, 6=T3, 7=KAMA, 8=MAMA)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     Returns:
         MACD data
     """
     try: 
-        return get_macdext_values(symbol, interval, series_type, fastperiod, slowperiod, signalperiod)
+        return await run_async(get_macdext_values, symbol, interval, series_type, fastperiod, slowperiod, signalperiod,
+                               fastmatype, slowmatype, signalmatype, source)
     except Exception as e:
         return f"Error getting MACDEXT data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_stoch_data/{symbol}/{series_type}")
 async def get_stoch_data_tool(symbol: str, interval: str = "daily", fastk_period: int = 14, slowk_period: int = 3,
-                                slowd_period: int = 3, series_type: str = "close") -> dict:
+                                slowd_period: int = 3, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Stochastic Oscillator (STOCH) values for a given symbol and series type.
     Args:
@@ -907,34 +1070,36 @@ async def get_stoch_data_tool(symbol: str, interval: str = "daily", fastk_period
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
         fastk_period: Fast period for STOCH
         slowk_period: Slow period for STOCH
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     Returns:
         MACD data
     """
     try: 
-        return get_stoch_oscillator_values(symbol, interval, series_type, fastk_period, slowk_period, slowd_period)
+        return await run_async(get_stoch_oscillator_values, symbol, interval, fastk_period, slowk_period, slowd_period, series_type, source)
     except Exception as e:
         return f"Error getting STOCH data for {symbol} with series type {series_type}: {str(e)}"
 
 @mcp.tool()
 @app.get("/get_stochfast_data/{symbol}")
-async def get_stochf_data_tool(symbol: str, interval: str = "daily", fastk_period: int = 5, fastdperiod: int = 3) -> dict:
+async def get_stochf_data_tool(symbol: str, interval: str = "daily", fastk_period: int = 5, fastdperiod: int = 3, source: str = "api") -> dict:
     """
     Gets the Stochastic Fast Oscillator (STOCHF) values for a given symbol.
     
     Args:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     Returns:
         STOCHF data
     """
     try: 
-        return get_stochf_oscillator_values(symbol, interval, fastk_period, fastdperiod)
+        return await run_async(get_stochf_oscillator_values, symbol, interval, fastk_period, fastdperiod, source=source)
     except Exception as e:
         return f"Error getting STOCHF data for {symbol}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_rsi_data/{symbol}/{series_type}")
-async def get_rsi_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_rsi_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Gets the Relative Strength Index (RSI) values for a given symbol and series type.
     
@@ -942,174 +1107,208 @@ async def get_rsi_data_tool(symbol: str, interval: str = "daily", time_period: i
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         RSI data
     """
     try:
-        return get_rsi_values(symbol, interval, time_period, series_type)
+        return await run_async(get_rsi_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting RSI data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_stochrsi_data/{symbol}/{series_type}")
 async def get_stochrsi_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close",
-                        fastkperiod: int = 5, fastdperiod: int = 3) -> dict:
+                        fastkperiod: int = 5, fastdperiod: int = 3, source: str = "api") -> dict:
     """
     Gets the Stochastic Relative Strength Index (STOCHRSI) values for a given symbol and series type.
     Args:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         series_type: Type of the series (e.g.: close, open, high, low)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     Returns:
         STOCHRSI data
     """
     try:
-        return get_stochrsi_values(symbol, interval, time_period, series_type, fastkperiod, fastdperiod)
+        return await run_async(get_stochrsi_values, symbol, interval, time_period, series_type, fastkperiod, fastdperiod, source=source)
     except Exception as e:
         return f"Error getting STOCHRSI data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_willr_data/{symbol}")
-async def get_wilrr_data_tool(symbol: str, interval: str = "daily", time_period: int = 60) -> dict:
+async def get_wilrr_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, source: str = "api") -> dict:
     """
     Gets the Williams %R (WILLR) values for a given symbol.
     
     Args:
         symbol: Stock symbol (e.g.: AAPL, MSFT)
         interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        source: "api" to call the indicator endpoint, "local" to compute it from the stored price series
     
     Returns:
         WILLR data
     """
     try:
-        return get_willr_values(symbol, interval, time_period)
+        return await run_async(get_willr_values, symbol, interval, time_period, source=source)
     except Exception as e:
         return f"Error getting WILLR data for {symbol}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_adx_data/{symbol}/{series_type}")
-async def get_adx_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_adx_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Average Directional Movement Index (ADX) values for a given symbol.
     """
     try:
-        return get_adx_values(symbol, interval, time_period, series_type)
+        return await run_async(get_adx_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting ADX data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_adxr_data/{symbol}/{series_type}")
-async def get_adxr_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_adxr_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Average Directional Movement Rating Index (ADX) values for a given symbol.
     """
     try:
-        return get_adxr_values(symbol, interval, time_period, series_type)
+        return await run_async(get_adxr_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting ADXR data for {symbol} with series type {series_type}: {str(e)}"
     
+@mcp.tool()
+@app.get("/get_directional_movement_data/{symbol}")
+async def get_directional_movement_data_tool(symbol: str, interval: str = "daily", time_period: int = 14) -> dict:
+    """
+    Gets ADX, ADXR, +DI and -DI together for a given symbol, computed from one price series fetch.
+
+    Args:
+        symbol: Stock symbol (e.g.: AAPL, MSFT)
+        interval: Time interval for the data (e.g.: daily, weekly, monthly)
+        time_period: Number of bars used for smoothing
+
+    Returns:
+        Directional movement data
+    """
+    try:
+        return await run_async(get_directional_movement_values, symbol, interval, time_period)
+    except Exception as e:
+        return f"Error getting directional movement data for {symbol}: {str(e)}"
+
 @mcp.tool()
 @app.get("/get_apo_data/{symbol}/{series_type}")
 async def get_apo_data_tool(symbol: str, interval: str = "daily", series_type: str = "close", fastperiod: int = 12,
-                   slowperiod: int = 26) -> dict:
+                   slowperiod: int = 26, matype: int = 0, source: str = "api") -> dict:
     """
     Fetch Absolute Price Oscillator (APO) values for a given symbol.
     """
     try:
-        return get_apo_values(symbol, interval, series_type, fastperiod, slowperiod)
+        return await run_async(get_apo_values, symbol, interval, series_type, fastperiod, slowperiod, matype, source)
     except Exception as e:
         return f"Error getting APO data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_ppo_data/{symbol}/{series_type}")
 async def get_ppo_data_tool(symbol: str, interval: str = "daily", series_type: str = "close", fastperiod: int = 12,
-                   slowperiod: int = 26) -> dict:
+                   slowperiod: int = 26, matype: int = 0, source: str = "api") -> dict:
     """
     Fetch Percentage Price Oscillator (PPO) values for a given symbol.
     """
     try:
-        return get_ppo_values(symbol, interval, series_type, fastperiod, slowperiod)
+        return await run_async(get_ppo_values, symbol, interval, series_type, fastperiod, slowperiod, matype, source)
     except Exception as e:
         return f"Error getting PPO data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_mom_data/{symbol}/{series_type}")
-async def get_mom_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_mom_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Momentum (MOM) values for a given symbol.
     """
     try:
-        return get_mom_values(symbol, interval, time_period, series_type)
+        return await run_async(get_mom_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting MOM data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_bop_data/{symbol}")
-async def get_bop_data_tool(symbol: str, interval: str = "daily") -> dict:
+async def get_bop_data_tool(symbol: str, interval: str = "daily", source: str = "api") -> dict:
     """
     Fetch Balance of Power (BOP) values for a given symbol.
     """
     try:
-        return get_bop_values(symbol, interval)
+        return await run_async(get_bop_values, symbol, interval, source=source)
     except Exception as e:
         return f"Error getting BOP data for {symbol}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_cci_data/{symbol}")
-async def get_cci_data_tool(symbol: str, interval: str = "daily", time_period: int = 60) -> dict:
+async def get_cci_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, source: str = "api") -> dict:
     """
     Fetch Commodity Channel Index (CCI) values for a given symbol.
     """
     try:
-        return get_cci_values(symbol, interval, time_period)
+        return await run_async(get_cci_values, symbol, interval, time_period, source=source)
     except Exception as e:
         return f"Error getting CCI data for {symbol}: {str(e)}"
 
 @mcp.tool()
 @app.get("/get_cmo_data/{symbol}/{series_type}")
-async def get_cmo_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_cmo_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Chande momentum oscillator (CMO) values for a given symbol.
     """
     try:
-        return get_cmo_values(symbol, interval, time_period, series_type)
+        return await run_async(get_cmo_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting CMO data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_roc_data/{symbol}/{series_type}")
-async def get_roc_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_roc_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch rate of change (ROC) values for a given symbol.
     """
     try:
-        return get_roc_values(symbol, interval, time_period, series_type)
+        return await run_async(get_roc_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting ROC data for {symbol} with series type {series_type}: {str(e)}"
     
 @mcp.tool()
 @app.get("/get_rocr_data/{symbol}/{series_type}")
-async def get_rocr_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_rocr_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch rate of change ratio (ROCR) values for a given symbol.
     """
     try:
-        return get_rocr_values(symbol, interval, time_period, series_type)
+        return await run_async(get_rocr_values, symbol, interval, time_period, series_type, source=source)
     except Exception as e:
         return f"Error getting ROCR data for {symbol} with series type {series_type}: {str(e)}"
 
 @mcp.tool()
 @app.get("/get_mama_data/{symbol}/{series_type}")
-async def get_mama_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+async def get_mama_data_tool(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close",
+                             fastlimit: float = 0.01, slowlimit: float = 0.01, source: str = "api") -> dict:
     """
     Gets the MESA Adaptive Moving Average (MAMA) data for a given symbol and series type.
     """
     try:
-        return get_mama_values(symbol, interval, time_period, series_type)
+        return await run_async(get_mama_values, symbol, interval, time_period, series_type, fastlimit, slowlimit, source)
     except Exception as e:
         return f"Error getting MAMA data for {symbol} with series type {series_type}: {str(e)}"
 
+@mcp.tool()
+@app.get("/get_cache_stats")
+async def get_cache_stats_tool() -> dict:
+    """
+    Gets hit/miss counters of the upstream response cache and the rate limiter state.
+    """
+    try:
+        return get_cache_stats()
+    except Exception as e:
+        return f"Error getting cache stats: {str(e)}"
+
 # Run the server
 if __name__ == "__main__":
     transport = "stdio"
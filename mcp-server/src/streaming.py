@@ -0,0 +1,338 @@
+from collections import deque
+from typing import Dict, List, Optional
+
+from timeseries import _series_id, price_series, store, sync_series
+
+# Incremental counterparts of the indicators in indicators.py. Each object
+# holds a few numbers of state, takes one bar per update() in constant
+# (amortized) time and reproduces the batch values bar for bar. State is
+# JSON serializable, so it can be checkpointed and resumed later.
+
+
+class _EMA:
+    """
+    EMA seeded with the mean of its first `period` inputs.
+    """
+
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        self.period = period
+        self.alpha = 2.0 / (period + 1) if alpha is None else alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def dump(self) -> list:
+        return [self.count, self.total, self.value]
+
+    def load(self, data: list) -> None:
+        self.count, self.total, self.value = data
+
+
+class _Window:
+    """
+    Rolling mean over the last `period` inputs.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque()
+        self.total = 0.0
+
+    def update(self, x: float) -> Optional[float]:
+        self.values.append(x)
+        self.total += x
+        if len(self.values) > self.period:
+            self.total -= self.values.popleft()
+        return self.total / self.period if len(self.values) == self.period else None
+
+    def dump(self) -> list:
+        return list(self.values)
+
+    def load(self, data: list) -> None:
+        self.values = deque(data)
+        # Re-summing on restore keeps rounding drift from accumulating
+        self.total = sum(data)
+
+
+class IncrementalIndicator:
+    """
+    Base class. Subclasses set `name`, take their parameters as keyword
+    arguments and implement update(bar), returning {output: value} once the
+    indicator is defined and None during warm-up.
+    """
+
+    name = ""
+
+    def __init__(self, **params):
+        self.params = params
+        self.value = None
+
+    @property
+    def key(self) -> str:
+        args = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}({args})"
+
+    def update(self, bar: dict) -> Optional[Dict[str, float]]:
+        raise NotImplementedError
+
+    def _dump(self) -> dict:
+        raise NotImplementedError
+
+    def _load(self, data: dict) -> None:
+        raise NotImplementedError
+
+    def state(self) -> dict:
+        return {"name": self.name, "params": self.params, "value": self.value, "data": self._dump()}
+
+    @staticmethod
+    def from_state(state: dict) -> "IncrementalIndicator":
+        indicator = INCREMENTAL_INDICATORS[state["name"]](**state["params"])
+        indicator._load(state["data"])
+        indicator.value = state["value"]
+        return indicator
+
+    def copy(self) -> "IncrementalIndicator":
+        return IncrementalIndicator.from_state(self.state())
+
+
+class IncrementalSMA(IncrementalIndicator):
+    name = "SMA"
+
+    def __init__(self, time_period: int = 20, series_type: str = "close"):
+        super().__init__(time_period=time_period, series_type=series_type)
+        self._window = _Window(time_period)
+
+    def update(self, bar):
+        value = self._window.update(bar[self.params["series_type"]])
+        self.value = None if value is None else {"SMA": value}
+        return self.value
+
+    def _dump(self):
+        return {"window": self._window.dump()}
+
+    def _load(self, data):
+        self._window.load(data["window"])
+
+
+class IncrementalEMA(IncrementalIndicator):
+    name = "EMA"
+
+    def __init__(self, time_period: int = 20, series_type: str = "close"):
+        super().__init__(time_period=time_period, series_type=series_type)
+        self._ema = _EMA(time_period)
+
+    def update(self, bar):
+        value = self._ema.update(bar[self.params["series_type"]])
+        self.value = None if value is None else {"EMA": value}
+        return self.value
+
+    def _dump(self):
+        return {"ema": self._ema.dump()}
+
+    def _load(self, data):
+        self._ema.load(data["ema"])
+
+
+class IncrementalRSI(IncrementalIndicator):
+    name = "RSI"
+
+    def __init__(self, time_period: int = 14, series_type: str = "close"):
+        super().__init__(time_period=time_period, series_type=series_type)
+        self._previous = None
+        self._gain = _EMA(time_period, alpha=1.0 / time_period)
+        self._loss = _EMA(time_period, alpha=1.0 / time_period)
+
+    def update(self, bar):
+        price = bar[self.params["series_type"]]
+        previous, self._previous = self._previous, price
+        if previous is None:
+            return None
+        change = price - previous
+        gain = self._gain.update(max(change, 0.0))
+        loss = self._loss.update(max(-change, 0.0))
+        if gain is not None:
+            self.value = {"RSI": 100 * gain / (gain + loss) if gain + loss else 0.0}
+        return self.value
+
+    def _dump(self):
+        return {"previous": self._previous, "gain": self._gain.dump(), "loss": self._loss.dump()}
+
+    def _load(self, data):
+        self._previous = data["previous"]
+        self._gain.load(data["gain"])
+        self._loss.load(data["loss"])
+
+
+class IncrementalMACD(IncrementalIndicator):
+    name = "MACD"
+
+    def __init__(self, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9, series_type: str = "close"):
+        if slowperiod < fastperiod:
+            fastperiod, slowperiod = slowperiod, fastperiod
+        super().__init__(fastperiod=fastperiod, slowperiod=slowperiod, signalperiod=signalperiod,
+                         series_type=series_type)
+        self._count = 0
+        self._fast = _EMA(fastperiod)
+        self._slow = _EMA(slowperiod)
+        self._signal = _EMA(signalperiod)
+
+    def update(self, bar):
+        price = bar[self.params["series_type"]]
+        self._count += 1
+        # The fast EMA starts where the slow one does, as in the batch version
+        if self._count > self.params["slowperiod"] - self.params["fastperiod"]:
+            self._fast.update(price)
+        slow = self._slow.update(price)
+        if slow is None:
+            return None
+        line = self._fast.value - slow
+        signal = self._signal.update(line)
+        if signal is not None:
+            self.value = {"MACD": line, "MACD_Signal": signal, "MACD_Hist": line - signal}
+        return self.value
+
+    def _dump(self):
+        return {"count": self._count, "fast": self._fast.dump(), "slow": self._slow.dump(),
+                "signal": self._signal.dump()}
+
+    def _load(self, data):
+        self._count = data["count"]
+        self._fast.load(data["fast"])
+        self._slow.load(data["slow"])
+        self._signal.load(data["signal"])
+
+
+class IncrementalStochastic(IncrementalIndicator):
+    name = "STOCH"
+
+    def __init__(self, fastk_period: int = 14, slowk_period: int = 3, slowd_period: int = 3):
+        super().__init__(fastk_period=fastk_period, slowk_period=slowk_period, slowd_period=slowd_period)
+        self._index = 0
+        # Monotonic deques of (index, price) give the window high and low in
+        # amortized constant time
+        self._highs = deque()
+        self._lows = deque()
+        self._slow_k = _Window(slowk_period)
+        self._slow_d = _Window(slowd_period)
+
+    def update(self, bar):
+        index, self._index = self._index, self._index + 1
+        while self._highs and self._highs[-1][1] <= bar["high"]:
+            self._highs.pop()
+        self._highs.append((index, bar["high"]))
+        while self._lows and self._lows[-1][1] >= bar["low"]:
+            self._lows.pop()
+        self._lows.append((index, bar["low"]))
+        start = index - self.params["fastk_period"] + 1
+        while self._highs[0][0] < start:
+            self._highs.popleft()
+        while self._lows[0][0] < start:
+            self._lows.popleft()
+        if start < 0:
+            return None
+        highest, lowest = self._highs[0][1], self._lows[0][1]
+        fast_k = 100 * (bar["close"] - lowest) / (highest - lowest) if highest != lowest else 0.0
+        slow_k = self._slow_k.update(fast_k)
+        slow_d = None if slow_k is None else self._slow_d.update(slow_k)
+        if slow_d is not None:
+            self.value = {"SlowK": slow_k, "SlowD": slow_d}
+        return self.value
+
+    def _dump(self):
+        return {"index": self._index, "highs": list(self._highs), "lows": list(self._lows),
+                "slow_k": self._slow_k.dump(), "slow_d": self._slow_d.dump()}
+
+    def _load(self, data):
+        self._index = data["index"]
+        self._highs = deque(tuple(item) for item in data["highs"])
+        self._lows = deque(tuple(item) for item in data["lows"])
+        self._slow_k.load(data["slow_k"])
+        self._slow_d.load(data["slow_d"])
+
+
+class IncrementalVWAP(IncrementalIndicator):
+    name = "VWAP"
+
+    def __init__(self):
+        super().__init__()
+        self._session = None
+        self._price_volume = 0.0
+        self._volume = 0.0
+
+    def update(self, bar):
+        # Cumulative sums restart with every trading day
+        session = bar["timestamp"][:10]
+        if session != self._session:
+            self._session, self._price_volume, self._volume = session, 0.0, 0.0
+        self._price_volume += (bar["high"] + bar["low"] + bar["close"]) / 3 * bar["volume"]
+        self._volume += bar["volume"]
+        self.value = {"VWAP": self._price_volume / self._volume} if self._volume > 0 else None
+        return self.value
+
+    def _dump(self):
+        return {"session": self._session, "price_volume": self._price_volume, "volume": self._volume}
+
+    def _load(self, data):
+        self._session = data["session"]
+        self._price_volume = data["price_volume"]
+        self._volume = data["volume"]
+
+
+INCREMENTAL_INDICATORS = {
+    cls.name: cls for cls in (
+        IncrementalSMA, IncrementalEMA, IncrementalRSI, IncrementalMACD, IncrementalStochastic, IncrementalVWAP,
+    )
+}
+
+
+def stream_indicators(symbol: str, interval: str, indicators: List[IncrementalIndicator]) -> Optional[dict]:
+    """
+    Bring checkpointed indicator state up to date with a symbol's stored
+    bars and return {"timestamp": latest bar, "values": {key: outputs}}.
+
+    Only bars newer than each checkpoint are fed. The newest bar can still
+    change until it closes, so it is applied to a copy and the checkpoint
+    stops just before it. A backfill rewrites history, so checkpoints taken
+    before it are discarded and the state is rebuilt from the stored bars.
+    """
+    params, data_key = price_series(symbol, interval)
+    if not sync_series(params, data_key, limit=1):
+        return None
+    series = _series_id(params)
+    backfilled_at = store.backfilled_at(series)
+
+    states = []
+    for indicator in indicators:
+        checkpoint = store.load_checkpoint(series, indicator.key)
+        if checkpoint is not None and checkpoint[1] == backfilled_at:
+            states.append((checkpoint[0], IncrementalIndicator.from_state(checkpoint[2])))
+        else:
+            states.append((None, indicator))
+
+    since = min((timestamp or "" for timestamp, _ in states), default="")
+    bars = [(timestamp, dict(prices, timestamp=timestamp)) for timestamp, prices in store.bars_after(series, since)]
+    if not bars:
+        return None
+    *closed, (latest, provisional) = bars
+
+    values = {}
+    for (checkpoint_at, state), indicator in zip(states, indicators):
+        fed = None
+        for timestamp, bar in closed:
+            if checkpoint_at is None or timestamp > checkpoint_at:
+                state.update(bar)
+                fed = timestamp
+        if fed is not None:
+            store.save_checkpoint(series, indicator.key, fed, backfilled_at, state.state())
+        values[indicator.key] = state.copy().update(provisional)
+    return {"timestamp": latest, "values": values}
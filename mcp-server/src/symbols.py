@@ -0,0 +1,213 @@
+import os
+import difflib
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, List, Optional
+
+from client import API_KEYS, add_request_check
+from tables import Table, load_table
+
+# How requests are checked against the local symbol index before they are
+# sent: "cached" checks only when the listing is already cached (the
+# default, never spends a call on it), "fetch" also fetches the listing when
+# needed (one call a day) and "off" disables the check.
+SYMBOL_CHECK = os.getenv("ALPHA_VANTAGE_SYMBOL_CHECK", "cached").lower()
+
+LISTING_PARAMS = {"function": "LISTING_STATUS", "state": "active", "apikey": API_KEYS[0]}
+
+# Functions whose symbol must be a US listed stock or ETF, the only ones the
+# listing can judge. Indicator endpoints also take FX and crypto pairs, so
+# they are left to upstream.
+CHECKED_FUNCTIONS = frozenset({
+    "TIME_SERIES_INTRADAY", "TIME_SERIES_DAILY", "TIME_SERIES_DAILY_ADJUSTED",
+    "TIME_SERIES_WEEKLY", "TIME_SERIES_WEEKLY_ADJUSTED", "TIME_SERIES_MONTHLY",
+    "TIME_SERIES_MONTHLY_ADJUSTED", "GLOBAL_QUOTE", "HISTORICAL_OPTIONS",
+    "EARNINGS_CALL_TRANSCRIPT", "INSIDER_TRADING", "OVERVIEW", "ETF_HOLDINGS",
+    "DIVIDEND_HISTORY", "SPLIT_HISTORY", "INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW",
+})
+
+
+class UnknownSymbol(ValueError):
+    """
+    Raised instead of sending a request for a symbol that is not listed.
+    """
+
+    def __init__(self, symbol: str, suggestions: List[str]):
+        message = f"Unknown symbol: {symbol}"
+        if suggestions:
+            message += f". Did you mean {', '.join(suggestions)}?"
+        super().__init__(message)
+        self.symbol = symbol
+        self.suggestions = suggestions
+
+
+class SymbolIndex:
+    """
+    Listed symbols in a sorted array for prefix search, plus a sorted array
+    of (name word, row) pairs so names can be searched by word prefix.
+    Misspellings are matched with difflib among entries sharing the first
+    letter, which keeps fuzzy lookups to a small slice of the listing.
+    """
+
+    def __init__(self, table: Table):
+        columns = table.columns
+        order = sorted(range(len(table)), key=lambda i: columns["symbol"][i].upper())
+        self.symbols = [columns["symbol"][i].upper() for i in order]
+        self.names = [columns["name"][i] for i in order]
+        self.exchanges = [columns["exchange"][i] for i in order]
+        self.asset_types = [columns["assetType"][i] for i in order]
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._words = sorted((word, i) for i, name in enumerate(self.names) for word in set(name.lower().split()))
+        self._word_keys = [word for word, _ in self._words]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        """
+        The listed form of a symbol, or None if it is not listed. Share
+        classes match with either separator (BRK.B and BRK-B).
+        """
+        symbol = symbol.strip().upper()
+        for candidate in (symbol, symbol.replace(".", "-"), symbol.replace("-", ".")):
+            if candidate in self._rows:
+                return candidate
+        return None
+
+    def is_plausible(self, symbol: str) -> bool:
+        """
+        Whether a request for the symbol may succeed: it is listed, or it
+        carries an exchange suffix (TSCO.LON) for a market the US listing
+        does not cover.
+        """
+        if self.resolve(symbol) is not None:
+            return True
+        _, _, suffix = symbol.strip().rpartition(".")
+        return "." in symbol and len(suffix) >= 2
+
+    def prefix(self, prefix: str) -> List[int]:
+        prefix = prefix.strip().upper()
+        first = bisect_left(self.symbols, prefix)
+        last = bisect_left(self.symbols, prefix + "\uffff")
+        return list(range(first, last))
+
+    def name_prefix(self, prefix: str) -> List[int]:
+        """
+        Rows with a name word starting with prefix, or with every word of a
+        multi-word prefix.
+        """
+        rows = None
+        for word in prefix.lower().split():
+            first = bisect_left(self._word_keys, word)
+            last = bisect_left(self._word_keys, word + "\uffff")
+            matches = {i for _, i in self._words[first:last]}
+            rows = matches if rows is None else rows & matches
+        return sorted(rows or ())
+
+    def suggest(self, symbol: str, n: int = 3) -> List[str]:
+        """
+        Listed symbols closest to a misspelled one.
+        """
+        symbol = symbol.strip().upper()
+        candidates = [self.symbols[i] for i in self.prefix(symbol[:1])]
+        return difflib.get_close_matches(symbol, candidates, n, cutoff=0.5)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Best matches for a symbol or company name: the exact symbol, then
+        symbols starting with the query, then names with words starting with
+        it, then close misspellings of either.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        rows = []
+        exact = self.resolve(query)
+        if exact is not None:
+            rows.append(self._rows[exact])
+        rows += self.prefix(query)
+        rows += self.name_prefix(query)
+        if len(dict.fromkeys(rows)) < limit:
+            rows += [self._rows[symbol] for symbol in self.suggest(query, limit)]
+            lowered = query.lower()
+            names = {self.names[i].lower(): i for i in self.name_prefix(lowered[:1])}
+            rows += [names[name] for name in difflib.get_close_matches(lowered, list(names), limit, cutoff=0.6)]
+        return [self.entry(i) for i in list(dict.fromkeys(rows))[:limit]]
+
+    def entry(self, row: int) -> dict:
+        return {
+            "symbol": self.symbols[row],
+            "name": self.names[row],
+            "exchange": self.exchanges[row],
+            "assetType": self.asset_types[row],
+        }
+
+
+# Seconds a lookup that found no cached listing is trusted. Until then, or
+# until the listing is requested, checks skip the cache lookup entirely; the
+# limit lets a listing cached by another server process be picked up.
+NO_LISTING_RECHECK = 300
+
+_index: Optional[tuple] = None
+_index_lock = threading.Lock()
+_no_listing_at: Optional[float] = None
+
+
+def symbol_index(fetch: bool = True) -> Optional[SymbolIndex]:
+    """
+    The SymbolIndex of the active listing. It is rebuilt whenever the daily
+    listing table is. Without fetch only a cached listing is used, and None
+    means none is cached.
+    """
+    global _index, _no_listing_at
+    if not fetch and _no_listing_at is not None and time.time() - _no_listing_at < NO_LISTING_RECHECK:
+        return None
+    table = load_table(LISTING_PARAMS, cached_only=not fetch)
+    if table is None:
+        if not fetch:
+            _no_listing_at = time.time()
+        return None
+    _no_listing_at = None
+    with _index_lock:
+        if _index is None or _index[0] is not table:
+            _index = (table, SymbolIndex(table))
+        return _index[1]
+
+
+def check_symbol(params: dict) -> None:
+    """
+    Request check refusing symbols the listing does not know, so a typo
+    costs no call. Symbols are only checked once an index is available.
+    """
+    global _no_listing_at
+    function = str(params.get("function", "")).upper()
+    if function == "LISTING_STATUS":
+        # The listing may be cached once this request is answered
+        _no_listing_at = None
+        return
+    symbol = params.get("symbol")
+    if (SYMBOL_CHECK == "off" or function not in CHECKED_FUNCTIONS
+            or not isinstance(symbol, str) or not symbol or "," in symbol):
+        return
+    index = symbol_index(fetch=SYMBOL_CHECK == "fetch")
+    if index is not None and not index.is_plausible(symbol):
+        raise UnknownSymbol(symbol, index.suggest(symbol))
+
+
+def symbol_errors(fetcher: Callable) -> Callable:
+    """
+    Decorator for fetchers whose requests are checked: a refused symbol is
+    returned as the usual {"error": ...} result, with the suggestions.
+    """
+    @functools.wraps(fetcher)
+    def wrapper(*args, **kwargs):
+        try:
+            return fetcher(*args, **kwargs)
+        except UnknownSymbol as e:
+            return {"error": str(e), "suggestions": e.suggestions}
+    return wrapper
+
+
+add_request_check(check_symbol)
@@ -0,0 +1,139 @@
+import io
+import os
+import csv
+import time
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Sequence
+
+from cache import TTLCache, cache_key, ttl_for
+from client import BASE_URL, cached_response, http_get
+
+
+class Table:
+    """
+    Rows of a CSV reply stored column-wise, with an index from symbol to
+    rows and, for every date column, the rows sorted by that date. Dates are
+    ISO strings, so a range query is two bisections.
+    """
+
+    def __init__(self, header: List[str], columns: List[list], date_columns: Sequence[str] = ()):
+        self.header = header
+        self.columns = dict(zip(header, columns))
+        self._length = len(columns[0]) if columns else 0
+        self._symbols = {}
+        for i, symbol in enumerate(self.columns.get("symbol", ())):
+            self._symbols.setdefault(symbol.upper(), []).append(i)
+        self._dates = {}
+        for name in date_columns:
+            values = self.columns[name]
+            order = sorted((i for i in range(self._length) if values[i] not in ("", "null")),
+                           key=values.__getitem__)
+            self._dates[name] = ([values[i] for i in order], order)
+
+    @classmethod
+    def from_csv(cls, content: bytes, date_columns: Sequence[str] = ()) -> Optional["Table"]:
+        """
+        Parse a CSV reply row by row. Returns None for the JSON error replies
+        Alpha Vantage sends instead of CSV.
+        """
+        if content[:64].lstrip()[:1] in (b"{", b"["):
+            return None
+        reader = csv.reader(io.TextIOWrapper(io.BytesIO(content), encoding="utf-8", newline=""))
+        header = next(reader, None)
+        if not header or not set(date_columns) <= set(header):
+            return None
+        columns = [[] for _ in header]
+        appends = [column.append for column in columns]
+        for row in reader:
+            if len(row) != len(header):
+                continue
+            for append, value in zip(appends, row):
+                append(value)
+        return cls(header, columns, date_columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def symbol(self, symbol: str) -> List[int]:
+        return self._symbols.get(symbol.upper(), [])
+
+    def between(self, column: str, start: Optional[str] = None, end: Optional[str] = None) -> List[int]:
+        """
+        Rows with start <= column <= end in date order. Dates may be given
+        as prefixes, e.g. "2024-05" for the whole month as end.
+        """
+        dates, order = self._dates[column]
+        first = 0 if start is None else bisect_left(dates, start)
+        # An end prefix covers every date starting with it
+        last = len(dates) if end is None else bisect_right(dates, end + "\uffff")
+        return order[first:last]
+
+    def select(self, symbol: Optional[str] = None, date_column: Optional[str] = None,
+               start: Optional[str] = None, end: Optional[str] = None, **equals: Optional[str]) -> List[int]:
+        """
+        Rows matching every given filter: a symbol, a date range on a date
+        column and case-insensitive column values. Rows come in date order
+        when a date column is given, else in payload order.
+        """
+        rows = None
+        if date_column is not None:
+            rows = self.between(date_column, start, end)
+        if symbol:
+            matches = self.symbol(symbol)
+            if rows is None:
+                rows = matches
+            else:
+                wanted = set(matches)
+                rows = [i for i in rows if i in wanted]
+        if rows is None:
+            rows = range(self._length)
+        for name, value in equals.items():
+            if value is None:
+                continue
+            column = self.columns[name]
+            value = value.lower()
+            rows = [i for i in rows if column[i].lower() == value]
+        return list(rows)
+
+    def records(self, rows: List[int], limit: Optional[int] = None) -> List[dict]:
+        rows = rows if not limit else rows[:limit]
+        return [{name: column[i] for name, column in self.columns.items()} for i in rows]
+
+    def query(self, rows: List[int], limit: Optional[int] = None) -> dict:
+        """
+        Tool result for a selection: the number of matches and at most
+        `limit` of them.
+        """
+        return {"count": len(rows), "rows": self.records(rows, limit)}
+
+
+# Parsed tables by request. Each one holds a whole CSV reply as Python
+# objects, so only the most recently used few are kept, and each expires
+# with the reply it was built from.
+TABLE_CACHE_ENTRIES = int(os.getenv("ALPHA_VANTAGE_TABLE_CACHE_ENTRIES", "8"))
+TABLE_CACHE_BYTES = int(os.getenv("ALPHA_VANTAGE_TABLE_CACHE_BYTES", str(32 * 1024 * 1024)))
+_tables = TTLCache(TABLE_CACHE_ENTRIES, TABLE_CACHE_BYTES)
+
+
+def load_table(params: dict, date_columns: Sequence[str] = (), cached_only: bool = False) -> Optional[Table]:
+    """
+    Fetch a CSV endpoint and return it as a Table. Tables are kept in memory
+    for the function's cache TTL (a day for the listing and calendar
+    endpoints), so repeated queries neither call upstream nor parse again.
+    With cached_only the table is only built from a cached reply, and None
+    means there is none.
+    """
+    key = cache_key(params)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+    response = cached_response(params) if cached_only else http_get(BASE_URL, params=params, timeout=60)
+    if response is None or response.status_code != 200:
+        return None
+    table = Table.from_csv(response.content, date_columns)
+    if table is not None:
+        # Sized by the CSV it was parsed from; a table built from a stale
+        # reply expires with that reply
+        _tables.set(key, table, ttl_for(params), size=len(response.content),
+                    stored_at=time.time() - (response.stale_age or 0))
+    return table
@@ -0,0 +1,340 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from cache import INTRADAY_INTERVALS, ttl_for
+from client import API_KEYS, BASE_URL, CACHE_DIR, http_get, json_loads
+from frames import Frame, csv_bars, parse_csv_series, parse_series, to_epoch
+from symbols import UnknownSymbol
+
+# Number of bars Alpha Vantage returns for outputsize=compact
+COMPACT_SIZE = 100
+
+# Wire format of time series requests. The CSV payload is about a quarter of
+# the size of the JSON one; set ALPHA_VANTAGE_SERIES_DATATYPE=json to go back.
+SERIES_DATATYPE = os.getenv("ALPHA_VANTAGE_SERIES_DATATYPE", "csv").lower()
+
+
+class TimeSeriesStore:
+    """
+    Local per-series bar store in SQLite. Every series is one columnar Frame
+    blob; merging a freshly fetched window replaces overlapping bars by
+    timestamp. Both the analytics and the Alpha Vantage shaped bars of the
+    time series tools are served from it.
+    """
+
+    def __init__(self, directory: str, filename: str = "timeseries.sqlite3"):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS series ("
+            " series TEXT PRIMARY KEY,"
+            " backfilled_at REAL,"
+            " synced_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " series TEXT NOT NULL,"
+            " indicator TEXT NOT NULL,"
+            " timestamp TEXT NOT NULL,"
+            " backfilled_at REAL,"
+            " state TEXT NOT NULL,"
+            " PRIMARY KEY (series, indicator)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS frames ("
+            " series TEXT PRIMARY KEY,"
+            " daily INTEGER NOT NULL,"
+            " names TEXT NOT NULL,"
+            " timestamps BLOB NOT NULL,"
+            " columns BLOB NOT NULL)"
+        )
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bars'").fetchone():
+            self._convert_bars(conn)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def backfilled_at(self, series: str) -> Optional[float]:
+        row = self._connection().execute(
+            "SELECT backfilled_at FROM series WHERE series = ?", (series,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def is_backfilled(self, series: str) -> bool:
+        return self.backfilled_at(series) is not None
+
+    def synced_at(self, series: str) -> Optional[float]:
+        row = self._connection().execute(
+            "SELECT synced_at FROM series WHERE series = ?", (series,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def latest_timestamp(self, series: str) -> Optional[str]:
+        latest = self.frame(series).latest()
+        return latest[0] if latest is not None else None
+
+    def merge(self, series: str, frame: Frame, backfill: bool = False) -> None:
+        """
+        Upsert bars into a series. A backfill replaces the stored bars,
+        since a full payload is the authoritative history.
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not backfill:
+                frame = self._load_frame(conn, series).merge(frame)
+            conn.execute(
+                "INSERT INTO series (series, backfilled_at, synced_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (series) DO UPDATE SET synced_at = excluded.synced_at,"
+                " backfilled_at = COALESCE(excluded.backfilled_at, series.backfilled_at)",
+                (series, now if backfill else None, now),
+            )
+            self._save_frame(conn, series, frame)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def bars(self, series: str, limit: Optional[int] = None) -> dict:
+        """
+        Stored bars newest first, in Alpha Vantage's {timestamp: bar} shape.
+        """
+        return self.frame(series).tail(limit).to_bars()
+
+    def frame(self, series: str) -> Frame:
+        """
+        All stored bars of a series as a Frame, empty if there are none.
+        """
+        return self._load_frame(self._connection(), series)
+
+    def _load_frame(self, conn: sqlite3.Connection, series: str) -> Frame:
+        row = conn.execute(
+            "SELECT daily, names, timestamps, columns FROM frames WHERE series = ?", (series,)
+        ).fetchone()
+        if row is None:
+            return Frame.empty()
+        return Frame.load(row[1], row[2], row[3], bool(row[0]))
+
+    def _convert_bars(self, conn: sqlite3.Connection) -> None:
+        # Stores written before frames existed kept every bar as a JSON row.
+        # Series without a frame are converted once, then the rows go.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT series, timestamp, bar FROM bars"
+                " WHERE series NOT IN (SELECT series FROM frames) ORDER BY series"
+            ).fetchall()
+            by_series: Dict[str, dict] = {}
+            for series, timestamp, bar in rows:
+                by_series.setdefault(series, {})[timestamp] = json_loads(bar)
+            for series, bars in by_series.items():
+                self._save_frame(conn, series, Frame.from_bars(bars))
+            conn.execute("DROP TABLE bars")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _save_frame(conn: sqlite3.Connection, series: str, frame: Frame) -> None:
+        names, timestamps, columns = frame.dump()
+        conn.execute(
+            "INSERT OR REPLACE INTO frames (series, daily, names, timestamps, columns) VALUES (?, ?, ?, ?, ?)",
+            (series, int(frame.daily), names, timestamps, columns),
+        )
+
+    def price_columns(self, series: str, limit: Optional[int] = None) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """
+        The newest `limit` bars as (timestamps, columns), oldest first, with
+        adjusted float64 open/high/low/close/volume arrays.
+        """
+        frame = self.frame(series).tail(limit)
+        return frame.labels(), frame.prices()
+
+    def bars_after(self, series: str, timestamp: Optional[str] = None) -> List[Tuple[str, Dict[str, float]]]:
+        """
+        Stored bars later than timestamp (all of them for None), oldest first,
+        as (timestamp, adjusted open/high/low/close/volume).
+        """
+        frame = self.frame(series)
+        if timestamp:
+            frame = frame.take(slice(int(np.searchsorted(frame.timestamps, to_epoch(timestamp), side="right")), None))
+        prices = {name: values.tolist() for name, values in frame.prices().items()}
+        return [(label, {name: values[i] for name, values in prices.items()})
+                for i, label in enumerate(frame.labels())]
+
+    def load_checkpoint(self, series: str, indicator: str) -> Optional[tuple]:
+        """
+        Return (timestamp, backfilled_at, state) of an indicator checkpoint.
+        """
+        row = self._connection().execute(
+            "SELECT timestamp, backfilled_at, state FROM checkpoints WHERE series = ? AND indicator = ?",
+            (series, indicator),
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def save_checkpoint(self, series: str, indicator: str, timestamp: str,
+                        backfilled_at: Optional[float], state: dict) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO checkpoints (series, indicator, timestamp, backfilled_at, state)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (series, indicator, timestamp, backfilled_at, json.dumps(state)),
+        )
+
+
+store = TimeSeriesStore(CACHE_DIR)
+
+
+def _series_id(params: dict) -> str:
+    parts = [params["function"], params["symbol"].upper()]
+    if params.get("interval"):
+        parts.append(params["interval"])
+    return ":".join(parts)
+
+
+def _needs_backfill(frame: Frame, latest: str) -> bool:
+    latest = to_epoch(latest)
+    # Compact windows that no longer overlap the stored history leave a gap
+    if frame.timestamps[0] > latest:
+        return True
+    # A new dividend or split rewrites every earlier adjusted price
+    new = frame.timestamps > latest
+    if "dividend_amount" in frame and np.any(np.nan_to_num(frame["dividend_amount"][new]) != 0):
+        return True
+    if "split_coefficient" in frame and np.any(np.nan_to_num(frame["split_coefficient"][new], nan=1.0) != 1):
+        return True
+    return False
+
+
+def series_params(params: dict) -> dict:
+    """
+    Request params of a time series in the configured wire format.
+    """
+    return dict(params, datatype="csv") if SERIES_DATATYPE == "csv" else params
+
+
+def _is_csv(content: bytes) -> bool:
+    # Error and throttling replies are JSON whatever datatype was asked for
+    return content[:64].lstrip()[:1] not in (b"{", b"[", b"")
+
+
+def series_bars(response, data_key: str) -> Optional[dict]:
+    """
+    Bars of a time series reply in the JSON format's {timestamp: bar} shape,
+    whichever format it came in. None when the reply holds no bars.
+    """
+    if _is_csv(response.content):
+        return csv_bars(response.content)
+    data = response.json()
+    return data.get(data_key) if isinstance(data, dict) else None
+
+
+def decode_series(response, data_key: str) -> Optional[Frame]:
+    """
+    A time series reply as a Frame, parsed straight from the body so full
+    histories never become nested dicts.
+    """
+    if _is_csv(response.content):
+        return parse_csv_series(response.content)
+    return parse_series(response.content, data_key)
+
+
+def _fetch_bars(params: dict, data_key: str, outputsize: str) -> Optional[Frame]:
+    response = http_get(BASE_URL, params=series_params(dict(params, outputsize=outputsize)), timeout=30)
+    if response.status_code != 200:
+        return None
+    return decode_series(response, data_key)
+
+
+def sync_series(params: dict, data_key: str, limit: Optional[int] = None) -> Optional[dict]:
+    """
+    Bring the local copy of a time series up to date and return the stored
+    bars newest first, at most `limit` of them.
+
+    The first sync of a series does one outputsize=full backfill. Later syncs
+    fetch outputsize=compact and merge the new bars, falling back to a full
+    backfill only when the compact window leaves a gap or adjusted history
+    changed. A series synced within its cache TTL is served from the store
+    without asking upstream. If upstream fails, is throttled or cannot be
+    reached, the stored bars are returned as they are; None means there is
+    no data at all.
+    """
+    series = _series_id(params)
+    latest = store.latest_timestamp(series) if store.is_backfilled(series) else None
+    if latest is not None and time.time() - store.synced_at(series) < ttl_for(params):
+        return store.bars(series, limit)
+
+    try:
+        if latest is not None:
+            bars = _fetch_bars(params, data_key, "compact")
+            if bars is None:
+                return store.bars(series, limit)
+            if not _needs_backfill(bars, latest):
+                store.merge(series, bars)
+                return store.bars(series, limit)
+
+        bars = _fetch_bars(params, data_key, "full")
+    except (requests.RequestException, UnknownSymbol):
+        # Throttled, out of quota or unreachable: stored bars beat no bars
+        stored = store.bars(series, limit)
+        if stored:
+            return stored
+        raise
+    if bars is not None:
+        store.merge(series, bars, backfill=True)
+    return store.bars(series, limit) or None
+
+
+# Adjusted series for the bar sizes indicators are computed on. Alpha Vantage
+# computes its indicators on split and dividend adjusted prices, and intraday
+# bars come adjusted already.
+PRICE_SERIES = {
+    "daily": ("TIME_SERIES_DAILY_ADJUSTED", "Time Series (Daily)"),
+    "weekly": ("TIME_SERIES_WEEKLY_ADJUSTED", "Weekly Adjusted Time Series"),
+    "monthly": ("TIME_SERIES_MONTHLY_ADJUSTED", "Monthly Adjusted Time Series"),
+}
+
+
+def price_series(symbol: str, interval: str) -> Tuple[dict, str]:
+    """
+    Request params and payload key of the adjusted series for an interval.
+    """
+    params = {"symbol": symbol, "apikey": API_KEYS[0]}
+    if interval in INTRADAY_INTERVALS:
+        params.update(function="TIME_SERIES_INTRADAY", interval=interval)
+        return params, "Time Series ({})".format(interval)
+    if interval in PRICE_SERIES:
+        params["function"], data_key = PRICE_SERIES[interval]
+        return params, data_key
+    raise ValueError(f"Unsupported interval: {interval}")
+
+
+def load_prices(symbol: str, interval: str = "daily") -> Optional[Tuple[List[str], Dict[str, np.ndarray]]]:
+    """
+    Sync a symbol's bars for an interval and return (timestamps, columns),
+    oldest first, with float64 open/high/low/close/volume arrays. Prices are
+    adjusted, so local indicators line up with Alpha Vantage's.
+    """
+    params, data_key = price_series(symbol, interval)
+    if not sync_series(params, data_key, limit=1):
+        return None
+    return store.price_columns(_series_id(params))
@@ -1,53 +1,121 @@
 import os
+import time
+from bisect import bisect_left
+import numpy as np
 import requests
 from dotenv import load_dotenv
-from typing import Optional
+from typing import List, Optional
+
+from cache import INTRADAY_INTERVALS
+from client import (API_KEYS, BASE_URL, async_inflight, disk_cache, http_get, inflight, key_pool, response_cache,
+                    run_async, run_async_batch, run_batch)
+from ratelimit import RateLimitExceeded
+from indicators import (anchored_vwap, apo, evaluate, bop, cci, check_params, cmo, dema, directional_movement, ema, kama, macd, macdext, mama, mom, ppo, roc, rocr, rsi, sma,
+                        session_starts, stoch, stochf, stochrsi, t3, tema, to_av_series, trima, vwap, willr, wma)
+from screener import screen
+from streaming import (IncrementalEMA, IncrementalMACD, IncrementalRSI, IncrementalSMA, IncrementalStochastic,
+                       IncrementalVWAP, stream_indicators)
+from symbols import UnknownSymbol, symbol_errors, symbol_index
+from tables import load_table
+from timeseries import COMPACT_SIZE, decode_series, load_prices, price_series, series_bars, series_params, sync_series
 
 # Load environment variables
 
 load_dotenv()
 
+# Key used to build request params; the client swaps in the least loaded key
+# of the pool when the request is actually sent.
+API_KEY = API_KEYS[0]
+
+# REALTIME_BULK_QUOTES is premium only. "auto" tries it and falls back to one
+# GLOBAL_QUOTE per symbol once the key turns out not to support it.
+BULK_QUOTES = os.getenv("ALPHA_VANTAGE_BULK_QUOTES", "auto").lower()
+BULK_QUOTE_SIZE = 100
+_bulk_quotes_supported = None
+
+def local_indicator(symbol: str, interval: str, series_type: str, compute, **params) -> dict:
+    """
+    Compute an indicator locally from the stored price series instead of
+    calling its endpoint. compute maps the series_type price array to
+    {name: values}, or all OHLCV columns plus the timestamps when
+    series_type is None. params are the periods and matypes compute uses,
+    checked as evaluate checks them.
+    """
+    try:
+        check_params(params)
+        prices = load_prices(symbol, interval)
+    except ValueError as e:
+        return {"error": str(e)}
+    if prices is None:
+        return {"error": "Missing price data"}
+    timestamps, columns = prices
+    if series_type is None:
+        return to_av_series(timestamps, compute(dict(columns, timestamp=timestamps)))
+    if series_type not in columns:
+        return {"error": f"Unsupported series type: {series_type}"}
+    return to_av_series(timestamps, compute(columns[series_type]))
+
+def get_cache_stats() -> dict:
+    """
+    Get hit/miss counters of the response caches, the rate limiter state per key and
+    how many requests were coalesced onto an identical in-flight call.
+    """
+    return {
+        "cache": response_cache.stats(),
+        "disk_cache": disk_cache.stats() if disk_cache is not None else None,
+        "rate_limit": key_pool.stats(),
+        "coalesced_requests": inflight.coalesced + async_inflight.coalesced,
+    }
+
 def get_current_price(symbol: str) -> str:
     """
     Gets the current price of a stock from Alpha Vantage API.
     """
-    apikey = os.getenv("ALPHA_VANTAGE_API_KEY")
+    apikey = API_KEY
     if not apikey:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
-    url = (
-        "https://www.alphavantage.co/query"
-        f"?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval=5min&apikey={apikey}"
-    )
+    url = BASE_URL
+    params = {
+        "function": "TIME_SERIES_INTRADAY",
+        "symbol": symbol,
+        "interval": "5min",
+        "apikey": apikey
+    }
     
     try:
-        response = requests.get(url, timeout=10)
+        response = http_get(url, params=series_params(params), timeout=10)
         response.raise_for_status()
-        data = response.json()
-        
-        # Check if there's an error in the response
-        if "Error Message" in data:
-            return f"Error: Symbol {symbol} is not valid"
+        parsed = decode_series(response, "Time Series (5min)")
         
-        if "Note" in data:
-            return "Error: API limit reached. Try again later."
-        
-        if "Time Series (5min)" not in data:
+        if parsed is None:
+            data = response.json()
+            
+            # Check if there's an error in the response
+            if "Error Message" in data:
+                return f"Error: Symbol {symbol} is not valid"
+            
+            if "Note" in data:
+                return "Error: API limit reached. Try again later."
+            
             return f"Error: Could not get data for {symbol}"
         
         # Get most recent price
-        time_series = data["Time Series (5min)"]
-        latest_time = sorted(time_series.keys())[-1]
-        latest_data = time_series[latest_time]
-        latest_price = latest_data["4. close"]
+        latest_time, latest_data = parsed.latest()
+        latest_price = f"{latest_data['close']:.4f}"
         
         return f"{symbol}: ${latest_price} (updated: {latest_time})"
         
+    except UnknownSymbol as e:
+        return f"Error: {str(e)}"
+    except RateLimitExceeded:
+        return "Error: API limit reached. Try again later."
     except requests.RequestException as e:
         return f"Connection error: {str(e)}"
     except Exception as e:
         return f"Data processing error: {str(e)}"
 
+@symbol_errors
 def get_stock_price(symbol: str) -> dict:
     """
     Get the latest intraday stock price.
@@ -59,51 +127,50 @@ def get_stock_price(symbol: str) -> dict:
         "interval": "1min",
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
     if response.status_code == 200:
-        data = response.json()
-        if "Time Series (1min)" in data:
-            return data["Time Series (1min)"]
+        bars = series_bars(response, "Time Series (1min)")
+        if bars:
+            return bars
         return {"error": "Missing intraday data"}
     return {"error": "Failed to fetch data"}
 
-def get_intraday(symbol: str, interval: Optional[str] = "1min") -> dict:
+@symbol_errors
+def get_intraday(symbol: str, interval: Optional[str] = "1min", outputsize: str = "compact") -> dict:
     """
     Fetch intraday time series for a given stock symbol.
+    Bars are kept in the local time series store and refreshed incrementally.
     """
-    url = "https://www.alphavantage.co/query"
     params = {
         "function": "TIME_SERIES_INTRADAY",
         "symbol": symbol,
         "interval": interval,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        data = response.json()
-        if "Time Series ({})".format(interval) in data:
-            return data["Time Series ({})".format(interval)]
-        return {"error": "Missing intraday data"}
-    return {"error": "Failed to fetch data"}
+    limit = None if outputsize == "full" else COMPACT_SIZE
+    data = sync_series(params, "Time Series ({})".format(interval), limit)
+    if data:
+        return data
+    return {"error": "Missing intraday data"}
 
-def get_daily_adjusted(symbol: str) -> dict:
+@symbol_errors
+def get_daily_adjusted(symbol: str, outputsize: str = "compact") -> dict:
     """
     Fetch daily adjusted time series data for a given symbol.
+    Bars are kept in the local time series store and refreshed incrementally.
     """
-    url = "https://www.alphavantage.co/query"
     params = {
         "function": "TIME_SERIES_DAILY_ADJUSTED",
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        data = response.json()
-        if "Time Series (Daily)" in data:
-            return data["Time Series (Daily)"]
-        return {"error": "Missing daily adjusted data"}
-    return {"error": "Failed to fetch data"}
+    limit = None if outputsize == "full" else COMPACT_SIZE
+    data = sync_series(params, "Time Series (Daily)", limit)
+    if data:
+        return data
+    return {"error": "Missing daily adjusted data"}
 
+@symbol_errors
 def get_weekly(symbol: str) -> dict:
     """
     Fetch weekly time series data for a given symbol.
@@ -114,14 +181,15 @@ def get_weekly(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
     if response.status_code == 200:
-        data = response.json()
-        if "Weekly Time Series" in data:
-            return data["Weekly Time Series"]
+        bars = series_bars(response, "Weekly Time Series")
+        if bars:
+            return bars
         return {"error": "Missing weekly data"}
     return {"error": "Failed to fetch data"}
 
+@symbol_errors
 def get_weekly_adjusted(symbol: str) -> dict:
     """
     Fetch weekly adjusted time series data for a given symbol.
@@ -132,14 +200,15 @@ def get_weekly_adjusted(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
     if response.status_code == 200:
-        data = response.json()
-        if "Weekly Adjusted Time Series" in data:
-            return data["Weekly Adjusted Time Series"]
+        bars = series_bars(response, "Weekly Adjusted Time Series")
+        if bars:
+            return bars
         return {"error": "Missing weekly adjusted data"}
     return {"error": "Failed to fetch data"}
 
+@symbol_errors
 def get_monthly(symbol: str) -> dict:
     """
     Fetch monthly time series data for a given symbol.
@@ -150,14 +219,15 @@ def get_monthly(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
     if response.status_code == 200:
-        data = response.json()
-        if "Monthly Time Series" in data:
-            return data["Monthly Time Series"]
+        bars = series_bars(response, "Monthly Time Series")
+        if bars:
+            return bars
         return {"error": "Missing monthly data"}
     return {"error": "Failed to fetch data"}
 
+@symbol_errors
 def get_monthly_adjusted(symbol: str) -> dict:
     """
     Fetch monthly adjusted time series data for a given symbol.
@@ -168,14 +238,15 @@ def get_monthly_adjusted(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
     if response.status_code == 200:
-        data = response.json()
-        if "Monthly Adjusted Time Series" in data:
-            return data["Monthly Adjusted Time Series"]
+        bars = series_bars(response, "Monthly Adjusted Time Series")
+        if bars:
+            return bars
         return {"error": "Missing monthly adjusted data"}
     return {"error": "Failed to fetch data"}
 
+@symbol_errors
 def get_quote(symbol: str) -> dict:
     """
     Fetch the current global quote for a given stock symbol.
@@ -186,7 +257,7 @@ def get_quote(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Global Quote" in data:
@@ -194,6 +265,116 @@ def get_quote(symbol: str) -> dict:
         return {"error": "Missing global quote data"}
     return {"error": "Failed to fetch data"}
 
+def bulk_quotes_enabled() -> bool:
+    """
+    Whether batch quotes should try REALTIME_BULK_QUOTES first.
+    """
+    if BULK_QUOTES in ("false", "0", "no"):
+        return False
+    return _bulk_quotes_supported is not False
+
+def get_bulk_quotes(symbols: List[str]) -> dict:
+    """
+    Fetch realtime quotes for many symbols with REALTIME_BULK_QUOTES, 100
+    symbols per request, in the same format get_quote returns.
+    """
+    global _bulk_quotes_supported
+    url = "https://www.alphavantage.co/query"
+    quotes = {}
+    for start in range(0, len(symbols), BULK_QUOTE_SIZE):
+        params = {
+            "function": "REALTIME_BULK_QUOTES",
+            "symbol": ",".join(symbols[start:start + BULK_QUOTE_SIZE]),
+            "apikey": API_KEY
+        }
+        response = http_get(url, params=params)
+        if response.status_code != 200:
+            return {"error": "Failed to fetch data"}
+        data = response.json()
+        if "data" not in data:
+            if "premium" in str(data.get("Information", "")).lower():
+                _bulk_quotes_supported = False
+            return {"error": data.get("Information") or "Missing bulk quote data"}
+        _bulk_quotes_supported = True
+        for item in data["data"]:
+            quotes[item["symbol"]] = {
+                "01. symbol": item["symbol"],
+                "02. open": item.get("open"),
+                "03. high": item.get("high"),
+                "04. low": item.get("low"),
+                "05. price": item.get("close"),
+                "06. volume": item.get("volume"),
+                "07. latest trading day": str(item.get("timestamp", ""))[:10],
+                "08. previous close": item.get("previous_close"),
+                "09. change": item.get("change"),
+                "10. change percent": item.get("change_percent"),
+            }
+    return quotes
+
+def normalize_symbols(symbols: List[str]) -> List[str]:
+    """
+    Upper-case, strip and de-duplicate symbols, keeping their order.
+    """
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+def quotes_result(symbols: List[str], outcomes: list, bulk: Optional[dict] = None) -> dict:
+    """
+    Build the batch quote reply: quotes that arrived (from bulk requests or
+    one outcome per remaining symbol), per-symbol errors, and symbols still
+    pending at the deadline.
+    """
+    result = {"quotes": dict(bulk or {}), "errors": {}, "pending": []}
+    for symbol, outcome in zip(symbols, outcomes):
+        if isinstance(outcome, TimeoutError):
+            result["pending"].append(symbol)
+        elif isinstance(outcome, Exception):
+            result["errors"][symbol] = str(outcome)
+        elif not isinstance(outcome, dict) or "error" in outcome or not outcome:
+            result["errors"][symbol] = outcome.get("error", "No quote returned") if isinstance(outcome, dict) else str(outcome)
+        else:
+            result["quotes"][symbol] = outcome
+    return result
+
+def _bulk_chunks(symbols: List[str]) -> List[tuple]:
+    return [(symbols[i:i + BULK_QUOTE_SIZE],) for i in range(0, len(symbols), BULK_QUOTE_SIZE)]
+
+def _merge_bulk(outcomes: list) -> dict:
+    quotes = {}
+    for outcome in outcomes:
+        if isinstance(outcome, dict) and "error" not in outcome:
+            quotes.update(outcome)
+    return quotes
+
+def get_quotes(symbols: List[str], timeout: float = 60) -> dict:
+    """
+    Fetch global quotes for many symbols concurrently under the rate limit.
+    Bulk requests are used when the key supports them, symbols they miss
+    fall back to one GLOBAL_QUOTE each. Symbols that fail are reported under
+    "errors"; symbols not done within timeout seconds are listed under
+    "pending".
+    """
+    symbols = normalize_symbols(symbols)
+    deadline = time.monotonic() + timeout
+    bulk = {}
+    if bulk_quotes_enabled():
+        bulk = _merge_bulk(run_batch(get_bulk_quotes, _bulk_chunks(symbols), timeout))
+    remaining = [symbol for symbol in symbols if symbol not in bulk]
+    outcomes = run_batch(get_quote, [(symbol,) for symbol in remaining], max(deadline - time.monotonic(), 0))
+    return quotes_result(remaining, outcomes, bulk)
+
+async def get_quotes_async(symbols: List[str], timeout: float = 60) -> dict:
+    """
+    Async counterpart of get_quotes for the server's event loop.
+    """
+    symbols = normalize_symbols(symbols)
+    deadline = time.monotonic() + timeout
+    bulk = {}
+    if bulk_quotes_enabled():
+        bulk = _merge_bulk(await run_async_batch(get_bulk_quotes, _bulk_chunks(symbols), timeout))
+    remaining = [symbol for symbol in symbols if symbol not in bulk]
+    outcomes = await run_async_batch(get_quote, [(symbol,) for symbol in remaining], max(deadline - time.monotonic(), 0))
+    return quotes_result(remaining, outcomes, bulk)
+
 def get_market_status() -> dict:
     """
     Fetch the current global market status.
@@ -203,11 +384,12 @@ def get_market_status() -> dict:
         "function": "MARKET_STATUS",
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         return response.json()
     return {"error": "Failed to fetch market status"}
 
+@symbol_errors
 def get_historical_options_simple(symbol: str, date: Optional[str] = None, datatype: str = "json") -> dict:
     if not API_KEY:
         return {"error": "API key not configured"}
@@ -215,7 +397,7 @@ def get_historical_options_simple(symbol: str, date: Optional[str] = None, datat
     params = {"function": "HISTORICAL_OPTIONS", "symbol": symbol, "apikey": API_KEY, "datatype": datatype}
     if date:
         params["date"] = date
-    response = requests.get(url, params=params, timeout=10)
+    response = http_get(url, params=params, timeout=10)
     response.raise_for_status()
     if datatype == "json":
         return response.json()
@@ -232,14 +414,14 @@ def get_news_sentiment(symbol: str) -> dict:
         "tickers": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
 
+@symbol_errors
 def get_earnings_transcript(symbol: str) -> dict:
     """
     Fetch earnings call transcript for a symbol.
@@ -250,13 +432,12 @@ def get_earnings_transcript(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
 
 def get_top_gainers_losers() -> dict:
     """
@@ -267,14 +448,14 @@ def get_top_gainers_losers() -> dict:
         "function": "TOP_GAINERS_LOSERS",
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
 
+@symbol_errors
 def get_insider_transactions(symbol: str) -> dict:
     """
     Fetch insider transactions trending data for a symbol.
@@ -285,13 +466,12 @@ def get_insider_transactions(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
 
 def get_analytics_fixed(symbol: str, function: str,
                         interval: str = "daily", time_period: int = 10,
@@ -308,13 +488,12 @@ def get_analytics_fixed(symbol: str, function: str,
         "series_type": series_type,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
 
 def get_analytics_sliding(symbol: str, function: str,
                           interval: str = "daily", time_period: int = 10,
@@ -331,14 +510,14 @@ def get_analytics_sliding(symbol: str, function: str,
         "series_type": series_type,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
+@symbol_errors
 def get_fundamental_data(symbol: str) -> dict:
     """
     Fetch fundamental data for a symbol.
@@ -349,13 +528,12 @@ def get_fundamental_data(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch fundamental data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch fundamental data"}
 
 def get_company_overview_trending() -> dict:
     """
@@ -366,14 +544,14 @@ def get_company_overview_trending() -> dict:
         "function": "TRENDING_COMPANY_OVERVIEW",
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch trending company overview"}
+        if data:
+            return data
+    return {"error": "Failed to fetch trending company overview"}
 
+@symbol_errors
 def get_etf_profile_and_holdings(symbol: str) -> dict:
     """
     Fetch ETF profile and holdings for a symbol.
@@ -384,14 +562,14 @@ def get_etf_profile_and_holdings(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch ETF profile and holdings"}
+        if data:
+            return data
+    return {"error": "Failed to fetch ETF profile and holdings"}
 
+@symbol_errors
 def get_corporate_action_dividends(symbol: str) -> dict:
     """
     Fetch corporate action dividend data for a symbol.
@@ -402,14 +580,14 @@ def get_corporate_action_dividends(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch dividend data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch dividend data"}
 
+@symbol_errors
 def get_corporate_action_splits(symbol: str) -> dict:
     """
     Fetch corporate action splits data for a symbol.
@@ -420,14 +598,14 @@ def get_corporate_action_splits(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch split data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch split data"}
 
+@symbol_errors
 def get_income_statement(symbol: str) -> dict:
     """
     Fetch income statement data for a company symbol.
@@ -438,14 +616,14 @@ def get_income_statement(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch income statement data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch income statement data"}
 
+@symbol_errors
 def get_balance_sheet(symbol: str) -> dict:
     """
     Fetch the balance sheet data for a company symbol.
@@ -456,14 +634,14 @@ def get_balance_sheet(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch balance sheet data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch balance sheet data"}
 
+@symbol_errors
 def get_cash_flow(symbol: str) -> dict:
     """
     Fetch the cash flow statement for a company symbol.
@@ -474,13 +652,12 @@ def get_cash_flow(symbol: str) -> dict:
         "symbol": symbol,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch cash flow data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch cash flow data"}
 
 def get_earnings_trending() -> dict:
     """
@@ -491,68 +668,83 @@ def get_earnings_trending() -> dict:
         "function": "EARNINGS_TRENDING",
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch earnings trending data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch earnings trending data"}
 
-def get_listing_delisting_status() -> dict:
+def get_listing_delisting_status(symbol: Optional[str] = None, exchange: Optional[str] = None,
+                                 asset_type: Optional[str] = None, state: str = "active",
+                                 date: Optional[str] = None, limit: int = 100) -> dict:
     """
-    Fetch listing and delisting status data.
+    Look up listed securities, or delisted ones with state="delisted", as of
+    today or a past date. The full listing is fetched at most once a day and
+    filtered locally by symbol, exchange and asset type (Stock or ETF).
+    Returns the number of matches and at most `limit` of them.
     """
-    url = "https://www.alphavantage.co/query"
     params = {
         "function": "LISTING_STATUS",
+        "state": state,
+        "date": date,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        data = response.json()
-    if data:
-        return data
-    else:
+    table = load_table(params)
+    if table is None:
         return {"error": "Failed to fetch listing/delisting status"}
+    return table.query(table.select(symbol, exchange=exchange, assetType=asset_type), limit)
 
-def get_earnings_calendar() -> dict:
+def search_symbols(query: str, limit: int = 10) -> dict:
     """
-    Fetch earnings calendar data.
+    Search listed stocks and ETFs by symbol or company name, answered from a
+    local index of the daily listing: exact symbol first, then symbol and
+    name word prefixes, then close misspellings.
+    """
+    index = symbol_index()
+    if index is None:
+        return {"error": "Failed to fetch listing status"}
+    return {"query": query, "matches": index.search(query, limit)}
+
+def get_earnings_calendar(symbol: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                          horizon: str = "3month", limit: int = 100) -> dict:
+    """
+    Fetch upcoming earnings reports within the horizon (3month, 6month or
+    12month), optionally for one symbol and between start and end report
+    dates (YYYY-MM-DD). The calendar is fetched at most once a day and
+    filtered locally. Returns the number of matches and at most `limit` of
+    them, by report date.
     """
-    url = "https://www.alphavantage.co/query"
     params = {
         "function": "EARNINGS_CALENDAR",
+        "horizon": horizon,
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        data = response.json()
-    if data:
-        return data
-    else:
+    table = load_table(params, ("reportDate",))
+    if table is None:
         return {"error": "Failed to fetch earnings calendar"}
+    return table.query(table.select(symbol, "reportDate", start, end), limit)
 
-def get_ipo_calendar() -> dict:
+def get_ipo_calendar(start: Optional[str] = None, end: Optional[str] = None, exchange: Optional[str] = None,
+                     limit: int = 100) -> dict:
     """
-    Fetch IPO calendar data.
+    Fetch upcoming IPOs, optionally between start and end IPO dates
+    (YYYY-MM-DD) and on one exchange. The calendar is fetched at most once a
+    day and filtered locally. Returns the number of matches and at most
+    `limit` of them, by IPO date.
     """
-    url = "https://www.alphavantage.co/query"
     params = {
         "function": "IPO_CALENDAR",
         "apikey": API_KEY
     }
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        data = response.json()
-    if data:
-        return data
-    else:
+    table = load_table(params, ("ipoDate",))
+    if table is None:
         return {"error": "Failed to fetch IPO calendar"}
+    return table.query(table.select(None, "ipoDate", start, end, exchange=exchange), limit)
 
 def get_currency_exchange_rate(from_currency: str, to_currency: str) -> dict:
     """Fetch exchange rate between two currencies from Alpha Vantage."""
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "CURRENCY_EXCHANGE_RATE",
@@ -560,7 +752,7 @@ def get_currency_exchange_rate(from_currency: str, to_currency: str) -> dict:
         "to_currency": to_currency,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -575,7 +767,7 @@ def get_currency_exchange_rate(from_currency: str, to_currency: str) -> dict:
     
 def get_fx_daily_data(from_symbol: str, to_symbol: str) -> dict:
     """Fetch daily time series (timestamp, open, high, low, close) of the FX currency pair from Alpha Vantage."""
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "FX_DAILY",
@@ -583,14 +775,14 @@ def get_fx_daily_data(from_symbol: str, to_symbol: str) -> dict:
         "to_symbol": to_symbol,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
     
     if response.status_code == 200:
-        data = response.json()
+        bars = series_bars(response, "Time Series FX (Daily)")
         
         # Check if the data contains the required information
-        if "Time Series FX (Daily)" in data:
-            return data["Time Series FX (Daily)"]
+        if bars:
+            return bars
         else:
             return {"error": "Invalid data returned"}
     else:
@@ -598,7 +790,7 @@ def get_fx_daily_data(from_symbol: str, to_symbol: str) -> dict:
     
 def get_fx_weekly_data(from_symbol: str, to_symbol: str) -> dict:
     """Fetch weekly time series (timestamp, open, high, low, close) of the FX currency pair from Alpha Vantage."""
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "FX_WEEKLY",
@@ -606,14 +798,14 @@ def get_fx_weekly_data(from_symbol: str, to_symbol: str) -> dict:
         "to_symbol": to_symbol,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
 
     if response.status_code == 200:
-        data = response.json()
+        bars = series_bars(response, "Time Series FX (Weekly)")
         
         # Check if the data contains the required information
-        if "Time Series FX (Weekly)" in data:
-            return data["Time Series FX (Weekly)"]
+        if bars:
+            return bars
         else:
             return {"error": "Invalid data returned"}
     else:
@@ -621,7 +813,7 @@ def get_fx_weekly_data(from_symbol: str, to_symbol: str) -> dict:
     
 def get_fx_monthly_data(from_symbol: str, to_symbol: str) -> dict:
     """Fetch monthly time series (timestamp, open, high, low, close) of the FX currency pair from Alpha Vantage."""
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "FX_MONTHLY",
@@ -629,14 +821,14 @@ def get_fx_monthly_data(from_symbol: str, to_symbol: str) -> dict:
         "to_symbol": to_symbol,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
 
     if response.status_code == 200:
-        data = response.json()
+        bars = series_bars(response, "Time Series FX (Monthly)")
         
         # Check if the data contains the required information
-        if "Time Series FX (Monthly)" in data:
-            return data["Time Series FX (Monthly)"]
+        if bars:
+            return bars
         else:
             return {"error": "Invalid data returned"}
     else:
@@ -647,7 +839,7 @@ def get_digital_currency_daily_data(symbol: str, market: str) -> dict:
     Fetch daily historical time series for a digital currency (e.g., BTC)
     traded on a specific market (e.g., EUR/Euro), refreshed daily at midnight (UTC).
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "DIGITAL_CURRENCY_DAILY",
@@ -655,14 +847,14 @@ def get_digital_currency_daily_data(symbol: str, market: str) -> dict:
         "market": market,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
 
     if response.status_code == 200:
-        data = response.json()
+        bars = series_bars(response, "Time Series (Digital Currency Daily)")
         
         # Check if the data contains the required information
-        if "Time Series (Digital Currency Daily)" in data:
-            return data["Time Series (Digital Currency Daily)"]
+        if bars:
+            return bars
         else:
             return {"error": "Invalid data returned"}
     else:
@@ -673,7 +865,7 @@ def get_digital_currency_weekly_data(symbol: str, market: str) -> dict:
     Fetch weekly historical time series for a digital currency (e.g., BTC)
     traded on a specific market (e.g., EUR/Euro), refreshed daily at midnight (UTC).
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "DIGITAL_CURRENCY_WEEKLY",
@@ -681,14 +873,14 @@ def get_digital_currency_weekly_data(symbol: str, market: str) -> dict:
         "market": market,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
 
     if response.status_code == 200:
-        data = response.json()
+        bars = series_bars(response, "Time Series (Digital Currency Weekly)")
         
         # Check if the data contains the required information
-        if "Time Series (Digital Currency Weekly)" in data:
-            return data["Time Series (Digital Currency Weekly)"]
+        if bars:
+            return bars
         else:
             return {"error": "Invalid data returned"}
     else:
@@ -699,7 +891,7 @@ def get_digital_currency_monthly_data(symbol: str, market: str) -> dict:
     Fetch monthly historical time series for a digital currency (e.g., BTC)
     traded on a specific market (e.g., EUR/Euro), refreshed daily at midnight (UTC).
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "DIGITAL_CURRENCY_MONTHLY",
@@ -707,14 +899,14 @@ def get_digital_currency_monthly_data(symbol: str, market: str) -> dict:
         "market": market,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=series_params(params))
 
     if response.status_code == 200:
-        data = response.json()
+        bars = series_bars(response, "Time Series (Digital Currency Monthly)")
         
         # Check if the data contains the required information
-        if "Time Series (Digital Currency Monthly)" in data:
-            return data["Time Series (Digital Currency Monthly)"]
+        if bars:
+            return bars
         else:
             return {"error": "Invalid data returned"}
     else:
@@ -724,279 +916,253 @@ def get_crude_oil_wti_data(interval: Optional[str]) -> dict:
     """
     Fetch the West Texas Intermediate (WTI) crude oil prices in daily, weekly, and monthly horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "WTI",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_crude_oil_brent_data(interval: Optional[str]) -> dict:
     """
     Fetch the Brent crude oil prices in daily, weekly, and monthly horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "BRENT",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_natural_gas_data(interval: Optional[str]) -> dict:
     """
     Fetch the natural Henry Hub gas prices in daily, weekly, and monthly horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "NATURAL_GAS",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_copper_data(interval: Optional[str]) -> dict:
     """
     Fetch the copper prices in monthly, quarterly, and annual horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "COPPER",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_aluminum_data(interval: Optional[str]) -> dict:
     """
     Fetch the aluminum prices in monthly, quarterly, and annual horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "ALUMINUM",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_wheat_data(interval: Optional[str]) -> dict:
     """
     Fetch the wheat prices in monthly, quarterly, and annual horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "WHEAT",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_corn_data(interval: Optional[str]) -> dict:
     """
     Fetch the corn prices in monthly, quarterly, and annual horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "CORN",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_cotton_data(interval: Optional[str]) -> dict:
     """
     Fetch the cotton prices in monthly, quarterly, and annual horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "COTTON",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_sugar_data(interval: Optional[str]) -> dict:
     """
     Fetch the sugar prices in monthly, quarterly, and annual horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "SUGAR",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_coffee_data(interval: Optional[str]) -> dict: 
     """
     Fetch the coffee prices in monthly, quarterly, and annual horizons.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "COFFEE",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_all_commodities_data(interval: Optional[str]) -> dict:
     """
     Fetch the global price index of all commodities in monthly, quarterly, and annual temporal dimensions.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "ALL_COMMODITIES",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_real_gdp(interval: Optional[str]) -> dict:
     """
     Fetch the Real GDP of the US data in quarterly and annual temporal dimensions.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "REAL_GDP",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_real_gdp_per_capita() -> dict:
     """
     Fetch the quarterly Real GDP per Capita data of the United States..
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "REAL_GDP_PER_CAPITA",
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_treasury_yield(interval: Optional[str], maturity: Optional[str]) -> dict:
     """
     Fetch the daily, weekly, and monthly US treasury yield of a given maturity timeline (e.g., 5 year, 30 year, etc).
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "TREASURY_YIELD",
@@ -1004,136 +1170,122 @@ def get_treasury_yield(interval: Optional[str], maturity: Optional[str]) -> dict
         "maturity": maturity,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_federal_funds_rate(interval: Optional[str]) -> dict:
     """
     Fetch the daily, weekly, and monthly federal funds rate (interest rate) of the US.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "FEDERAL_FUNDS_RATE",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_cpi_data(interval: Optional[str]) -> dict:
     """
     Fetch the monthly and semiannual consumer price index (CPI) of the US.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "CPI",
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_inflation() -> dict:
     """
     Fetch the annual inflation rates (consumer prices) of the US.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "INFLATION",
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_retail_sales() -> dict:
     """
     Fetch the monthly Advance Retail Sales: Retail Trade data of the US.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "RETAIL_SALES",
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
-    
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_durables() -> dict:
     """
     Fetch the monthly manufacturers' new orders of durable goods in the US.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "DURABLES",
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_monthly_unemployment() -> dict:
     """
     Fetch the monthly unemployment rate of the US.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "UNEMPLOYMENT",
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
     
 def get_nonfarm_payroll() -> dict:
     """
@@ -1141,33 +1293,32 @@ def get_nonfarm_payroll() -> dict:
     a measure of the number of U.S. workers in the economy that excludes proprietors, private household employees,
     unpaid volunteers, farm employees, and the unincorporated self-employed.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "NONFARM_PAYROLL",
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
-        
-    if data:
-        return data
-    else:
-        return {"error": "Failed to fetch data"}
-    
-
-        return {"error": "Failed to fetch data"}
+        if data:
+            return data
+    return {"error": "Failed to fetch data"}
 
-def get_sma_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_sma_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Simple Moving Average (SMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"SMA": sma(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "SMA",
@@ -1178,7 +1329,7 @@ def get_sma_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: SMA" in data:
@@ -1186,14 +1337,18 @@ def get_sma_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Missing SMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_ema_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_ema_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Exponential Moving Average (EMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"EMA": ema(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "EMA",
@@ -1204,7 +1359,7 @@ def get_ema_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: EMA" in data:
@@ -1212,14 +1367,18 @@ def get_ema_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Missing EMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_wma_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_wma_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Weighted Moving Average (WMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"WMA": wma(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "WMA",
@@ -1230,7 +1389,7 @@ def get_wma_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: WMA" in data:
@@ -1238,14 +1397,18 @@ def get_wma_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Missing WMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_dema_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_dema_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Double Exponential Moving Average (DEMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"DEMA": dema(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "DEMA",
@@ -1256,7 +1419,7 @@ def get_dema_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: DEMA" in data:
@@ -1264,14 +1427,18 @@ def get_dema_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Missing DEMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_tema_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_tema_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Triple Exponential Moving Average (TEMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"TEMA": tema(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "TEMA",
@@ -1282,7 +1449,7 @@ def get_tema_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: TEMA" in data:
@@ -1290,14 +1457,18 @@ def get_tema_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Missing TEMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_trima_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_trima_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Triangular Moving Average (TRIMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"TRIMA": trima(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "TRIMA",
@@ -1308,7 +1479,7 @@ def get_trima_values(symbol: str, interval: str = "daily", time_period: int = 60
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: TRIMA" in data:
@@ -1316,14 +1487,18 @@ def get_trima_values(symbol: str, interval: str = "daily", time_period: int = 60
         return {"error": "Missing TRIMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_kama_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_kama_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Kaufman Adaptive Moving Average (KAMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"KAMA": kama(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "KAMA",
@@ -1334,7 +1509,7 @@ def get_kama_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: KAMA" in data:
@@ -1342,14 +1517,19 @@ def get_kama_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Missing KAMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_mama_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_mama_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close",
+                    fastlimit: float = 0.01, slowlimit: float = 0.01, source: str = "api") -> dict:
     """
     Fetch MESA Adaptive Moving Average (MAMA) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type,
+                               lambda x: dict(zip(("MAMA", "FAMA"), mama(x, fastlimit, slowlimit))))
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "MAMA",
@@ -1357,10 +1537,12 @@ def get_mama_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "interval": interval,
         "time_period": time_period,
         "series_type": series_type,
+        "fastlimit": fastlimit,
+        "slowlimit": slowlimit,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: MAMA" in data:
@@ -1368,14 +1550,22 @@ def get_mama_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Missing MAMA data"}
     return {"error": "Failed to fetch data"}
 
-def get_vwap_values(symbol: str, interval: str = "15min") -> dict:
+def get_vwap_values(symbol: str, interval: str = "15min", source: str = "api") -> dict:
     """
     Fetch Volume Weighted Average Price (VWAP) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        if interval not in INTRADAY_INTERVALS:
+            return {"error": "VWAP is only available for intraday intervals"}
+        # VWAP restarts with every trading day
+        return local_indicator(symbol, interval, None,
+                               lambda c: {"VWAP": vwap(c["high"], c["low"], c["close"], c["volume"],
+                                                       session_starts(c["timestamp"]))})
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "VWAP",
@@ -1383,7 +1573,7 @@ def get_vwap_values(symbol: str, interval: str = "15min") -> dict:
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: VWAP" in data:
@@ -1391,14 +1581,148 @@ def get_vwap_values(symbol: str, interval: str = "15min") -> dict:
         return {"error": "Missing VWAP data"}
     return {"error": "Failed to fetch data"}
 
-def get_tthree_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def spec_label(spec: dict) -> str:
+    """
+    Column label of an indicator spec: its "label", else the function and
+    its parameter values, e.g. MACD_12_26_9.
+    """
+    if spec.get("label"):
+        return str(spec["label"])
+    values = [str(value) for name, value in spec.items() if name != "function"]
+    return "_".join([str(spec.get("function", "")).upper()] + values)
+
+def get_indicators(symbol: str, interval: str = "daily", specs: Optional[List[dict]] = None, limit: int = 100) -> dict:
+    """
+    Compute many indicators for a symbol from one price series fetch and
+    return them aligned on the same timestamps, newest first. Each spec names
+    an Alpha Vantage function plus its parameters, e.g.
+    {"function": "RSI", "time_period": 14} or {"function": "MACD", "label": "macd"}.
+    Warm-up bars are None; specs that cannot be computed are listed under
+    "errors".
+    """
+    api_key = API_KEY
+    if not api_key:
+        return "Error: ALPHA_VANTAGE_API_KEY not configured"
+    if not specs:
+        return {"error": "No indicator specs given"}
+
+    try:
+        prices = load_prices(symbol, interval)
+    except ValueError as e:
+        return {"error": str(e)}
+    if prices is None:
+        return {"error": "Missing price data"}
+    timestamps, columns = prices
+    columns = dict(columns, timestamp=timestamps)
+    # Newest first, at most limit bars
+    rows = slice(None, -limit - 1, -1) if limit else slice(None, None, -1)
+
+    result = {"symbol": symbol, "interval": interval, "timestamps": timestamps[rows], "indicators": {}, "errors": {}}
+    for spec in specs:
+        label = spec_label(spec)
+        params = {name: value for name, value in spec.items() if name not in ("function", "label")}
+        try:
+            outputs = evaluate(str(spec.get("function", "")), columns, **params)
+        except (ValueError, TypeError) as e:
+            result["errors"][label] = str(e)
+            continue
+        for name, values in outputs.items():
+            column = label if len(outputs) == 1 else f"{label}.{name}"
+            result["indicators"][column] = [
+                None if np.isnan(value) else round(value, 4) for value in values[rows].tolist()
+            ]
+    return result
+
+def screen_symbols(symbols: List[str], expression: str, interval: str = "daily", lookback: int = 300,
+                   refresh: bool = False, timeout: float = 60) -> dict:
+    """
+    Screen a universe of symbols with an indicator expression such as
+    "RSI(14) < 30 and close > SMA(200)", evaluated on every symbol's latest
+    bar at once. Only locally stored bars are used unless refresh is set,
+    which syncs every symbol first under the rate limit.
+    """
+    symbols = normalize_symbols(symbols)
+    if refresh:
+        run_batch(_sync_latest, [(symbol, interval) for symbol in symbols], timeout)
+    return _screen(symbols, expression, interval, lookback)
+
+async def screen_symbols_async(symbols: List[str], expression: str, interval: str = "daily", lookback: int = 300,
+                               refresh: bool = False, timeout: float = 60) -> dict:
+    """
+    Async counterpart of screen_symbols for the server's event loop.
+    """
+    symbols = normalize_symbols(symbols)
+    if refresh:
+        await run_async_batch(_sync_latest, [(symbol, interval) for symbol in symbols], timeout)
+    return await run_async(_screen, symbols, expression, interval, lookback)
+
+def _sync_latest(symbol: str, interval: str) -> Optional[dict]:
+    params, data_key = price_series(symbol, interval)
+    return sync_series(params, data_key, limit=1)
+
+def _screen(symbols: List[str], expression: str, interval: str, lookback: int) -> dict:
+    try:
+        return screen(symbols, expression, interval, lookback)
+    except ValueError as e:
+        return {"error": str(e)}
+
+def get_live_indicators(symbol: str, interval: str = "1min", time_period: int = 14) -> dict:
+    """
+    Latest SMA, EMA, RSI, MACD, stochastic and (intraday) VWAP values for a
+    symbol. Indicator state is checkpointed, so each call only processes the
+    bars that arrived since the previous one.
+    """
+    api_key = API_KEY
+    if not api_key:
+        return "Error: ALPHA_VANTAGE_API_KEY not configured"
+
+    indicators = [
+        IncrementalSMA(time_period),
+        IncrementalEMA(time_period),
+        IncrementalRSI(time_period),
+        IncrementalMACD(),
+        IncrementalStochastic(time_period),
+    ]
+    if interval in INTRADAY_INTERVALS:
+        indicators.append(IncrementalVWAP())
+    try:
+        result = stream_indicators(symbol, interval, indicators)
+    except ValueError as e:
+        return {"error": str(e)}
+    if result is None:
+        return {"error": "Missing price data"}
+    values = {}
+    for outputs in result["values"].values():
+        values.update({name: f"{value:.4f}" for name, value in (outputs or {}).items()})
+    return {"timestamp": result["timestamp"], "indicators": values}
+
+def get_anchored_vwap_values(symbol: str, anchor: str, interval: str = "15min") -> dict:
+    """
+    Compute VWAP cumulated from the anchor timestamp (e.g. an earnings
+    release) onward from the stored price series, without session resets.
+    """
+    api_key = API_KEY
+    if not api_key:
+        return "Error: ALPHA_VANTAGE_API_KEY not configured"
+
+    def compute(c):
+        start = bisect_left(c["timestamp"], anchor)
+        return {"VWAP": anchored_vwap(c["high"], c["low"], c["close"], c["volume"], start)}
+
+    return local_indicator(symbol, interval, None, compute)
+
+def get_tthree_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Triple Exponential Moving Average (T3) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"T3": t3(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "T3",
@@ -1409,7 +1733,7 @@ def get_tthree_values(symbol: str, interval: str = "daily", time_period: int = 6
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: T3" in data:
@@ -1418,14 +1742,19 @@ def get_tthree_values(symbol: str, interval: str = "daily", time_period: int = 6
     return {"error": "Failed to fetch data"}
 
 def get_macd_values(symbol: str, interval: str = "daily", series_type: str = "open", fastperiod: int = 12,
-                    slowperiod: int = 26, signalperiod: int = 9) -> dict:
+                    slowperiod: int = 26, signalperiod: int = 9, source: str = "api") -> dict:
     """
     Fetch Moving Average Convergence Divergence (MACD) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type,
+                               lambda x: dict(zip(("MACD", "MACD_Signal", "MACD_Hist"), macd(x, fastperiod, slowperiod, signalperiod))),
+                               fastperiod=fastperiod, slowperiod=slowperiod, signalperiod=signalperiod)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "MACD",
@@ -1438,7 +1767,7 @@ def get_macd_values(symbol: str, interval: str = "daily", series_type: str = "op
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: MACD" in data:
@@ -1447,15 +1776,22 @@ def get_macd_values(symbol: str, interval: str = "daily", series_type: str = "op
     return {"error": "Failed to fetch data"}
 
 def get_macdext_values(symbol: str, interval: str = "daily", series_type: str = "open", fastperiod: int = 12,
-                       slowperiod: int = 26, signalperiod: int = 9) -> dict:
+                       slowperiod: int = 26, signalperiod: int = 9, fastmatype: int = 0, slowmatype: int = 0,
+                       signalmatype: int = 0, source: str = "api") -> dict:
     """
     Fetch Moving Average Convergence Divergence (MACD) with controllable moving average type.
     """
 
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type,
+                               lambda x: dict(zip(("MACD", "MACD_Signal", "MACD_Hist"), macdext(x, fastperiod, slowperiod, signalperiod,
+                                                                      fastmatype, slowmatype, signalmatype))),
+                               fastperiod=fastperiod, slowperiod=slowperiod, signalperiod=signalperiod, fastmatype=fastmatype, slowmatype=slowmatype, signalmatype=signalmatype)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "MACDEXT",
@@ -1465,10 +1801,13 @@ def get_macdext_values(symbol: str, interval: str = "daily", series_type: str =
         "fastperiod": fastperiod,
         "slowperiod": slowperiod,
         "signalperiod": signalperiod,
+        "fastmatype": fastmatype,
+        "slowmatype": slowmatype,
+        "signalmatype": signalmatype,
         "apikey": api_key
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if "Technical Analysis: MACDEXT" in data:
@@ -1477,15 +1816,21 @@ def get_macdext_values(symbol: str, interval: str = "daily", series_type: str =
     return {"error": "Failed to fetch data"}
 
 def get_stoch_oscillator_values(symbol: str, interval: str = "daily", fastk_period: int = 14, slowk_period: int = 3,
-                                slowd_period: int = 3, series_type: str = "close") -> dict:
+                                slowd_period: int = 3, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch the Stochastic Oscillator (STOCH) data for a given stock symbol from Alpha Vantage.
     """
 
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
 
+    if source == "local":
+        return local_indicator(symbol, interval, None,
+                               lambda c: dict(zip(("SlowK", "SlowD"), stoch(c["high"], c["low"], c["close"],
+                                                                            fastk_period, slowk_period, slowd_period))),
+                               fastk_period=fastk_period, slowk_period=slowk_period, slowd_period=slowd_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "STOCH",
@@ -1497,7 +1842,7 @@ def get_stoch_oscillator_values(symbol: str, interval: str = "daily", fastk_peri
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -1510,15 +1855,21 @@ def get_stoch_oscillator_values(symbol: str, interval: str = "daily", fastk_peri
     else:
         return {"error": "Failed to fetch data"}
     
-def get_stochf_oscillator_values(symbol: str, interval: str = "daily", fastk_period: int = 5, fastdperiod: int = 3) -> dict:
+def get_stochf_oscillator_values(symbol: str, interval: str = "daily", fastk_period: int = 5, fastdperiod: int = 3, source: str = "api") -> dict:
     """
     Fetch the Stochastic Fast (STOCHF) data for a given stock symbol from Alpha Vantage.
     """
 
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, None,
+                               lambda c: dict(zip(("FastK", "FastD"), stochf(c["high"], c["low"], c["close"],
+                                                                             fastk_period, fastdperiod))),
+                               fastk_period=fastk_period, fastdperiod=fastdperiod)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "STOCHF",
@@ -1528,7 +1879,7 @@ def get_stochf_oscillator_values(symbol: str, interval: str = "daily", fastk_per
         "fastd_period": fastdperiod,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -1541,14 +1892,18 @@ def get_stochf_oscillator_values(symbol: str, interval: str = "daily", fastk_per
     else:
         return {"error": "Failed to fetch data"}
     
-def get_rsi_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_rsi_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Relative Strength Index (RSI) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
 
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"RSI": rsi(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "STOCHF",
@@ -1558,7 +1913,7 @@ def get_rsi_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -1572,13 +1927,18 @@ def get_rsi_values(symbol: str, interval: str = "daily", time_period: int = 60,
         return {"error": "Failed to fetch data"}
     
 def get_stochrsi_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close",
-                        fastkperiod: int = 5, fastdperiod: int = 3) -> dict:
+                        fastkperiod: int = 5, fastdperiod: int = 3, source: str = "api") -> dict:
     """
     Fetch Stochastic Relative Strength Index (STOCHRSI) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
+    if source == "local":
+        return local_indicator(symbol, interval, series_type,
+                               lambda x: dict(zip(("FastK", "FastD"), stochrsi(x, time_period, fastkperiod, fastdperiod))),
+                               time_period=time_period, fastkperiod=fastkperiod, fastdperiod=fastdperiod)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "STOCHRSI",
@@ -1590,7 +1950,7 @@ def get_stochrsi_values(symbol: str, interval: str = "daily", time_period: int =
         "fastdperiod": fastdperiod,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1602,14 +1962,19 @@ def get_stochrsi_values(symbol: str, interval: str = "daily", time_period: int =
     else:
         return {"error": "Failed to fetch data"}
     
-def get_willr_values(symbol: str, interval: str = "daily", time_period: int = 60) -> dict:
+def get_willr_values(symbol: str, interval: str = "daily", time_period: int = 60, source: str = "api") -> dict:
     """
     Fetch Williams %R (WILLR) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, None,
+                               lambda c: {"WILLR": willr(c["high"], c["low"], c["close"], time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "WILLR",
@@ -1618,7 +1983,7 @@ def get_willr_values(symbol: str, interval: str = "daily", time_period: int = 60
         "time_period": time_period,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1630,14 +1995,19 @@ def get_willr_values(symbol: str, interval: str = "daily", time_period: int = 60
     else:
         return {"error": "Failed to fetch data"}
     
-def get_adx_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_adx_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Average Directional Movement Index (ADX) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, None,
+                               lambda c: {"ADX": directional_movement(c["high"], c["low"], c["close"], time_period)["ADX"]},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "ADX",
@@ -1647,7 +2017,7 @@ def get_adx_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1656,15 +2026,22 @@ def get_adx_values(symbol: str, interval: str = "daily", time_period: int = 60,
             return data["Technical Analysis: ADX"]
         else:
             return {"error": "Invalid data returned or no data available"}
+    else:
+        return {"error": "Failed to fetch data"}
         
-def get_adxr_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_adxr_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Average Directional Movement Rating Index (ADXR) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, None,
+                               lambda c: {"ADXR": directional_movement(c["high"], c["low"], c["close"], time_period)["ADXR"]},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "ADXR",
@@ -1674,7 +2051,7 @@ def get_adxr_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1683,16 +2060,37 @@ def get_adxr_values(symbol: str, interval: str = "daily", time_period: int = 60,
             return data["Technical Analysis: ADXR"]
         else:
             return {"error": "Invalid data returned or no data available"}
+    else:
+        return {"error": "Failed to fetch data"}
         
+def get_directional_movement_values(symbol: str, interval: str = "daily", time_period: int = 14) -> dict:
+    """
+    Compute ADX, ADXR, +DI and -DI together from the stored price series,
+    without calling the indicator endpoints.
+    """
+    api_key = API_KEY
+    if not api_key:
+        return "Error: ALPHA_VANTAGE_API_KEY not configured"
+
+    def compute(c):
+        family = directional_movement(c["high"], c["low"], c["close"], time_period)
+        return {name: family[name] for name in ("ADX", "ADXR", "PLUS_DI", "MINUS_DI")}
+
+    return local_indicator(symbol, interval, None, compute, time_period=time_period)
+
 def get_apo_values(symbol: str, interval: str = "daily", series_type: str = "close", fastperiod: int = 12,
-                   slowperiod: int = 26) -> dict:
+                   slowperiod: int = 26, matype: int = 0, source: str = "api") -> dict:
     """
     Fetch Absolute Price Oscillator (APO) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"APO": apo(x, fastperiod, slowperiod, matype)},
+                               fastperiod=fastperiod, slowperiod=slowperiod, matype=matype)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "APO",
@@ -1701,9 +2099,10 @@ def get_apo_values(symbol: str, interval: str = "daily", series_type: str = "clo
         "series_type": series_type,
         "fastperiod": fastperiod,
         "slowperiod": slowperiod,
+        "matype": matype,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1716,14 +2115,18 @@ def get_apo_values(symbol: str, interval: str = "daily", series_type: str = "clo
         return {"error": "Failed to fetch data"}
     
 def get_ppo_values(symbol: str, interval: str = "daily", series_type: str = "close", fastperiod: int = 12,
-                   slowperiod: int = 26) -> dict:
+                   slowperiod: int = 26, matype: int = 0, source: str = "api") -> dict:
     """
     Fetch Percentage Price Oscillator (PPO) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"PPO": ppo(x, fastperiod, slowperiod, matype)},
+                               fastperiod=fastperiod, slowperiod=slowperiod, matype=matype)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "PPO",
@@ -1732,9 +2135,10 @@ def get_ppo_values(symbol: str, interval: str = "daily", series_type: str = "clo
         "series_type": series_type,
         "fastperiod": fastperiod,
         "slowperiod": slowperiod,
+        "matype": matype,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1746,14 +2150,18 @@ def get_ppo_values(symbol: str, interval: str = "daily", series_type: str = "clo
     else:
         return {"error": "Failed to fetch data"}
     
-def get_mom_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_mom_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Momentum (MOM) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"MOM": mom(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "MOM",
@@ -1763,7 +2171,7 @@ def get_mom_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1775,14 +2183,18 @@ def get_mom_values(symbol: str, interval: str = "daily", time_period: int = 60,
     else:
         return {"error": "Failed to fetch data"}
     
-def get_bop_values(symbol: str, interval: str = "daily") -> dict:
+def get_bop_values(symbol: str, interval: str = "daily", source: str = "api") -> dict:
     """
     Fetch Balance of Power (BOP) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, None,
+                               lambda c: {"BOP": bop(c["open"], c["high"], c["low"], c["close"])})
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "BOP",
@@ -1790,7 +2202,7 @@ def get_bop_values(symbol: str, interval: str = "daily") -> dict:
         "interval": interval,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1802,14 +2214,19 @@ def get_bop_values(symbol: str, interval: str = "daily") -> dict:
     else:
         return {"error": "Failed to fetch data"}
     
-def get_cci_values(symbol: str, interval: str = "daily", time_period: int = 60) -> dict:
+def get_cci_values(symbol: str, interval: str = "daily", time_period: int = 60, source: str = "api") -> dict:
     """
     Fetch Commodity Channel Index (CCI) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, None,
+                               lambda c: {"CCI": cci(c["high"], c["low"], c["close"], time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "CCI",
@@ -1818,7 +2235,7 @@ def get_cci_values(symbol: str, interval: str = "daily", time_period: int = 60)
         "time_period": time_period,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1830,14 +2247,18 @@ def get_cci_values(symbol: str, interval: str = "daily", time_period: int = 60)
     else:
         return {"error": "Failed to fetch data"}
     
-def get_cmo_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_cmo_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch Chande momentum oscillator (CMO) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"CMO": cmo(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "CMO",
@@ -1847,7 +2268,7 @@ def get_cmo_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1859,14 +2280,18 @@ def get_cmo_values(symbol: str, interval: str = "daily", time_period: int = 60,
     else:
         return {"error": "Failed to fetch data"}
     
-def get_roc_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_roc_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch rate of change (ROC) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"ROC": roc(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "ROC",
@@ -1876,7 +2301,7 @@ def get_roc_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
@@ -1888,14 +2313,18 @@ def get_roc_values(symbol: str, interval: str = "daily", time_period: int = 60,
     else:
         return {"error": "Failed to fetch data"}
     
-def get_rocr_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close") -> dict:
+def get_rocr_values(symbol: str, interval: str = "daily", time_period: int = 60, series_type: str = "close", source: str = "api") -> dict:
     """
     Fetch rate of change ratio (ROCR) values for a given symbol.
     """
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = API_KEY
     if not api_key:
         return "Error: ALPHA_VANTAGE_API_KEY not configured"
     
+    if source == "local":
+        return local_indicator(symbol, interval, series_type, lambda x: {"ROCR": rocr(x, time_period)},
+                               time_period=time_period)
+
     url = "https://www.alphavantage.co/query"
     params = {
         "function": "ROCR",
@@ -1905,7 +2334,7 @@ def get_rocr_values(symbol: str, interval: str = "daily", time_period: int = 60,
         "series_type": series_type,
         "apikey": api_key
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         
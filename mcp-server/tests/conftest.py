@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# The server modules are flat files in src/ and open their caches on import,
+# so point them at a scratch directory before any test imports them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("ALPHA_VANTAGE_CACHE_DIR", tempfile.mkdtemp(prefix="alpha_vantage_tests_"))
+os.environ.setdefault("ALPHA_VANTAGE_API_KEY", "test")
+# Tests drive upstream through a fake session: no quotas, no backoff sleeps
+os.environ.setdefault("ALPHA_VANTAGE_CALLS_PER_MINUTE", "0")
+os.environ.setdefault("ALPHA_VANTAGE_CALLS_PER_DAY", "0")
+os.environ.setdefault("ALPHA_VANTAGE_BACKOFF_BASE", "0")
+
+
+@pytest.fixture
+def ohlcv():
+    """
+    300 bars of a seeded random walk with consistent OHLC, oldest first.
+    """
+    rng = np.random.RandomState(7)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, 300))
+    open_ = close + rng.normal(0, 0.5, 300)
+    high = np.maximum(open_, close) + rng.uniform(0, 1.5, 300)
+    low = np.minimum(open_, close) - rng.uniform(0, 1.5, 300)
+    volume = rng.randint(1000, 100000, 300).astype(np.float64)
+    return {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+class Clock:
+    """
+    Stand-in for the time module that only moves when sleep() is called.
+    Patch it over a module's `time` to control its clock.
+    """
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+class FakeUpstream:
+    """
+    Stand-in for the shared requests session. `handler(params)` returns the
+    status and body of each reply; dict bodies are sent as JSON.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.handler = lambda params: (200, {})
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        status, body = self.handler(params)
+        content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        return SimpleNamespace(status_code=status, content=content, url=url)
+
+    def functions(self):
+        return [params["function"] for params in self.calls]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """
+    Send the client's requests to a FakeUpstream, starting from empty caches
+    and a closed circuit breaker.
+    """
+    import client
+    from resilience import CircuitBreaker
+
+    fake = FakeUpstream()
+    monkeypatch.setattr(client, "session", fake)
+    monkeypatch.setattr(client, "breaker", CircuitBreaker(client.BREAKER_THRESHOLD, client.BREAKER_RESET))
+    client.response_cache.clear()
+    if client.disk_cache is not None:
+        client.disk_cache.clear()
+    yield fake
+    client.response_cache.clear()
+    if client.disk_cache is not None:
+        client.disk_cache.clear()
@@ -0,0 +1,89 @@
+import pytest
+
+import cache
+from cache import TTLCache, cache_key, ttl_for
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+
+
+def test_least_recently_used_entry_is_evicted():
+    entries = TTLCache(max_entries=2, max_bytes=1000)
+    entries.set(("A",), "a", ttl=60)
+    entries.set(("B",), "b", ttl=60)
+    assert entries.get(("A",)) == "a"
+    entries.set(("C",), "c", ttl=60)
+    assert entries.get(("B",)) is None
+    assert entries.get(("A",)) == "a" and entries.get(("C",)) == "c"
+    assert entries.stats()["evictions"] == 1
+
+
+def test_entries_are_bounded_by_size():
+    entries = TTLCache(max_entries=10, max_bytes=100)
+    entries.set(("A",), "a", ttl=60, size=60)
+    entries.set(("B",), "b", ttl=60, size=30)
+    entries.set(("C",), "c", ttl=60, size=30)
+    assert entries.get(("A",)) is None
+    assert entries.stats()["bytes"] == 60
+    # A payload larger than the whole cache is not stored at all
+    entries.set(("D",), "d", ttl=60, size=101)
+    assert entries.get(("D",)) is None and entries.stats()["entries"] == 2
+
+
+def test_entries_expire_after_their_ttl(clock):
+    entries = TTLCache(max_entries=10, max_bytes=1000)
+    entries.set(("A",), "a", ttl=60)
+    clock.sleep(59)
+    assert entries.get(("A",)) == "a"
+    clock.sleep(1)
+    assert entries.get(("A",)) is None
+    assert entries.stats()["entries"] == 0
+
+
+def test_cache_key_ignores_api_key_and_order():
+    first = cache_key({"function": "global_quote", "symbol": "IBM", "apikey": "a", "datatype": None})
+    second = cache_key({"apikey": "b", "symbol": "IBM", "function": "GLOBAL_QUOTE"})
+    assert first == second == ("GLOBAL_QUOTE", (("symbol", "IBM"),))
+
+
+def test_ttl_for(monkeypatch):
+    assert ttl_for({"function": "GLOBAL_QUOTE"}) == cache.MINUTE
+    assert ttl_for({"function": "RSI", "symbol": "IBM", "interval": "5min"}) == cache.MINUTE
+    assert ttl_for({"function": "RSI", "symbol": "IBM", "interval": "daily"}) == cache.HOUR
+    monkeypatch.setenv("ALPHA_VANTAGE_CACHE_TTL_GLOBAL_QUOTE", "5")
+    assert ttl_for({"function": "GLOBAL_QUOTE"}) == 5
+
+
+def test_disk_cache_survives_a_reopen(tmp_path):
+    key = cache_key({"function": "OVERVIEW", "symbol": "IBM"})
+    cache.SQLiteCache(str(tmp_path)).set(key, 200, b'{"Symbol": "IBM"}', ttl=60)
+    status, content, created_at, expires_at = cache.SQLiteCache(str(tmp_path)).lookup(key)
+    assert (status, content) == (200, b'{"Symbol": "IBM"}')
+    assert expires_at - created_at == 60
+
+
+def test_disk_cache_purges_rows_past_retention(tmp_path, clock):
+    disk = cache.SQLiteCache(str(tmp_path), retention=100)
+    disk.set(("A", ()), 200, b"a", ttl=60)
+    clock.sleep(61)
+    assert disk.lookup(("A", ())) is None
+    assert disk.lookup(("A", ()), max_stale=30) is not None
+    assert disk.purge() == 0
+    clock.sleep(100)
+    assert disk.purge() == 1
+    assert disk.stats()["entries"] == 0
+
+
+def test_expired_entries_are_served_stale_within_the_window(clock):
+    entries = TTLCache(max_entries=10, max_bytes=1000, retention=120)
+    entries.set(("A",), "a", ttl=60)
+    clock.sleep(90)
+    assert entries.lookup(("A",)) is None
+    assert entries.lookup(("A",), max_stale=60) == ("a", clock.now - 90, clock.now - 30)
+    assert entries.stats()["stale_hits"] == 1
+    # Past retention the entry is dropped for good
+    clock.sleep(100)
+    assert entries.lookup(("A",), max_stale=60) is None
+    assert entries.stats()["entries"] == 0
@@ -0,0 +1,27 @@
+import asyncio
+import json
+import time
+
+import client
+import tools
+from cache import cache_key
+
+QUOTE = {"Global Quote": {"01. symbol": "IBM", "05. price": "150.0000"}}
+QUOTE_PARAMS = {"function": "GLOBAL_QUOTE", "symbol": "IBM", "apikey": "test"}
+
+
+def test_stale_reply_is_served_while_it_is_refreshed(upstream, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(client, "_revalidate", lambda url, params, timeout: refreshed.append(params))
+    content = json.dumps(QUOTE).encode()
+    # GLOBAL_QUOTE is fresh for a minute and may be served a minute past that
+    client.response_cache.set(cache_key(QUOTE_PARAMS), client.Response(200, content), 60, len(content),
+                              stored_at=time.time() - 90)
+
+    response = client.http_get(client.BASE_URL, QUOTE_PARAMS)
+    assert response.json()["_cache"] == {"stale": True, "age_seconds": 90.0}
+    # Fetchers that return part of the payload still carry the flag
+    quote = asyncio.run(client.run_async(tools.get_quote, "IBM"))
+    assert quote["01. symbol"] == "IBM"
+    assert quote["_cache"]["stale"] and quote["_cache"]["age_seconds"] >= 90
+    assert len(refreshed) == 2 and upstream.calls == []
@@ -0,0 +1,142 @@
+import json
+
+import numpy as np
+import pytest
+
+import frames
+from frames import Frame, csv_bars, format_timestamps, parse_csv_series, parse_series
+
+FIELDS = ["open", "high", "low", "close", "adjusted_close", "volume", "dividend_amount", "split_coefficient"]
+DATA_KEY = "Time Series (Daily)"
+
+
+def daily_bars(n=30):
+    """
+    {timestamp: {"1. open": "value", ...}} newest first, as Alpha Vantage
+    sends them.
+    """
+    bars = {}
+    for i in range(n):
+        day = f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}"
+        values = [100 + i, 101.5 + i, 99.25 + i, 100.75 + i, 100.5 + i, 1000 * (i + 1), 0.0, 1.0]
+        bars[day] = {f"{j}. {name.replace('_', ' ')}": f"{value:.4f}" if j != 6 else str(value)
+                     for j, (name, value) in enumerate(zip(FIELDS, values), 1)}
+    return dict(reversed(list(bars.items())))
+
+
+def json_payload(bars, data_key=DATA_KEY, **dumps):
+    payload = {"Meta Data": {"1. Information": "Daily Time Series", "2. Symbol": "IBM"}, data_key: bars}
+    return json.dumps(payload, **dumps).encode()
+
+
+def csv_payload(bars, newline="\r\n"):
+    lines = ["timestamp," + ",".join(FIELDS)]
+    lines += [",".join([label] + list(bar.values())) for label, bar in bars.items()]
+    return (newline.join(lines) + newline).encode()
+
+
+def assert_frame_matches(frame, bars):
+    expected = Frame.from_bars(bars)
+    assert frame.labels() == sorted(bars)
+    assert frame.daily == expected.daily
+    np.testing.assert_array_equal(frame.timestamps, expected.timestamps)
+    assert set(frame.columns) == set(expected.columns)
+    for name in expected.columns:
+        np.testing.assert_array_equal(frame[name], expected[name])
+
+
+@pytest.mark.parametrize("dumps", [{"indent": 4}, {}, {"separators": (",", ":")}])
+def test_parse_series_matches_json_decoding(dumps, monkeypatch):
+    # Regular payloads must not need the json.loads fallback
+    monkeypatch.setattr(frames, "_parse_decoded", None)
+    bars = daily_bars()
+    frame = parse_series(json_payload(bars, **dumps), DATA_KEY)
+    assert_frame_matches(frame, bars)
+    assert frame["close"][-1] == 129.75
+
+
+def test_parse_series_intraday_and_prefixed_fields():
+    bars = {
+        "2024-01-02 09:31:00": {"1a. open (USD)": "10.5", "1b. open (EUR)": "9.5", "2. volume": "7"},
+        "2024-01-02 09:30:00": {"1a. open (USD)": "10.0", "1b. open (EUR)": "9.0", "2. volume": "5"},
+    }
+    frame = parse_series(json_payload(bars, "Time Series (1min)", indent=4), "Time Series (1min)")
+    assert not frame.daily
+    assert frame.labels() == ["2024-01-02 09:30:00", "2024-01-02 09:31:00"]
+    # The first field mapping to a column wins
+    np.testing.assert_array_equal(frame["open"], [10.0, 10.5])
+    np.testing.assert_array_equal(frame["volume"], [5, 7])
+
+
+def test_parse_series_irregular_layout_falls_back():
+    # A bar with an extra field breaks the fixed per-bar layout
+    bars = daily_bars(5)
+    first = next(iter(bars))
+    bars[first]["9. note"] = "x"
+    frame = parse_series(json_payload(bars, indent=4), DATA_KEY)
+    assert frame.labels() == sorted(bars)
+    assert np.isnan(frame["note"]).all()
+    np.testing.assert_array_equal(frame["close"], Frame.from_bars(bars)["close"])
+
+
+def test_parse_series_odd_values_become_nan():
+    bars = daily_bars(3)
+    bars[next(iter(bars))]["4. close"] = "None"
+    frame = parse_series(json_payload(bars, indent=4), DATA_KEY)
+    assert np.isnan(frame["close"][-1])
+    assert not np.isnan(frame["close"][:-1]).any()
+
+
+@pytest.mark.parametrize("content", [
+    b'{"Error Message": "Invalid API call."}',
+    b'{"Note": "Thank you for using Alpha Vantage!"}',
+    json_payload({}, indent=4),
+])
+def test_parse_series_without_bars(content):
+    assert parse_series(content, DATA_KEY) is None
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\n"])
+def test_parse_csv_series_matches_json(newline):
+    bars = daily_bars()
+    frame = parse_csv_series(csv_payload(bars, newline))
+    json_frame = parse_series(json_payload(bars, indent=4), DATA_KEY)
+    assert_frame_matches(frame, bars)
+    for name in json_frame.columns:
+        np.testing.assert_array_equal(frame[name], json_frame[name])
+    assert frame.to_bars() == bars
+
+
+def test_csv_bars_has_json_shape():
+    bars = daily_bars(4)
+    assert csv_bars(csv_payload(bars)) == bars
+    assert list(csv_bars(csv_payload(bars))) == list(bars)
+
+
+@pytest.mark.parametrize("content", [
+    b'{\n    "Error Message": "Invalid API call."\n}',
+    b"",
+    b"timestamp,open\r\n",
+])
+def test_csv_without_bars(content):
+    assert parse_csv_series(content) is None
+    assert csv_bars(content) is None
+
+
+def test_frame_round_trips():
+    frame = Frame.from_bars(daily_bars())
+    restored = Frame.load(*frame.dump(), daily=frame.daily)
+    assert_frame_matches(restored, daily_bars())
+    assert format_timestamps(restored.timestamps, True) == frame.labels()
+    merged = frame.merge(Frame.from_bars({"2024-03-01": daily_bars(1)["2024-01-01"]}))
+    assert merged.labels()[-1] == "2024-03-01" and len(merged) == len(frame) + 1
+    # Overlapping bars are replaced by the newer frame's values
+    revised = dict(daily_bars(1)["2024-01-01"], **{"4. close": "1.0000"})
+    merged = frame.merge(Frame.from_bars({"2024-01-01": revised}))
+    assert len(merged) == len(frame) and merged["close"][0] == 1.0
+
+
+def test_frame_to_bars_gives_back_payload_values():
+    bars = daily_bars()
+    assert Frame.from_bars(bars).to_bars() == bars
+    assert list(Frame.from_bars(bars).tail(3).to_bars()) == list(bars)[:3]
@@ -0,0 +1,317 @@
+import math
+
+import numpy as np
+import pytest
+
+import indicators
+import tools
+
+# Reference implementations written bar by bar from TA-Lib's definitions
+# (SMA seeded EMAs, Wilder smoothing, TA-Lib lookbacks), which Alpha Vantage's
+# technical indicator endpoints follow. Warm-up bars are NaN in both.
+
+
+def ref_sma(x, period):
+    out = np.full(len(x), np.nan)
+    for i in range(period - 1, len(x)):
+        out[i] = sum(x[i - period + 1:i + 1]) / period
+    return out
+
+
+def ref_ema(x, period, alpha=None, start=0):
+    # Seeded with the mean of the first `period` values from `start` on
+    alpha = 2.0 / (period + 1) if alpha is None else alpha
+    out = np.full(len(x), np.nan)
+    seed = start + period - 1
+    if seed >= len(x):
+        return out
+    out[seed] = sum(x[start:seed + 1]) / period
+    for i in range(seed + 1, len(x)):
+        out[i] = out[i - 1] + alpha * (x[i] - out[i - 1])
+    return out
+
+
+def ref_wma(x, period):
+    out = np.full(len(x), np.nan)
+    for i in range(period - 1, len(x)):
+        out[i] = sum(w * x[i - period + w] for w in range(1, period + 1)) / (period * (period + 1) / 2)
+    return out
+
+
+def ref_wilder_gains(x, period):
+    gains = [max(x[i] - x[i - 1], 0.0) for i in range(1, len(x))]
+    losses = [max(x[i - 1] - x[i], 0.0) for i in range(1, len(x))]
+    avg_gain = np.full(len(x), np.nan)
+    avg_loss = np.full(len(x), np.nan)
+    avg_gain[period] = sum(gains[:period]) / period
+    avg_loss[period] = sum(losses[:period]) / period
+    for i in range(period + 1, len(x)):
+        avg_gain[i] = (avg_gain[i - 1] * (period - 1) + gains[i - 1]) / period
+        avg_loss[i] = (avg_loss[i - 1] * (period - 1) + losses[i - 1]) / period
+    return avg_gain, avg_loss
+
+
+def ref_rsi(x, period):
+    gain, loss = ref_wilder_gains(x, period)
+    return 100 * gain / (gain + loss)
+
+
+def ref_cmo(x, period):
+    gain, loss = ref_wilder_gains(x, period)
+    return 100 * (gain - loss) / (gain + loss)
+
+
+def ref_macd(x, fast, slow, signal):
+    # TA-Lib starts the fast EMA where the slow one starts
+    fast_ema = ref_ema(x, fast, start=slow - fast)
+    slow_ema = ref_ema(x, slow)
+    line = fast_ema - slow_ema
+    signal_line = ref_ema(line, signal, start=slow - 1)
+    return line, signal_line, line - signal_line
+
+
+def ref_fast_k(high, low, close, period):
+    out = np.full(len(close), np.nan)
+    for i in range(period - 1, len(close)):
+        highest = max(high[i - period + 1:i + 1])
+        lowest = min(low[i - period + 1:i + 1])
+        out[i] = 100 * (close[i] - lowest) / (highest - lowest)
+    return out
+
+
+def ref_stoch(high, low, close, fastk, slowk, slowd):
+    slow_k = ref_sma(ref_fast_k(high, low, close, fastk), slowk)
+    return slow_k, ref_sma(slow_k, slowd)
+
+
+def ref_willr(high, low, close, period):
+    out = np.full(len(close), np.nan)
+    for i in range(period - 1, len(close)):
+        highest = max(high[i - period + 1:i + 1])
+        lowest = min(low[i - period + 1:i + 1])
+        out[i] = -100 * (highest - close[i]) / (highest - lowest)
+    return out
+
+
+def ref_cci(high, low, close, period):
+    typical = [(h + l + c) / 3 for h, l, c in zip(high, low, close)]
+    out = np.full(len(close), np.nan)
+    for i in range(period - 1, len(close)):
+        window = typical[i - period + 1:i + 1]
+        mean = sum(window) / period
+        deviation = sum(abs(v - mean) for v in window) / period
+        out[i] = (typical[i] - mean) / (0.015 * deviation)
+    return out
+
+
+def ref_directional_movement(high, low, close, period):
+    """
+    TA-Lib's ADX loop: DM and TR sums seeded over period - 1 bars, one
+    Wilder step per bar after that, ADX seeded with the mean of the first
+    `period` DX values.
+    """
+    n = len(close)
+    plus_di, minus_di, dx, adx = (np.full(n, np.nan) for _ in range(4))
+    plus_dm_sum = minus_dm_sum = tr_sum = 0.0
+    for i in range(1, n):
+        up, down = high[i] - high[i - 1], low[i - 1] - low[i]
+        plus_dm = up if up > down and up > 0 else 0.0
+        minus_dm = down if down > up and down > 0 else 0.0
+        tr = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        if i < period:
+            plus_dm_sum += plus_dm
+            minus_dm_sum += minus_dm
+            tr_sum += tr
+            continue
+        plus_dm_sum += plus_dm - plus_dm_sum / period
+        minus_dm_sum += minus_dm - minus_dm_sum / period
+        tr_sum += tr - tr_sum / period
+        plus_di[i] = 100 * plus_dm_sum / tr_sum
+        minus_di[i] = 100 * minus_dm_sum / tr_sum
+        dx[i] = 100 * abs(plus_di[i] - minus_di[i]) / (plus_di[i] + minus_di[i])
+        if i == 2 * period - 1:
+            adx[i] = sum(dx[period:i + 1]) / period
+        elif i > 2 * period - 1:
+            adx[i] = (adx[i - 1] * (period - 1) + dx[i]) / period
+    adxr = np.full(n, np.nan)
+    for i in range(3 * period - 2, n):
+        adxr[i] = (adx[i] + adx[i - period + 1]) / 2
+    return {"PLUS_DI": plus_di, "MINUS_DI": minus_di, "DX": dx, "ADX": adx, "ADXR": adxr}
+
+
+def ref_vwap(high, low, close, volume, timestamps):
+    out = np.full(len(close), np.nan)
+    price_volume = total_volume = 0.0
+    for i in range(len(close)):
+        if i == 0 or timestamps[i][:10] != timestamps[i - 1][:10]:
+            price_volume = total_volume = 0.0
+        price_volume += (high[i] + low[i] + close[i]) / 3 * volume[i]
+        total_volume += volume[i]
+        out[i] = price_volume / total_volume
+    return out
+
+
+def assert_same(actual, expected):
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+# Wilder RSI example published by StockCharts (14 periods); RSI values are
+# quoted to two decimals starting with the 15th close
+STOCKCHARTS_CLOSES = [
+    44.3389, 44.0902, 44.1497, 43.6124, 44.3278, 44.8264, 45.0955, 45.4245, 45.8433, 46.0826, 45.8931,
+    46.0328, 45.6140, 46.2820, 46.2820, 46.0028, 46.0328, 46.4116, 46.2222, 45.6439, 46.2122, 46.2521,
+    45.7137, 46.4515, 45.7835, 45.3548, 44.0288, 44.1783, 44.2181, 44.5672, 43.4205, 42.6628, 43.1314,
+]
+STOCKCHARTS_RSI = [70.53, 66.32, 66.55, 69.41, 66.36, 57.97, 62.93, 63.26, 56.06, 62.38, 54.71, 50.42,
+                   39.99, 41.46, 41.87]
+
+
+def test_rsi_matches_published_wilder_example():
+    values = indicators.rsi(STOCKCHARTS_CLOSES, 14)
+    assert np.isnan(values[:14]).all()
+    np.testing.assert_allclose(values[14:14 + len(STOCKCHARTS_RSI)], STOCKCHARTS_RSI, atol=0.005)
+
+
+@pytest.mark.parametrize("period", [1, 5, 20])
+def test_moving_averages(ohlcv, period):
+    close = ohlcv["close"]
+    assert_same(indicators.sma(close, period), ref_sma(close, period))
+    assert_same(indicators.ema(close, period), ref_ema(close, period))
+    assert_same(indicators.wma(close, period), ref_wma(close, period))
+    e1 = ref_ema(close, period)
+    e2 = ref_ema(e1, period, start=period - 1)
+    e3 = ref_ema(e2, period, start=2 * period - 2)
+    assert_same(indicators.dema(close, period), 2 * e1 - e2)
+    assert_same(indicators.tema(close, period), 3 * e1 - 3 * e2 + e3)
+
+
+@pytest.mark.parametrize("period", [2, 14, 30])
+def test_oscillators(ohlcv, period):
+    high, low, close = ohlcv["high"], ohlcv["low"], ohlcv["close"]
+    assert_same(indicators.rsi(close, period), ref_rsi(close, period))
+    assert_same(indicators.cmo(close, period), ref_cmo(close, period))
+    assert_same(indicators.willr(high, low, close, period), ref_willr(high, low, close, period))
+    assert_same(indicators.cci(high, low, close, period), ref_cci(high, low, close, period))
+    momentum = np.full(len(close), np.nan)
+    momentum[period:] = close[period:] - close[:-period]
+    assert_same(indicators.mom(close, period), momentum)
+    rate = np.full(len(close), np.nan)
+    rate[period:] = 100 * (close[period:] - close[:-period]) / close[:-period]
+    assert_same(indicators.roc(close, period), rate)
+
+
+def test_stochastics(ohlcv):
+    high, low, close = ohlcv["high"], ohlcv["low"], ohlcv["close"]
+    for actual, expected in zip(indicators.stoch(high, low, close, 14, 3, 3), ref_stoch(high, low, close, 14, 3, 3)):
+        assert_same(actual, expected)
+    fast_k = ref_fast_k(high, low, close, 5)
+    for actual, expected in zip(indicators.stochf(high, low, close, 5, 3), (fast_k, ref_sma(fast_k, 3))):
+        assert_same(actual, expected)
+
+
+@pytest.mark.parametrize("fast, slow, signal", [(12, 26, 9), (5, 35, 5), (3, 4, 2)])
+def test_macd(ohlcv, fast, slow, signal):
+    close = ohlcv["close"]
+    for actual, expected in zip(indicators.macd(close, fast, slow, signal), ref_macd(close, fast, slow, signal)):
+        assert_same(actual, expected)
+
+
+@pytest.mark.parametrize("matype, reference", [(0, ref_sma), (2, ref_wma)])
+def test_price_oscillators(ohlcv, matype, reference):
+    # Windowed averages do not depend on the bar they start at, so the fast
+    # line is the plain average
+    close = ohlcv["close"]
+    fast, slow = reference(close, 12), reference(close, 26)
+    assert_same(indicators.apo(close, 12, 26, matype), fast - slow)
+    assert_same(indicators.ppo(close, 26, 12, matype), 100 * (fast - slow) / slow)
+
+
+def test_macdext(ohlcv):
+    close = ohlcv["close"]
+    for actual, expected in zip(indicators.macdext(close, 12, 26, 9, 1, 1, 1), ref_macd(close, 12, 26, 9)):
+        assert_same(actual, expected)
+    with pytest.raises(ValueError):
+        indicators.macdext(close, 12, 26, 9, 0, 0, 9)
+
+
+@pytest.mark.parametrize("period", [2, 14, 25])
+def test_directional_movement(ohlcv, period):
+    high, low, close = ohlcv["high"], ohlcv["low"], ohlcv["close"]
+    actual = indicators.directional_movement(high, low, close, period)
+    expected = ref_directional_movement(high, low, close, period)
+    for name in expected:
+        assert_same(actual[name], expected[name])
+
+
+def test_vwap(ohlcv):
+    high, low, close, volume = ohlcv["high"], ohlcv["low"], ohlcv["close"], ohlcv["volume"]
+    # Three sessions of 100 one-minute bars
+    timestamps = [f"2024-01-{2 + i // 100:02d} {9 + i % 100 // 60:02d}:{i % 60:02d}:00" for i in range(300)]
+    assert_same(indicators.vwap(high, low, close, volume, indicators.session_starts(timestamps)),
+                ref_vwap(high, low, close, volume, timestamps))
+    anchored = indicators.anchored_vwap(high, low, close, volume, 150)
+    assert np.isnan(anchored[:150]).all()
+    assert_same(anchored[150:], ref_vwap(high[150:], low[150:], close[150:], volume[150:], [timestamps[150]] * 150))
+
+
+def test_matrix_columns_match_single_series(ohlcv):
+    # The screener evaluates (bars x symbols) matrices, including symbols
+    # with less history (NaN-padded at the start)
+    close = ohlcv["close"]
+    short = close.copy()
+    short[:40] = np.nan
+    matrix = np.column_stack([close, short])
+    for function in (lambda x: indicators.rsi(x, 14), lambda x: indicators.ema(x, 20),
+                     lambda x: indicators.macd(x)[2]):
+        result = function(matrix)
+        assert_same(result[:, 0], function(close))
+        assert_same(result[40:, 1], function(short[40:]))
+
+
+def test_evaluate_specs(ohlcv):
+    columns = dict(ohlcv, timestamp=[f"2024-01-01 {i // 60:02d}:{i % 60:02d}:00" for i in range(300)])
+    assert_same(indicators.evaluate("RSI", columns, time_period="7")["RSI"], ref_rsi(ohlcv["close"], 7))
+    assert_same(indicators.evaluate("ADX", columns)["ADX"],
+                ref_directional_movement(ohlcv["high"], ohlcv["low"], ohlcv["close"], 14)["ADX"])
+    assert set(indicators.evaluate("MACD", columns)) == {"MACD", "MACD_Signal", "MACD_Hist"}
+
+
+@pytest.mark.parametrize("function, params", [
+    ("RSI", {"time_period": 0}),
+    ("ADX", {"time_period": -1}),
+    ("MACD", {"signalperiod": 0}),
+    ("APO", {"matype": 9}),
+    ("SMA", {"series_type": "typical"}),
+    ("SMA", {"period": 5}),
+    ("NOPE", {}),
+])
+def test_evaluate_rejects_bad_specs(ohlcv, function, params):
+    with pytest.raises(ValueError):
+        indicators.evaluate(function, dict(ohlcv), **params)
+
+
+def test_evaluate_refuses_vwap_on_daily_bars(ohlcv):
+    daily = dict(ohlcv, timestamp=[f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(300)])
+    with pytest.raises(ValueError, match="intraday"):
+        indicators.evaluate("VWAP", daily)
+    intraday = dict(ohlcv, timestamp=[f"2024-01-01 {i // 60:02d}:{i % 60:02d}:00" for i in range(300)])
+    assert not np.isnan(indicators.evaluate("VWAP", intraday)["VWAP"]).any()
+
+
+def test_to_av_series_skips_warm_up():
+    series = indicators.to_av_series(["2024-01-01", "2024-01-02", "2024-01-03"],
+                                     {"SMA": np.array([math.nan, 1.5, 2.5])})
+    assert list(series) == ["2024-01-03", "2024-01-02"]
+    assert series["2024-01-03"] == {"SMA": "2.5000"}
+
+
+
+def test_local_indicators_check_params(ohlcv, monkeypatch):
+    dates = [str(np.datetime64("2023-01-01") + i) for i in range(300)]
+    monkeypatch.setattr(tools, "load_prices", lambda symbol, interval: (dates, dict(ohlcv)))
+    assert len(tools.get_sma_values("IBM", time_period=20, source="local")) == 281
+    for result in (tools.get_rsi_values("IBM", time_period=0, source="local"),
+                   tools.get_adx_values("IBM", time_period=-1, source="local"),
+                   tools.get_apo_values("IBM", matype=9, source="local"),
+                   tools.get_macdext_values("IBM", signalmatype=12, source="local")):
+        assert set(result) == {"error"}
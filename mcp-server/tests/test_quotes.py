@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+import tools
+
+
+def global_quote(symbol):
+    return {"Global Quote": {"01. symbol": symbol, "05. price": "10.0000"}}
+
+
+@pytest.fixture
+def no_bulk(monkeypatch):
+    monkeypatch.setattr(tools, "BULK_QUOTES", "false")
+
+
+def test_quotes_report_each_symbol(upstream, no_bulk):
+    def reply(params):
+        if params["symbol"] == "BAD":
+            return 200, {"Error Message": "Invalid API call."}
+        if params["symbol"] == "DOWN":
+            return 500, b"error"
+        return 200, global_quote(params["symbol"])
+
+    upstream.handler = reply
+    result = tools.get_quotes([" ibm", "MSFT", "IBM", "BAD", "DOWN", ""])
+    assert list(result["quotes"]) == ["IBM", "MSFT"]
+    assert result["quotes"]["MSFT"]["01. symbol"] == "MSFT"
+    assert result["errors"] == {"BAD": "Missing global quote data", "DOWN": "Failed to fetch data"}
+    assert result["pending"] == []
+    # Duplicates are asked for once
+    assert sorted(params["symbol"] for params in upstream.calls if params["symbol"] != "DOWN") == \
+        ["BAD", "IBM", "MSFT"]
+
+
+def test_quotes_not_back_by_the_deadline_are_pending(upstream, no_bulk):
+    release = threading.Event()
+
+    def reply(params):
+        if params["symbol"] == "SLOW":
+            release.wait(5)
+        return 200, global_quote(params["symbol"])
+
+    upstream.handler = reply
+    try:
+        result = tools.get_quotes(["IBM", "SLOW"], timeout=0.2)
+    finally:
+        release.set()
+    assert list(result["quotes"]) == ["IBM"]
+    assert result["pending"] == ["SLOW"] and result["errors"] == {}
+
+
+def bulk_quotes(symbols):
+    return {"data": [{"symbol": symbol, "close": "20.00", "timestamp": "2024-01-02 16:00:00"} for symbol in symbols]}
+
+
+@pytest.fixture
+def auto_bulk(monkeypatch):
+    monkeypatch.setattr(tools, "BULK_QUOTES", "auto")
+    monkeypatch.setattr(tools, "_bulk_quotes_supported", None)
+
+
+def test_symbols_missing_from_bulk_fall_back_to_global_quote(upstream, auto_bulk):
+    def reply(params):
+        if params["function"] == "REALTIME_BULK_QUOTES":
+            return 200, bulk_quotes(["IBM", "MSFT"])
+        return 200, global_quote(params["symbol"])
+
+    upstream.handler = reply
+    result = tools.get_quotes(["IBM", "MSFT", "NVDA"])
+    assert upstream.functions() == ["REALTIME_BULK_QUOTES", "GLOBAL_QUOTE"]
+    assert result["quotes"]["IBM"]["05. price"] == "20.00"
+    assert result["quotes"]["IBM"]["07. latest trading day"] == "2024-01-02"
+    assert result["quotes"]["NVDA"]["05. price"] == "10.0000"
+    assert tools._bulk_quotes_supported is True
+
+
+def test_premium_only_bulk_falls_back_and_is_not_tried_again(upstream, auto_bulk):
+    def reply(params):
+        if params["function"] == "REALTIME_BULK_QUOTES":
+            return 200, {"Information": "This is a premium endpoint."}
+        return 200, global_quote(params["symbol"])
+
+    upstream.handler = reply
+    result = tools.get_quotes(["IBM", "MSFT"])
+    assert sorted(result["quotes"]) == ["IBM", "MSFT"] and result["errors"] == {}
+    assert tools._bulk_quotes_supported is False
+    upstream.calls.clear()
+    tools.get_quotes(["NVDA"])
+    assert upstream.functions() == ["GLOBAL_QUOTE"]
@@ -0,0 +1,83 @@
+import pytest
+
+import ratelimit
+from ratelimit import RateLimiter, RateLimitExceeded, SharedBudget
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch, clock):
+    monkeypatch.setattr(ratelimit, "time", clock)
+
+
+def test_reservations_queue_behind_the_bucket(clock):
+    limiter = RateLimiter(per_minute=60, per_day=0, max_wait=60)
+    # A full bucket goes out at once, then one call per second, in order
+    delays = [limiter.reserve() for _ in range(63)]
+    assert delays[:60] == [0.0] * 60
+    assert delays[60:] == pytest.approx([1.0, 2.0, 3.0])
+    clock.sleep(10)
+    assert limiter.reserve() == pytest.approx(0.0)
+
+
+def test_reservation_beyond_max_wait_is_refused_and_not_spent(clock):
+    limiter = RateLimiter(per_minute=2, per_day=0, max_wait=60)
+    limiter.reserve()
+    limiter.reserve()
+    with pytest.raises(RateLimitExceeded, match="exceeds the maximum"):
+        limiter.reserve(max_wait=10)
+    # The refused call did not take a place in the queue
+    assert limiter.reserve() == pytest.approx(30.0)
+
+
+def test_daily_budget(clock):
+    limiter = RateLimiter(per_minute=0, per_day=2, max_wait=60)
+    limiter.reserve()
+    limiter.reserve()
+    with pytest.raises(RateLimitExceeded, match="Daily"):
+        limiter.reserve()
+    limiter.refund()
+    assert limiter.remaining_today() == 1
+    limiter.reserve()
+    # Quotas reset at midnight UTC
+    limiter._today = lambda: "2099-01-01"
+    assert limiter.remaining_today() == 2
+
+
+def test_daily_quota_reported_by_upstream(clock):
+    limiter = RateLimiter(per_minute=5, per_day=25, max_wait=60)
+    limiter.penalize(daily=True)
+    assert limiter.remaining_today() == 0
+    with pytest.raises(RateLimitExceeded, match="Daily"):
+        limiter.reserve()
+
+
+def test_shared_budget_is_spent_once_across_limiters(tmp_path, clock):
+    # Two limiters on one file stand for two server processes
+    first = RateLimiter(5, 3, 60, SharedBudget(str(tmp_path)), "key")
+    second = RateLimiter(5, 3, 60, SharedBudget(str(tmp_path)), "key")
+    first.reserve()
+    second.reserve()
+    assert first.reserve() == 0.0
+    with pytest.raises(RateLimitExceeded, match="Daily"):
+        second.reserve()
+    assert first.stats()["calls_today"] == 3
+
+
+def test_key_pool_routes_to_the_least_loaded_key(clock):
+    pool = ratelimit.KeyPool(["a", "b"], per_minute=2, per_day=0, max_wait=0)
+    keys = [pool.reserve()[0] for _ in range(4)]
+    assert sorted(keys) == ["a", "a", "b", "b"] and keys[0] != keys[1]
+    with pytest.raises(RateLimitExceeded):
+        pool.reserve()
+    pool.refund("b")
+    assert pool.reserve() == ("b", 0.0)
+
+
+def test_key_pool_sees_calls_made_by_other_processes(tmp_path, clock):
+    pool = ratelimit.KeyPool(["a", "b"], 5, 25, 60, SharedBudget(str(tmp_path)))
+    other = ratelimit.KeyPool(["a"], 5, 25, 60, SharedBudget(str(tmp_path)))
+    for _ in range(3):
+        other.reserve()
+    assert [pool.reserve()[0] for _ in range(3)] == ["b", "b", "b"]
+    assert pool.reserve()[0] in ("a", "b")
+    assert pool.remaining_today() == 50 - 7
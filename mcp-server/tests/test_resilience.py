@@ -0,0 +1,83 @@
+import pytest
+import requests
+
+import client
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    monkeypatch.setattr(resilience, "time", clock)
+    return CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+
+def test_breaker_opens_then_lets_one_trial_through(breaker, clock):
+    breaker.record_failure()
+    assert breaker.before_call() is False
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.sleep(30)
+    assert breaker.state == "half_open"
+    assert breaker.before_call() is True
+    # Only one call is the trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.before_call() is False
+
+
+def test_failed_trial_opens_the_breaker_again(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.sleep(30)
+    assert breaker.before_call() is True
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.sleep(29)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_trial_goes_to_the_next_call(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.sleep(30)
+    trial = breaker.before_call()
+    breaker.release_trial(trial)
+    assert breaker.state == "half_open"
+    assert breaker.before_call() is True
+
+
+def test_backoff_delay_is_capped():
+    assert all(0 <= backoff_delay(attempt, 1, 30) <= min(30, 2 ** attempt) for attempt in range(10))
+
+
+def test_transient_errors_are_retried(upstream):
+    replies = iter([(503, b"unavailable"), (429, b"slow down"), (200, {"Global Quote": {"01. symbol": "IBM"}})])
+    upstream.handler = lambda params: next(replies)
+    response = client.http_get(client.BASE_URL, {"function": "GLOBAL_QUOTE", "symbol": "IBM", "apikey": "test"})
+    assert response.json()["Global Quote"]["01. symbol"] == "IBM"
+    assert len(upstream.calls) == 3
+    assert client.breaker.state == "closed"
+
+
+def test_connection_errors_open_the_breaker(upstream, monkeypatch):
+    monkeypatch.setattr(client, "breaker", CircuitBreaker(client.MAX_RETRIES + 1, 30))
+
+    def refuse(params):
+        raise requests.ConnectionError("refused")
+
+    upstream.handler = refuse
+    params = {"function": "GLOBAL_QUOTE", "symbol": "IBM", "apikey": "test"}
+    with pytest.raises(requests.ConnectionError):
+        client.http_get(client.BASE_URL, params)
+    assert len(upstream.calls) == client.MAX_RETRIES + 1
+    assert client.breaker.state == "open"
+    # Further calls fail fast without reaching upstream
+    with pytest.raises(CircuitOpenError):
+        client.http_get(client.BASE_URL, params)
+    assert len(upstream.calls) == client.MAX_RETRIES + 1
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def run_coalesced(flight, fn, callers=5):
+    """
+    Start `callers` threads on the same key while fn is held open, and return
+    their outcomes once fn is released.
+    """
+    started, release = threading.Event(), threading.Event()
+
+    def leader():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    def call():
+        try:
+            return flight.do("key", leader)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(callers) as executor:
+        first = executor.submit(call)
+        started.wait(5)
+        rest = [executor.submit(call) for _ in range(callers - 1)]
+        while flight.coalesced < callers - 1:
+            time.sleep(0.001)
+        release.set()
+        return [first.result()] + [future.result() for future in rest]
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return {"value": 1}
+
+    flight = SingleFlight()
+    results = run_coalesced(flight, fn)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    # The key is released once the call is over
+    assert flight.do("key", lambda: 2) == 2
+
+
+def test_concurrent_callers_share_one_exception():
+    error = ValueError("upstream failed")
+
+    def fn():
+        raise error
+
+    results = run_coalesced(SingleFlight(), fn)
+    assert all(result is error for result in results)
+
+
+def test_cancelled_leader_leaves_the_call_running():
+    async def scenario():
+        flight, release, calls = AsyncSingleFlight(), asyncio.Event(), []
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return "value"
+
+        leader = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, calls, flight.coalesced
+
+    assert asyncio.run(scenario()) == ("value", [1], 1)
@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pytest
+
+import indicators
+from streaming import (IncrementalEMA, IncrementalIndicator, IncrementalMACD, IncrementalRSI, IncrementalSMA,
+                       IncrementalStochastic, IncrementalVWAP)
+
+
+def bars_of(ohlcv):
+    # Three sessions of 100 one-minute bars
+    timestamps = [f"2024-01-{2 + i // 100:02d} {9 + i % 100 // 60:02d}:{i % 60:02d}:00" for i in range(300)]
+    return [dict({name: float(values[i]) for name, values in ohlcv.items()}, timestamp=timestamps[i])
+            for i in range(300)], timestamps
+
+
+def batch_values(ohlcv, timestamps):
+    high, low, close, volume = ohlcv["high"], ohlcv["low"], ohlcv["close"], ohlcv["volume"]
+    macd, signal, hist = indicators.macd(close, 12, 26, 9)
+    slow_k, slow_d = indicators.stoch(high, low, close, 14, 3, 3)
+    return {
+        "SMA(series_type=close,time_period=20)": {"SMA": indicators.sma(close, 20)},
+        "EMA(series_type=close,time_period=20)": {"EMA": indicators.ema(close, 20)},
+        "RSI(series_type=close,time_period=14)": {"RSI": indicators.rsi(close, 14)},
+        "MACD(fastperiod=12,series_type=close,signalperiod=9,slowperiod=26)":
+            {"MACD": macd, "MACD_Signal": signal, "MACD_Hist": hist},
+        "STOCH(fastk_period=14,slowd_period=3,slowk_period=3)": {"SlowK": slow_k, "SlowD": slow_d},
+        "VWAP()": {"VWAP": indicators.vwap(high, low, close, volume, indicators.session_starts(timestamps))},
+    }
+
+
+def make_indicators():
+    return [IncrementalSMA(20), IncrementalEMA(20), IncrementalRSI(14), IncrementalMACD(),
+            IncrementalStochastic(14), IncrementalVWAP()]
+
+
+def test_incremental_matches_batch_bar_for_bar(ohlcv):
+    bars, timestamps = bars_of(ohlcv)
+    expected = batch_values(ohlcv, timestamps)
+    for indicator in make_indicators():
+        outputs = expected[indicator.key]
+        for i, bar in enumerate(bars):
+            value = indicator.update(bar)
+            # Values appear once every output is defined, as in the API
+            if any(np.isnan(series[i]) for series in outputs.values()):
+                assert value is None, (indicator.key, i)
+            else:
+                assert value is not None, (indicator.key, i)
+                for name, series in outputs.items():
+                    assert value[name] == pytest.approx(series[i], rel=1e-9, abs=1e-9), (indicator.key, name, i)
+
+
+@pytest.mark.parametrize("split", [1, 25, 150])
+def test_resuming_from_checkpoint_continues_exactly(ohlcv, split):
+    bars, _ = bars_of(ohlcv)
+    for indicator in make_indicators():
+        for bar in bars[:split]:
+            indicator.update(bar)
+        # Checkpoints go through JSON in the store
+        resumed = IncrementalIndicator.from_state(json.loads(json.dumps(indicator.state())))
+        for bar in bars[split:]:
+            expected = indicator.update(bar)
+            actual = resumed.update(bar)
+            if expected is None:
+                assert actual is None
+            else:
+                assert actual == pytest.approx(expected, rel=1e-12)
+
+
+def test_macd_orders_periods():
+    assert IncrementalMACD(fastperiod=26, slowperiod=12).params["slowperiod"] == 26
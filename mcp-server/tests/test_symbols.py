@@ -0,0 +1,79 @@
+import pytest
+
+import symbols
+import tables
+import tools
+from cache import TTLCache
+from symbols import SymbolIndex
+from tables import Table
+
+LISTING = (
+    b"symbol,name,exchange,assetType,ipoDate,delistingDate,status\r\n"
+    b"AAPL,Apple Inc,NASDAQ,Stock,1980-12-12,null,Active\r\n"
+    b"AAP,Advance Auto Parts Inc,NYSE,Stock,2001-11-29,null,Active\r\n"
+    b"MSFT,Microsoft Corporation,NASDAQ,Stock,1986-03-13,null,Active\r\n"
+    b"BRK-B,Berkshire Hathaway Inc,NYSE,Stock,1996-05-09,null,Active\r\n"
+    b"IBM,International Business Machines Corp,NYSE,Stock,1978-01-13,null,Active\r\n"
+)
+
+
+@pytest.fixture
+def index():
+    return SymbolIndex(Table.from_csv(LISTING))
+
+
+@pytest.fixture
+def listing(upstream, monkeypatch):
+    """
+    Upstream serving the listing and quotes, with no index built yet.
+    """
+    monkeypatch.setattr(tables, "_tables", TTLCache(max_entries=8, max_bytes=1024 * 1024))
+    monkeypatch.setattr(symbols, "_index", None)
+    monkeypatch.setattr(symbols, "_no_listing_at", None)
+
+    def reply(params):
+        if params["function"] == "LISTING_STATUS":
+            return 200, LISTING
+        return 200, {"Global Quote": {"01. symbol": params["symbol"]}}
+
+    upstream.handler = reply
+    return upstream
+
+
+def test_resolve_and_plausible(index):
+    assert index.resolve(" brk.b") == "BRK-B"
+    assert index.resolve("GOOG") is None
+    assert index.is_plausible("TSCO.LON")
+    assert not index.is_plausible("APPL")
+
+
+def test_suggestions_for_a_typo(index):
+    assert index.suggest("APPL")[0] == "AAPL"
+    assert index.suggest("MSTF") == ["MSFT"]
+
+
+def test_search_by_symbol_and_name(index):
+    assert [entry["symbol"] for entry in index.search("AA")] == ["AAP", "AAPL"]
+    assert index.search("microsoft")[0]["symbol"] == "MSFT"
+    assert index.search("business mach")[0] == {
+        "symbol": "IBM", "name": "International Business Machines Corp", "exchange": "NYSE", "assetType": "Stock",
+    }
+
+
+def test_unknown_symbols_are_refused_without_a_call(listing):
+    assert symbols.symbol_index() is not None
+    listing.calls.clear()
+    result = tools.get_quote("APPL")
+    assert result["error"] == "Unknown symbol: APPL. Did you mean AAPL, AAP?"
+    assert result["suggestions"] == ["AAPL", "AAP"]
+    assert listing.calls == []
+    # Listed symbols, foreign listings and unchecked functions go upstream
+    assert tools.get_quote("brk.b")["01. symbol"] == "brk.b"
+    assert tools.get_quote("TSCO.LON")["01. symbol"] == "TSCO.LON"
+    symbols.check_symbol({"function": "FX_DAILY", "symbol": "EURUSD"})
+    assert len(listing.calls) == 2
+
+
+def test_no_check_until_the_listing_is_cached(listing):
+    assert tools.get_quote("APPL")["01. symbol"] == "APPL"
+    assert listing.functions() == ["GLOBAL_QUOTE"]
@@ -0,0 +1,63 @@
+import pytest
+
+import tables
+from cache import TTLCache
+from tables import Table, load_table
+
+EARNINGS = (
+    b"symbol,name,reportDate,fiscalDateEnding,estimate,currency\r\n"
+    b"IBM,International Business Machines,2024-04-24,2024-03-31,1.6,USD\r\n"
+    b"AAPL,Apple Inc,2024-05-02,2024-03-31,1.5,USD\r\n"
+    b"ibm,International Business Machines,2024-07-24,2024-06-30,2.1,USD\r\n"
+    b"SAP,SAP SE,2024-04-22,2024-03-31,,EUR\r\n"
+    b"BAD,short row\r\n"
+)
+CALENDAR_PARAMS = {"function": "EARNINGS_CALENDAR", "horizon": "3month", "apikey": "test"}
+
+
+@pytest.fixture
+def table():
+    return Table.from_csv(EARNINGS, ["reportDate"])
+
+
+def test_from_csv_keeps_whole_rows(table):
+    assert len(table) == 4
+    assert table.columns["estimate"] == ["1.6", "1.5", "2.1", ""]
+
+
+def test_select_filters(table):
+    symbols = table.columns["symbol"]
+    assert [symbols[i] for i in table.select(date_column="reportDate")] == ["SAP", "IBM", "AAPL", "ibm"]
+    assert table.select(symbol="IBM") == [0, 2]
+    assert table.select(date_column="reportDate", start="2024-04-23", end="2024-05") == [0, 1]
+    assert table.select(symbol="ibm", date_column="reportDate", end="2024-06") == [0]
+    assert table.select(currency="eur") == [3]
+    assert table.query(table.select(currency="usd"), limit=1) == {"count": 3, "rows": table.records([0])}
+
+
+@pytest.mark.parametrize("content", [b'{"Information": "Invalid API call."}', b""])
+def test_from_csv_rejects_non_csv_replies(content):
+    assert Table.from_csv(content) is None
+
+
+def test_from_csv_needs_the_date_columns():
+    assert Table.from_csv(EARNINGS, ["ipoDate"]) is None
+
+
+def test_tables_are_parsed_once_and_bounded(upstream, monkeypatch):
+    monkeypatch.setattr(tables, "_tables", TTLCache(max_entries=2, max_bytes=1024 * 1024))
+    upstream.handler = lambda params: (200, EARNINGS)
+    assert load_table(CALENDAR_PARAMS, ["reportDate"]) is load_table(CALENDAR_PARAMS, ["reportDate"])
+    assert len(upstream.calls) == 1
+    for horizon in ("6month", "12month"):
+        load_table(dict(CALENDAR_PARAMS, horizon=horizon), ["reportDate"])
+    assert tables._tables.stats()["entries"] == 2
+    # The evicted table is rebuilt from the cached reply, not fetched again
+    assert load_table(CALENDAR_PARAMS, ["reportDate"], cached_only=True) is not None
+    assert len(upstream.calls) == 3
+
+
+def test_cached_only_never_fetches(upstream, monkeypatch):
+    monkeypatch.setattr(tables, "_tables", TTLCache(max_entries=2, max_bytes=1024 * 1024))
+    assert load_table(CALENDAR_PARAMS, cached_only=True) is None
+    assert upstream.calls == []
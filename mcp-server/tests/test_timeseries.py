@@ -0,0 +1,53 @@
+import json
+import sqlite3
+
+import pytest
+
+from frames import Frame
+from timeseries import TimeSeriesStore
+
+SERIES = "TIME_SERIES_DAILY_ADJUSTED:IBM"
+
+
+def bar(close, adjusted=None, volume=1000):
+    adjusted = close if adjusted is None else adjusted
+    return {"1. open": f"{close:.4f}", "2. high": f"{close + 1:.4f}", "3. low": f"{close - 1:.4f}",
+            "4. close": f"{close:.4f}", "5. adjusted close": f"{adjusted:.4f}", "6. volume": str(volume)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TimeSeriesStore(str(tmp_path))
+
+
+def test_merge_upserts_and_backfill_replaces(store):
+    store.merge(SERIES, Frame.from_bars({"2024-01-02": bar(10), "2024-01-01": bar(9)}), backfill=True)
+    store.merge(SERIES, Frame.from_bars({"2024-01-03": bar(12), "2024-01-02": bar(11)}))
+    assert store.bars(SERIES) == {"2024-01-03": bar(12), "2024-01-02": bar(11), "2024-01-01": bar(9)}
+    assert list(store.bars(SERIES, limit=1)) == ["2024-01-03"]
+    assert store.latest_timestamp(SERIES) == "2024-01-03"
+    store.merge(SERIES, Frame.from_bars({"2024-01-05": bar(20)}), backfill=True)
+    assert store.bars(SERIES) == {"2024-01-05": bar(20)}
+    assert store.latest_timestamp("TIME_SERIES_DAILY_ADJUSTED:NONE") is None
+
+
+def test_bars_after_gives_adjusted_prices(store):
+    store.merge(SERIES, Frame.from_bars({"2024-01-02": bar(10, adjusted=5), "2024-01-01": bar(9)}), backfill=True)
+    assert store.bars_after(SERIES, "2024-01-01") == [
+        ("2024-01-02", {"open": 5.0, "high": 5.5, "low": 4.5, "close": 5.0, "volume": 1000.0}),
+    ]
+    assert [timestamp for timestamp, _ in store.bars_after(SERIES)] == ["2024-01-01", "2024-01-02"]
+
+
+def test_bar_rows_of_older_stores_are_converted(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "timeseries.sqlite3"))
+    conn.execute("CREATE TABLE bars (series TEXT NOT NULL, timestamp TEXT NOT NULL, bar TEXT NOT NULL,"
+                  " PRIMARY KEY (series, timestamp)) WITHOUT ROWID")
+    conn.executemany("INSERT INTO bars VALUES (?, ?, ?)",
+                     [(SERIES, "2024-01-01", json.dumps(bar(9))), (SERIES, "2024-01-02", json.dumps(bar(10)))])
+    conn.commit()
+    conn.close()
+    store = TimeSeriesStore(str(tmp_path))
+    assert store.bars(SERIES) == {"2024-01-02": bar(10), "2024-01-01": bar(9)}
+    tables = {row[0] for row in store._connection().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "bars" not in tables